@@ -44,7 +44,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'tutorials.performance.PerformanceMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'tutorials.tenants.TenantMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -52,11 +54,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Users are loaded with their role profiles in one query
+AUTHENTICATION_BACKENDS = [
+    'tutorials.backends.ProfileBackend',
+]
+
 ROOT_URLCONF = 'code_tutors.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'tutorials.performance.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -80,9 +88,61 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests, checking them before reuse
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read-only copies of the default database for the admin listings and entity
+# pages, e.g. 'replica': {'ENGINE': ..., 'NAME': BASE_DIR / 'db.replica.sqlite3',
+# 'TEST': {'MIRROR': 'default'}} in DATABASES. They are only as fresh as the
+# last `manage.py refresh_replicas`. Requests for a tenant never use them
+DATABASE_REPLICAS = []
+
+# Tutoring centres, each with its users, bookings and lessons in a database
+# of its own, e.g. 'north': {'DATABASE': 'north', 'HOSTS': ['north.example.org'],
+# 'VENUE': 'Code Tutors North'} with a 'north' entry in DATABASES. Requests are
+# for the centre serving their host, or the one chosen with ?tenant=north.
+# Sessions stay in default, and a centre's own database only gets the
+# tutorials, auth and contenttypes tables. Set up every centre's database with
+# `manage.py migrate_tenants`
+TENANTS = {}
+
+# Sessions in a database of their own, e.g. 'bookkeeping' with a
+# 'bookkeeping': {'ENGINE': ..., 'NAME': BASE_DIR / 'db.bookkeeping.sqlite3'}
+# entry in DATABASES, so logins and session saves don't queue up behind
+# booking writes for the SQLite lock. Move existing sessions over with
+# `manage.py migrate_bookkeeping`
+BOOKKEEPING_DATABASE = None
+
+DATABASE_ROUTERS = [
+    'tutorials.routers.TenantRouter',
+    'tutorials.routers.BookkeepingRouter',
+    'tutorials.routers.ReplicaRouter',
+]
+
+# Applied to every new SQLite connection: WAL lets readers carry on while a
+# booking is written, and writers wait up to busy_timeout ms for the lock
+# instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+}
+
+# Opt-in: send booking, lesson assignment and sign-up writes through one
+# writer thread (tutorials.write_queue), which commits up to
+# WRITE_QUEUE_BATCH of them per transaction. Submitting fails with
+# WriteQueueFull when WRITE_QUEUE_SIZE writes are already waiting for longer
+# than WRITE_QUEUE_TIMEOUT seconds
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_SIZE = 256
+WRITE_QUEUE_BATCH = 32
+WRITE_QUEUE_TIMEOUT = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -143,5 +203,64 @@ MESSAGE_TAGS = {
     messages.ERROR: 'danger',
 }
 
+# Rows per page on the manage_* tables, overridable with ?page_size=
+MANAGE_PAGE_SIZE = 25
+MANAGE_MAX_PAGE_SIZE = 200
+
+# Days of lesson series occurrences listed on manage_lessons, and the most
+# that can be asked for with ?from=&to=
+LESSON_SERIES_WINDOW_DAYS = 7
+LESSON_SERIES_MAX_WINDOW_DAYS = 93
+
+# In-process cache by default; point it at a shared backend such as
+# Redis or Memcached when running several server processes
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'code-tutors',
+    },
+}
+
+# Sessions are read through the cache and only reach the database when they
+# change. Use 'django.contrib.sessions.backends.signed_cookies' to keep them
+# out of the database altogether, or '...backends.db' for plain DB sessions
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# A user's last_login is written at most once per this many seconds, rather
+# than on every login
+LAST_LOGIN_UPDATE_INTERVAL = 60 * 60
+
+# Dashboards are cached until their next lesson starts, but never longer than this (seconds)
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# One line per request with its view, role, query count and timings
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'tutorials.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Report a request that lazily loads the same relation this many times,
+# by raising NPlusOneError if NPLUSONE_RAISE is set and logging a warning
+# otherwise. The test runner sets it
+NPLUSONE_THRESHOLD = 2
+NPLUSONE_RAISE = False
+
+TEST_RUNNER = 'tutorials.tests.runner.TestRunner'
+
+# Where the snapshot command saves and loads database snapshots
+SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+
 # Custom view for forbidden page
 HANDLER403 = 'yourapp.views.forbidden'
\ No newline at end of file
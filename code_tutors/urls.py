@@ -62,6 +62,7 @@ urlpatterns = [
     path('admin-profile/<int:id>/', admin_views.get_admin, name='get_admin'),
     path('booking/<int:id>/', admin_views.get_booking, name='get_booking'),
     path('lesson/<int:id>/', admin_views.get_lesson, name='get_lesson'),
+    path('series/<int:id>/<str:date>/', admin_views.get_occurrence, name='get_occurrence'),
 
     path('delete_user/<int:id>/', admin_views.delete_user, name='delete_user'),
     path('delete_student/<int:id>/', admin_views.delete_student, name='delete_student'),
@@ -69,6 +70,8 @@ urlpatterns = [
     path('delete_admin/<int:id>/', admin_views.delete_admins, name='delete_admin'),
     path('delete_booking/<int:id>/', admin_views.delete_booking, name='delete_booking'),
     path('delete_lesson/<int:id>/', admin_views.delete_lesson, name='delete_lesson'),
+    path('cancel_occurrence/<int:id>/<str:date>/', admin_views.cancel_occurrence, name='cancel_occurrence'),
+    path('materialise_occurrence/<int:id>/<str:date>/', admin_views.materialise_occurrence, name='materialise_occurrence'),
 
 ]
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
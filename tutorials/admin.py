@@ -1,8 +1,26 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from .auto_assign import auto_assign
+from .models.booking_model import Booking
 from .models.tutor_model import Tutor
 from .models.student_model import Student
 from .models.admin_model import Admin
+from .models.term_closure_model import TermClosure
 
 admin.site.register(Tutor)
 admin.site.register(Student)
 admin.site.register(Admin)
+admin.site.register(TermClosure)
+
+
+@admin.action(description="Auto-assign tutors to selected open bookings")
+def auto_assign_tutors(modeladmin, request, queryset):
+    report = auto_assign(queryset)
+    level = messages.SUCCESS if report.assignments else messages.WARNING
+    modeladmin.message_user(request, str(report), level)
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ['id', 'student', 'date', 'time', 'day', 'lang', 'status']
+    list_filter = ['status', 'day', 'lang']
+    actions = [auto_assign_tutors]
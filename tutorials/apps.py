@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TutorialsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tutorials'
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+        #replaced by signals.record_last_login, which writes less often
+        user_logged_in.disconnect(dispatch_uid="update_last_login")
+        from tutorials import signals  # noqa: F401
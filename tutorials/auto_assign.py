@@ -0,0 +1,277 @@
+from collections import defaultdict
+from itertools import combinations
+from time import perf_counter
+from tutorials.caching import queryset_cache
+from tutorials.capabilities import tutor_capabilities
+from tutorials.dashboard_cache import invalidate_dashboards
+from tutorials.models import Booking, CancelledOccurrence, Lesson, LessonSeries, Tutor
+from tutorials.views.lesson_views import get_busy_tutor_ids, get_recurring_dates, get_term_end_date
+from tutorials.write_queue import run_write
+
+
+#the models a tutor's existing lessons are read from
+LESSON_MODELS = [Lesson, LessonSeries, CancelledOccurrence]
+
+
+class AssignmentReport:
+    """Outcome of an auto-assignment run."""
+
+    def __init__(self, assignments, unassigned, elapsed):
+        self.assignments = assignments
+        self.unassigned = unassigned
+        self.elapsed = elapsed
+
+    @property
+    def total(self):
+        return len(self.assignments) + len(self.unassigned)
+
+    @property
+    def fill_rate(self):
+        return len(self.assignments) / self.total if self.total else 0
+
+    def __str__(self):
+        return (
+            f"Assigned {len(self.assignments)} of {self.total} open bookings "
+            f"({self.fill_rate:.0%}) in {self.elapsed:.2f}s."
+        )
+
+
+class _BookingSlot:
+    """The dates and start/end datetimes that a booking's series would occupy."""
+
+    def __init__(self, booking):
+        self.booking = booking
+        self.spans = {
+            lesson_date: Booking.get_schedule(lesson_date, booking.time, booking.duration)
+            for lesson_date in get_recurring_dates(booking)
+        }
+
+    def overlaps(self, other):
+        for lesson_date in self.spans.keys() & other.spans.keys():
+            start_at, end_at = self.spans[lesson_date]
+            other_start_at, other_end_at = other.spans[lesson_date]
+            if start_at < other_end_at and end_at > other_start_at:
+                return True
+        return False
+
+
+def _get_conflict_groups(booking_pks, slots):
+    """
+    Split bookings into groups that overlap nothing outside themselves.
+
+    Returns (booking pks, whether every booking in the group overlaps every other) pairs.
+    """
+    parent = {pk: pk for pk in booking_pks}
+
+    def find(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    #series only overlap on shared dates, which fall on the same weekday
+    by_weekday = defaultdict(list)
+    for pk in booking_pks:
+        by_weekday[slots[pk].booking.date.weekday()].append(pk)
+    overlapping = set()
+    for pks in by_weekday.values():
+        for other, pk in combinations(pks, 2):
+            if slots[pk].overlaps(slots[other]):
+                overlapping.add(frozenset((pk, other)))
+                parent[find(pk)] = find(other)
+
+    groups = defaultdict(list)
+    for pk in booking_pks:
+        groups[find(pk)].append(pk)
+    return [
+        (pks, all(frozenset(pair) in overlapping for pair in combinations(pks, 2)))
+        for pks in groups.values()
+    ]
+
+
+def _min_cost_matching(booking_pks, candidates):
+    """
+    Give each booking at most one of its candidate tutors, and each tutor at most one booking.
+
+    As many bookings as possible are matched, and of those matchings the one
+    with the lowest total rate is returned, as {booking pk: tutor}. This is
+    min-cost flow by successive shortest paths: each round moves along the
+    cheapest path from an unmatched booking to a free tutor, possibly moving
+    matched bookings to other tutors on the way. Moving a booking off a tutor
+    refunds their rate, so paths are found with Bellman-Ford.
+    """
+    tutors = {tutor.pk: tutor for pk in booking_pks for tutor in candidates[pk]}
+    assigned = {}
+    owner = {}
+    while True:
+        #cost of reaching each booking and tutor from an unmatched booking
+        booking_costs = {pk: 0 for pk in booking_pks if pk not in assigned}
+        tutor_costs = {}
+        reached_from = {}
+        for _ in range(len(booking_pks) + len(tutors) + 1):
+            changed = False
+            for pk, cost in list(booking_costs.items()):
+                for tutor in candidates[pk]:
+                    if assigned.get(pk) == tutor.pk:
+                        continue
+                    if tutor.pk not in tutor_costs or cost + tutor.rate < tutor_costs[tutor.pk]:
+                        tutor_costs[tutor.pk] = cost + tutor.rate
+                        reached_from[tutor.pk] = pk
+                        changed = True
+            for tutor_pk, pk in owner.items():
+                if tutor_pk not in tutor_costs:
+                    continue
+                cost = tutor_costs[tutor_pk] - tutors[tutor_pk].rate
+                if pk not in booking_costs or cost < booking_costs[pk]:
+                    booking_costs[pk] = cost
+                    changed = True
+            if not changed:
+                break
+
+        free = [tutor_pk for tutor_pk in tutor_costs if tutor_pk not in owner]
+        if not free:
+            return {pk: tutors[tutor_pk] for pk, tutor_pk in assigned.items()}
+        tutor_pk = min(free, key=lambda tutor_pk: (tutor_costs[tutor_pk], tutor_pk))
+        #walk the path back, moving each booking on it to the next tutor
+        while tutor_pk is not None:
+            pk = reached_from[tutor_pk]
+            previous = assigned.get(pk)
+            assigned[pk] = tutor_pk
+            owner[tutor_pk] = pk
+            tutor_pk = previous
+
+
+def find_assignments(bookings, tutors, max_rate=None):
+    """
+    Match bookings to tutors, returning ({booking pk: tutor}, [unassignable bookings]).
+
+    A tutor can take any number of bookings whose series don't overlap.
+    Bookings are split into groups that overlap nothing outside the group,
+    and each group is matched on its own. In a group where every booking
+    overlaps every other, such as the bookings of one time slot, a tutor can
+    take at most one, so the group is solved exactly as a min-cost bipartite
+    matching: as many bookings as possible are filled, at the lowest total
+    rate. A group whose bookings only overlap in a chain could give a tutor
+    several of them, which a bipartite matching can't model, so it is
+    matched heuristically instead, along augmenting paths with the
+    most-constrained booking and the cheapest tutor first. That fills such
+    groups well in practice, but guarantees neither the most bookings filled
+    nor the lowest cost.
+    """
+    slots = {}
+    candidates = {}
+    unassignable = []
+    tutors_by_pk = {tutor.pk: tutor for tutor in tutors}
+    for booking in bookings:
+        try:
+            compatible = [
+                tutors_by_pk[pk] for pk in tutor_capabilities.get_candidate_ids(booking.lang, booking.day)
+                if pk in tutors_by_pk and (max_rate is None or tutors_by_pk[pk].rate <= max_rate)
+            ]
+            slots[booking.pk] = _BookingSlot(booking)
+            busy_tutor_ids = get_busy_tutor_ids(compatible, booking) if compatible else set()
+        except ValueError:
+            #outside every term or in an unsupported language, so no series can be created for it
+            unassignable.append(booking)
+            continue
+        candidates[booking.pk] = sorted(
+            (tutor for tutor in compatible if tutor.pk not in busy_tutor_ids),
+            key=lambda tutor: (tutor.rate, tutor.pk),
+        )
+
+    assigned = {}
+    chained = []
+    for pks, all_overlap in _get_conflict_groups(list(candidates), slots):
+        if all_overlap:
+            assigned.update(_min_cost_matching(pks, candidates))
+        else:
+            chained.extend(pks)
+
+    #bookings in different groups never overlap, so the chained groups can share one heuristic pass
+    tutor_load = defaultdict(list)
+
+    def try_assign(booking_pk, path):
+        #path holds the tutors whose bookings are being moved to make room, so a move never loops back
+        for tutor in candidates[booking_pk]:
+            if tutor.pk in path:
+                continue
+            clashes = [other for other in tutor_load[tutor.pk] if slots[booking_pk].overlaps(slots[other])]
+            if len(clashes) > 1:
+                continue
+            if clashes:
+                #try to move the single clashing booking to another tutor
+                other = clashes[0]
+                tutor_load[tutor.pk].remove(other)
+                del assigned[other]
+                if not try_assign(other, path | {tutor.pk}):
+                    tutor_load[tutor.pk].append(other)
+                    assigned[other] = tutor
+                    continue
+            tutor_load[tutor.pk].append(booking_pk)
+            assigned[booking_pk] = tutor
+            return True
+        return False
+
+    #a move can free a tutor for a booking that failed earlier in the pass, so pass again until nothing changes
+    order = sorted(chained, key=lambda pk: (len(candidates[pk]), pk))
+    while True:
+        newly_assigned = [booking_pk for booking_pk in order if booking_pk not in assigned and try_assign(booking_pk, frozenset())]
+        if not newly_assigned:
+            break
+
+    unassigned = unassignable + [booking for booking in bookings if booking.pk in candidates and booking.pk not in assigned]
+    return assigned, unassigned
+
+
+def commit_assignments(assignments, generations=None):
+    """
+    Create the lesson series of every (booking, tutor) assignment that can still be made, in bulk.
+
+    Meant to run as one write unit: a booking assigned elsewhere since the
+    matching was found, or a tutor booked for an overlapping lesson since,
+    is skipped, as assign_booking would refuse it. The overlap checks are
+    skipped if generations, the lesson generations taken before matching,
+    show no lesson has been written since. Returns the assignments that
+    were made.
+    """
+    open_pks = set(
+        Booking.objects.filter(pk__in=[booking.pk for booking, tutor in assignments], status="OPEN")
+        .values_list("pk", flat=True)
+    )
+    unchanged = generations is not None and generations == queryset_cache.get_generations(*LESSON_MODELS)
+    committed = [
+        (booking, tutor) for booking, tutor in assignments
+        if booking.pk in open_pks and (unchanged or tutor.pk not in get_busy_tutor_ids([tutor], booking))
+    ]
+    if committed:
+        LessonSeries.objects.bulk_create([
+            LessonSeries.from_booking(booking, tutor, get_term_end_date(booking))
+            for booking, tutor in committed
+        ])
+        #the OPEN bookings are replaced by their series
+        Booking.objects.filter(pk__in=[booking.pk for booking, tutor in committed]).delete()
+        invalidate_dashboards([], [tutor.pk for booking, tutor in committed])
+        queryset_cache.bump(LessonSeries)
+    return committed
+
+
+def auto_assign(bookings=None, max_rate=None, commit=True):
+    """Assign tutors to every OPEN booking that can be filled, and create their lesson series in bulk."""
+    started = perf_counter()
+    if bookings is None:
+        bookings = Booking.objects.filter(status="OPEN")
+    bookings = list(bookings.filter(status="OPEN").order_by("pk"))
+    tutors = list(Tutor.objects.all())
+
+    generations = queryset_cache.get_generations(*LESSON_MODELS)
+    assigned, unassigned = find_assignments(bookings, tutors, max_rate)
+    bookings_by_pk = {booking.pk: booking for booking in bookings}
+    assignments = [(bookings_by_pk[pk], tutor) for pk, tutor in assigned.items()]
+
+    if commit and assignments:
+        committed = run_write(commit_assignments, assignments, generations)
+        committed_pks = {booking.pk for booking, tutor in committed}
+        unassigned += [booking for booking, tutor in assignments if booking.pk not in committed_pks]
+        assignments = committed
+
+    return AssignmentReport(assignments, unassigned, perf_counter() - started)
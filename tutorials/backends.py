@@ -0,0 +1,37 @@
+from django.contrib.auth.backends import ModelBackend
+from tutorials.models import User
+
+
+class ProfileBackend(ModelBackend):
+    """
+    ModelBackend that loads users together with their student, tutor and admin profiles.
+
+    The profiles are joined into the query that loads request.user, so role
+    checks and profile lookups on it never query again, and a missing profile
+    is known without one: hasattr(user, "tutor_profile") is free.
+    """
+
+    def get_queryset(self):
+        return User._default_manager.select_related(*User.PROFILE_FIELDS)
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = self.get_queryset().get(**{User.USERNAME_FIELD: username})
+        except User.DoesNotExist:
+            #hash anyway, so unknown usernames take as long as wrong passwords
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        try:
+            user = self.get_queryset().get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,97 @@
+import logging
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from threading import Barrier, Thread
+from time import perf_counter
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+#what the benchmarked students post to create_booking
+BOOKING_DATA = {'day': 'Monday', 'time': '10:00', 'frequency': 'weekly', 'duration': 'short', 'lang': 'Python'}
+
+
+def quiet_request_log():
+    """Keep the per-request log lines out of a benchmark's report, as they would drown it."""
+    logging.getLogger('tutorials.performance').setLevel(logging.WARNING)
+
+
+def seed_for_concurrency(random_seed):
+    """Seed the throwaway database with the dataset the concurrent client benchmarks run against."""
+    call_command('seed', users=200, tutors=20, bookings=400, lessons=200, random_seed=random_seed, stdout=StringIO())
+
+
+@contextmanager
+def throwaway_database(threaded=False):
+    """
+    Swap every database for a fresh test database for the duration of the block.
+
+    Benchmarks must never touch the development databases, including the
+    bookkeeping, tenant and replica ones. Threaded ones get SQLite files,
+    as every thread opens its own connection and an in-memory test
+    database can't be shared between them.
+    """
+    setup_test_environment()
+    old_names = {}
+    with TemporaryDirectory() as directory:
+        try:
+            for alias in connections:
+                connection = connections[alias]
+                names = (connection.settings_dict['NAME'], connection.settings_dict['TEST'].get('NAME'))
+                if threaded:
+                    connection.settings_dict['TEST']['NAME'] = str(Path(directory) / f'{alias}.sqlite3')
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                old_names[alias] = names
+            yield
+        finally:
+            connections.close_all()
+            for alias, (old_name, old_test_name) in old_names.items():
+                connection = connections[alias]
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                connection.settings_dict['TEST']['NAME'] = old_test_name
+            teardown_test_environment()
+
+
+def run_threads(prepares):
+    """
+    Run one thread per prepare function and return (their results, elapsed seconds).
+
+    Each thread calls its prepare(), e.g. to log a client in, then waits for
+    the others, so only the work returned by prepare() is timed. Threads
+    close their database connections when they finish.
+    """
+    results = [None] * len(prepares)
+    start = Barrier(len(prepares) + 1)
+
+    def run(index):
+        try:
+            work = prepares[index]()
+        except BaseException:
+            #release everyone waiting on the barrier instead of leaving them hanging
+            start.abort()
+            raise
+        try:
+            start.wait()
+            results[index] = work()
+        finally:
+            connections.close_all()
+
+    threads = [Thread(target=run, args=(index,)) for index in range(len(prepares))]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = perf_counter()
+    for thread in threads:
+        thread.join()
+    return results, perf_counter() - started
+
+
+def get_percentiles(timings):
+    """p50 and p95 of timings in seconds, in milliseconds."""
+    if len(timings) < 2:
+        return 0.0, 0.0
+    percentiles = quantiles(timings, n=100)
+    return percentiles[49] * 1000, percentiles[94] * 1000
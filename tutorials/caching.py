@@ -0,0 +1,259 @@
+from hashlib import md5
+from time import time_ns
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from tutorials.tenants import get_current_tenant, get_tenant_database, get_tenant_prefix
+
+_MISSING = object()
+
+
+class _PendingWrites:
+    """
+    Names written to inside transactions that haven't committed yet.
+
+    A write stays pending for as long as the on_commit callback registered
+    with it is queued: Django runs the callback when the write commits and
+    drops it when the write is rolled back, including to a savepoint. A
+    released savepoint keeps its callbacks, as its writes can still be
+    rolled back with the enclosing transaction.
+
+    Writes are tracked per connection, i.e. per thread and per tenant
+    database, as only the connection that made them can see them before
+    they commit.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+
+    def add(self, names, on_commit):
+        """Record writes to names, and run on_commit if the transaction commits."""
+        using = get_tenant_database()
+        connection = connections[using]
+        if not connection.in_atomic_block:
+            return
+
+        #a function of its own, so this write's callback can be told apart from the others
+        def committed():
+            for name in names:
+                self._discard((connection, name), committed)
+            on_commit()
+
+        transaction.on_commit(committed, using=using)
+        for name in names:
+            self._prune((connection, name))
+            self._callbacks.setdefault((connection, name), []).append(committed)
+
+    def _discard(self, key, callback):
+        callbacks = self._callbacks.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._callbacks.pop(key, None)
+
+    def _prune(self, key):
+        """Forget the writes that were rolled back."""
+        connection, name = key
+        queued = {func for sids, func, robust in connection.run_on_commit}
+        for callback in list(self._callbacks.get(key, [])):
+            if callback not in queued:
+                self._discard(key, callback)
+
+    def __contains__(self, name):
+        key = (connections[get_tenant_database()], name)
+        if key not in self._callbacks:
+            return False
+        self._prune(key)
+        return key in self._callbacks
+
+
+class ProcessLocalCache:
+    """
+    A value built from the database and kept in memory until invalidate() is called.
+
+    Subclasses implement build(). Writes inside a transaction invalidate
+    straight away, but since a rollback would undo the write without telling
+    us, the value is rebuilt on every get() until the write commits. Each
+    tenant has a value of its own.
+
+    invalidate() only reaches the process it runs in, so the value is also
+    kept under the queryset_cache generations of the models it is built
+    from, and rebuilt once a write in any process has moved them on.
+    """
+
+    #the models build() reads
+    models = ()
+
+    def __init__(self):
+        self._values = {}
+        self._pending = _PendingWrites()
+
+    def build(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        """Drop the cached value, e.g. from a post_save or post_delete receiver."""
+        tenant = get_current_tenant()
+        self._values.pop(tenant, None)
+        self._pending.add([tenant], lambda: self._values.pop(tenant, None))
+        if self.models:
+            #tell the other processes
+            queryset_cache.bump(*self.models)
+
+    def get(self):
+        tenant = get_current_tenant()
+        #read before building, so a write made during the build moves them past the stored ones
+        generations = queryset_cache.get_generations(*self.models)
+        entry = self._values.get(tenant)
+        if entry is not None and entry[0] == generations:
+            return entry[1]
+        value = self.build()
+        if tenant not in self._pending:
+            self._values[tenant] = (generations, value)
+        return value
+
+
+class SharedCache:
+    """
+    Values kept in Django's cache under prefix:version:key, with the same rollback safety.
+
+    Keys invalidated inside a transaction are deleted straight away and again
+    on commit, and aren't stored again until the write commits, so a
+    rollback can't leave an entry built from rows that no longer exist.
+    invalidate_all() moves every key to a new version. Keys are scoped to
+    the active tenant.
+    """
+
+    ALL = "*"
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._pending = _PendingWrites()
+
+    def _version(self):
+        return cache.get_or_set(f"{get_tenant_prefix(self.prefix)}:version", 1, timeout=None)
+
+    def _key(self, key):
+        return f"{get_tenant_prefix(self.prefix)}:{self._version()}:{key}"
+
+    def get(self, key, build, timeout):
+        """The value cached under key, or build()'s result, cached for timeout(value) seconds."""
+        value = cache.get(self._key(key))
+        if value is None:
+            value = build()
+            if key not in self._pending and self.ALL not in self._pending:
+                cache.set(self._key(key), value, timeout(value))
+        return value
+
+    def invalidate(self, *keys):
+        """Drop the values cached under keys, e.g. from a post_save or post_delete receiver."""
+        delete = lambda: cache.delete_many([self._key(key) for key in keys])
+        delete()
+        self._pending.add(keys, delete)
+
+    def invalidate_all(self):
+        """Drop every value, e.g. after a bulk write that sent no signals."""
+        bump = lambda: cache.set(f"{get_tenant_prefix(self.prefix)}:version", self._version() + 1, timeout=None)
+        bump()
+        self._pending.add([self.ALL], bump)
+
+
+class GenerationalCache:
+    """
+    Evaluated querysets kept in Django's cache under the generations of the models they read.
+
+    Every write to a model bumps its generation, which is part of the key of
+    every entry built from it, so invalidation is one counter increment and
+    no key is tracked: stale entries are never looked up again and simply
+    expire. Writes inside a transaction bump again on commit, and nothing
+    built from the model is stored until they commit. Generations and
+    entries are scoped to the active tenant.
+    """
+
+    ALL = "*"
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._pending = _PendingWrites()
+
+    def _generation_key(self, label):
+        return f"{get_tenant_prefix(self.prefix)}:generation:{label}"
+
+    def _get_generations(self, labels):
+        keys = [self._generation_key(label) for label in labels]
+        generations = cache.get_many(keys)
+        #start unseen or evicted counters somewhere new, so old entries can't match them again
+        missing = {key: time_ns() for key in keys if key not in generations}
+        if missing:
+            cache.set_many(missing, timeout=None)
+            generations.update(missing)
+        return [generations[key] for key in keys]
+
+    def get_generations(self, *models):
+        """The current generations of models, and of every model, to tell whether a value built from them is stale."""
+        labels = [self.ALL, *sorted(model._meta.label for model in models)]
+        return tuple(self._get_generations(labels))
+
+    def get(self, key, models, build, timeout=DEFAULT_TIMEOUT):
+        """The value cached under key for the current generations of models, or build()'s result."""
+        labels = [self.ALL, *sorted(model._meta.label for model in models)]
+        generations = ".".join(str(generation) for generation in self.get_generations(*models))
+        cache_key = f"{get_tenant_prefix(self.prefix)}:{key}:{generations}"
+        value = cache.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = build()
+        if not any(label in self._pending for label in labels):
+            cache.set(cache_key, value, timeout)
+        return value
+
+    def get_list(self, queryset, *models, timeout=DEFAULT_TIMEOUT):
+        """The rows of queryset, cached under its SQL and the generations of its model and any joined models."""
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            #e.g. pk__in=[], which never runs a query
+            return []
+        key = f"{queryset.model._meta.label}:{md5(sql.encode()).hexdigest()}"
+        return self.get(key, [queryset.model, *models], lambda: list(queryset), timeout)
+
+    def bump(self, *models):
+        """Move models, or every model if none are given, to a new generation."""
+        labels = [model._meta.label for model in models] or [self.ALL]
+        def bump():
+            for label in labels:
+                key = self._generation_key(label)
+                cache.add(key, time_ns(), timeout=None)
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    #evicted in between
+                    cache.add(key, time_ns(), timeout=None)
+        bump()
+        self._pending.add(labels, bump)
+
+    def get_stats(self):
+        """Hits and misses since the process started."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+#tutor, booking and user lookups shared by views and forms
+queryset_cache = GenerationalCache("queryset")
+
+
+def invalidate_all_caches():
+    """Drop every cache built from the database, e.g. after writes that sent no signals."""
+    #these caches are built on the classes above
+    from tutorials.capabilities import tutor_capabilities
+    from tutorials.dashboard_cache import invalidate_all_dashboards
+    from tutorials.term_calendar import term_calendar
+    tutor_capabilities.invalidate()
+    term_calendar.invalidate_closures()
+    invalidate_all_dashboards()
+    queryset_cache.bump()
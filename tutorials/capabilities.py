@@ -0,0 +1,63 @@
+from tutorials.caching import ProcessLocalCache
+from tutorials.models import Tutor
+
+LANGUAGES = ["Python", "Java", "Ruby", "C", "SQL"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def get_bit(lang, day):
+    """Position of the language/day pair in a tutor's capability bitset."""
+    if lang not in LANGUAGES:
+        raise ValueError(f"Unsupported language: {lang}")
+    if day not in DAYS:
+        raise ValueError(f"Unsupported day: {day}")
+    return LANGUAGES.index(lang) * len(DAYS) + DAYS.index(day)
+
+
+class TutorCapabilityMatrix(ProcessLocalCache):
+    """
+    Process-local index of which tutors teach which language on which day.
+
+    Each tutor is a 5 language x 7 day bitset, and every bit maps to the
+    tutors that have it set, so candidates for a booking are a dict lookup.
+    The index is built on first use and dropped whenever a Tutor is saved or
+    deleted (see tutorials.signals), in this process or, through the Tutor
+    generation, in any other. Bulk updates bypass those signals, so callers
+    doing them must call invalidate() themselves.
+    """
+
+    models = (Tutor,)
+
+    def build(self):
+        fields = [f"specializes_in_{lang.lower()}" for lang in LANGUAGES]
+        fields += [f"available_{day.lower()}" for day in DAYS]
+        bitsets = {}
+        index = {bit: [] for bit in range(len(LANGUAGES) * len(DAYS))}
+        for pk, *flags in Tutor.objects.order_by("pk").values_list("pk", *fields):
+            specialties, availability = flags[:len(LANGUAGES)], flags[len(LANGUAGES):]
+            bitset = 0
+            for lang_index, teaches in enumerate(specialties):
+                for day_index, available in enumerate(availability):
+                    if teaches and available:
+                        bit = lang_index * len(DAYS) + day_index
+                        bitset |= 1 << bit
+                        index[bit].append(pk)
+            bitsets[pk] = bitset
+        return bitsets, {bit: tuple(pks) for bit, pks in index.items()}
+
+    def get_candidate_ids(self, lang, day):
+        """Primary keys of the tutors who teach lang and are available on day, in order."""
+        bit = get_bit(lang, day)
+        return self.get()[1][bit]
+
+    def get_candidates(self, lang, day):
+        """Queryset of the tutors who teach lang and are available on day, as AssignTutorForm takes."""
+        return Tutor.objects.filter(pk__in=self.get_candidate_ids(lang, day))
+
+    def can_teach(self, tutor_id, lang, day):
+        """Whether the tutor teaches lang and is available on day."""
+        bit = get_bit(lang, day)
+        return bool(self.get()[0].get(tutor_id, 0) >> bit & 1)
+
+
+tutor_capabilities = TutorCapabilityMatrix()
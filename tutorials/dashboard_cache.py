@@ -0,0 +1,47 @@
+from math import ceil
+from django.conf import settings
+from django.utils import timezone
+from tutorials.caching import SharedCache
+from tutorials.models import Lesson, LessonSeries
+
+#schedules shown on the student and tutor dashboards, keyed by role and user
+dashboard_cache = SharedCache("dashboard")
+
+
+def get_dashboard(user, role, build):
+    """The dashboard data of user, built by build() on a miss and kept until the next lesson starts."""
+    return dashboard_cache.get(f"{role}:{user.pk}", build, get_timeout)
+
+
+def get_timeout(dashboard):
+    """Seconds until the next upcoming lesson becomes a previous one, at most DASHBOARD_CACHE_TIMEOUT."""
+    timeout = settings.DASHBOARD_CACHE_TIMEOUT
+    upcoming = dashboard["upcoming_schedule"]
+    if upcoming:
+        timeout = min(timeout, (upcoming[0].booking.start_at - timezone.now()).total_seconds())
+    return max(ceil(timeout), 1)
+
+
+def invalidate_dashboards(student_ids=(), tutor_ids=()):
+    """Drop the cached dashboards of the given students and tutors."""
+    keys = [f"student:{pk}" for pk in set(student_ids)] + [f"tutor:{pk}" for pk in set(tutor_ids)]
+    if keys:
+        dashboard_cache.invalidate(*keys)
+
+
+def invalidate_tutor_dashboards(tutor_id):
+    """Drop the dashboards of a tutor and of every student they teach, which show their name and rate."""
+    student_ids = set(Lesson.objects.filter(tutor_id=tutor_id).values_list("booking__student_id", flat=True))
+    student_ids.update(LessonSeries.objects.filter(tutor_id=tutor_id).values_list("student_id", flat=True))
+    invalidate_dashboards(student_ids, [tutor_id])
+
+
+def invalidate_student_dashboards(student_id):
+    """Drop the dashboards of a student and of every tutor teaching them, which show their name and level."""
+    tutor_ids = set(Lesson.objects.filter(booking__student_id=student_id).values_list("tutor_id", flat=True))
+    tutor_ids.update(LessonSeries.objects.filter(student_id=student_id).values_list("tutor_id", flat=True))
+    invalidate_dashboards([student_id], tutor_ids)
+
+
+def invalidate_all_dashboards():
+    dashboard_cache.invalidate_all()
@@ -1,8 +1,7 @@
 from datetime import date, timedelta, time
-from dateutil import easter
-from dateutil.relativedelta import relativedelta, MO, SU
 from django import forms
 from tutorials.models.booking_model import Booking
+from tutorials.term_calendar import term_calendar
 
 class BookingForm(forms.ModelForm):
     """A model-form for bookings."""
@@ -29,30 +28,7 @@ class BookingForm(forms.ModelForm):
         return booking_time
 
     def get_term_dates(self, year):
-        #calculate Easter Sunday
-        easter_date = easter.easter(year)
-
-        #Term 1: First Monday in January to the Sunday before Easter
-        first_monday_jan = date(year, 1, 1) + relativedelta(weekday=MO(+1))
-        term_1_end = easter_date - timedelta(days=easter_date.weekday() + 1)  # Ensure it ends on a Sunday
-
-        #Term 2: First Monday 2 weeks after Term 1 ends to the Sunday before July 18th (approximate end)
-        term_2_start = term_1_end + timedelta(weeks=2)
-        term_2_start = term_2_start + relativedelta(weekday=MO(+1))
-        july_18 = date(year, 7, 18)
-        term_2_end = july_18 + relativedelta(weekday=SU(-1))  # Ensure it ends on a Sunday
-
-        #Term 3: First Monday in September to the Sunday 2 weeks before Term 1 (next year) starts
-        first_monday_sep = date(year, 9, 1) + relativedelta(weekday=MO(+1))
-        first_monday_jan_next = date(year+1, 1, 1) + relativedelta(weekday=MO(+1))
-        term_3_end = first_monday_jan_next - timedelta(weeks=2)  # Two weeks before Term 1 starts
-        term_3_end = term_3_end + relativedelta(weekday=SU(-1))  # Ensure it ends on a Sunday
-
-        return {
-            "Term 1": (first_monday_jan, term_1_end),
-            "Term 2": (term_2_start, term_2_end),
-            "Term 3": (first_monday_sep, term_3_end),
-        }
+        return term_calendar.get_terms(year)
 
     def find_first_matching_date(self, term_dates, selected_day_number):
         # finds the first occurrence of the selected day in the given terms
@@ -61,6 +37,9 @@ class BookingForm(forms.ModelForm):
                 #finds the first occurrence of the selected day in the term
                 days_ahead = (selected_day_number - start_date.weekday() + 7) % 7
                 first_matching_date = start_date + timedelta(days=days_ahead)
+                #skip weeks on which the term is closed
+                while start_date <= first_matching_date <= end_date and term_calendar.is_closed(first_matching_date):
+                    first_matching_date += timedelta(weeks=1)
 
                 #check if the matching date falls within the term
                 if start_date <= first_matching_date <= end_date:
@@ -71,7 +50,6 @@ class BookingForm(forms.ModelForm):
 
     def clean_day(self):
         selected_day = self.cleaned_data.get('day')
-        term_dates = self.get_term_dates(date.today().year)
 
         if not selected_day:
             raise forms.ValidationError("Day is Required.")
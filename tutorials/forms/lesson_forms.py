@@ -1,5 +1,7 @@
 from django import forms
+from tutorials.caching import queryset_cache
 from tutorials.models.tutor_model import Tutor
+from tutorials.models.user_models import User
 
 class AssignTutorForm(forms.Form):
     """A form to assign a tutor to a booking."""
@@ -12,8 +14,15 @@ class AssignTutorForm(forms.Form):
         #dynamically set tutors if provided
         tutors = kwargs.pop('tutors', Tutor.objects.none())
         super().__init__(*args, **kwargs)
+        #labels show each tutor's name, so load the users with the tutors
+        tutors = tutors.select_related('user')
         self.fields['tutor'].queryset = tutors
         self.fields['tutor'].label_from_instance = lambda obj: f"{obj.user.first_name} {obj.user.last_name}"
+        #the same tutors are offered again and again, so their rows come from the cache
+        self.tutors = queryset_cache.get_list(tutors, User)
+        self.fields['tutor'].choices = [('', self.fields['tutor'].empty_label)] + [
+            (tutor.pk, self.fields['tutor'].label_from_instance(tutor)) for tutor in self.tutors
+        ]
 
     def clean(self):
         cleaned_data = super().clean()
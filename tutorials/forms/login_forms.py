@@ -109,22 +109,21 @@ class StudentSignUpForm(NewPasswordMixin, forms.ModelForm):
         fields = ['first_name', 'last_name', 'username', 'email', 'level']
 
     def save(self, commit=True):
-        """Create a new user."""
+        """Create a new user, or with commit=False only build them, password hashed, for save_user."""
         # Create the user object first
         user = super().save(commit=False)
         user.set_password(self.cleaned_data.get('new_password'))  # Set the password securely
+        user.role = 'student'
 
         # Save the user object
         if commit:
-            user.save()
+            self.save_user(user)
+        return user
 
-        # Set the role after the user is created
-        role = self.cleaned_data.get('role')
-        level = self.cleaned_data.get('level')
-        user.role = 'student'
+    def save_user(self, user):
+        """Insert a user built by save(commit=False), and their Student profile."""
         user.save()
-
-
+        level = self.cleaned_data.get('level')
         Student.objects.create(user=user, level=level)
 
         return user
@@ -168,21 +167,25 @@ class TutorSignUpForm(NewPasswordMixin, forms.ModelForm):
                   'available_monday', 'available_tuesday', 'available_wednesday', 'available_thursday', 'available_friday', 'available_saturday', 'available_sunday', 'rate']
 
     def save(self, commit=True):
-        """Create a new user."""
+        """Create a new user, or with commit=False only build them, password hashed, for save_user."""
         # Create the user object first
         user = super().save(commit=False)
         user.set_password(self.cleaned_data.get('new_password'))  # Set the password securely
+        user.role = 'tutor'
 
         # Save the user object
         if commit:
-            user.save()
+            self.save_user(user)
+        return user
+
+    def save_user(self, user):
+        """Insert a user built by save(commit=False), and their Tutor profile."""
+        user.save()
 
         MAP = {
             "Yes" : True, "No" : False
         }
 
-        # Set the role after the user is created
-        role = self.cleaned_data.get('role')
         specializes_in_Python = MAP.get(self.cleaned_data.get('specializes_in_python'))
         specializes_in_Java = MAP.get(self.cleaned_data.get('specializes_in_java'))
         specializes_in_C = MAP.get(self.cleaned_data.get('specializes_in_c'))
@@ -196,8 +199,6 @@ class TutorSignUpForm(NewPasswordMixin, forms.ModelForm):
         available_Saturday = MAP.get(self.cleaned_data.get('available_saturday'))
         available_Sunday = MAP.get(self.cleaned_data.get('available_sunday'))
         rate = self.cleaned_data.get('rate') 
-        user.role = 'tutor'
-        user.save()
 
         Tutor.objects.create(
             user=user, 
@@ -229,7 +230,7 @@ class AdminSignUpForm(NewPasswordMixin, forms.ModelForm):
         fields = ['first_name', 'last_name', 'username', 'email']
 
     def save(self, commit=True):
-        """Create a new admin user."""
+        """Create a new admin user, or with commit=False only build them, password hashed, for save_user."""
         # Create the user object first
         user = super().save(commit=False)
         user.set_password(self.cleaned_data.get('new_password'))  # Set the password securely
@@ -237,13 +238,15 @@ class AdminSignUpForm(NewPasswordMixin, forms.ModelForm):
         # Set the user as admin
         user.is_staff = True
         user.is_superuser = True
+        user.role = 'admin'
 
         # Save the user object
         if commit:
-            user.save()
+            self.save_user(user)
+        return user
 
-        # Set the role after the user is created
-        user.role = 'admin'
+    def save_user(self, user):
+        """Insert an admin user built by save(commit=False), and their Admin profile."""
         user.save()
 
         # Create an associated Admin object (if you have an Admin model)
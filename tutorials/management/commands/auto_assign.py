@@ -0,0 +1,22 @@
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from tutorials.auto_assign import auto_assign
+
+
+class Command(BaseCommand):
+    """Assign tutors to all OPEN bookings at once."""
+
+    help = 'Matches OPEN bookings to compatible tutors and creates their lesson series'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-rate', type=Decimal, help='Only assign tutors charging at most this hourly rate')
+        parser.add_argument('--dry-run', action='store_true', help='Report the matching without saving it')
+
+    def handle(self, *args, **options):
+        report = auto_assign(max_rate=options['max_rate'], commit=not options['dry_run'])
+
+        for booking, tutor in report.assignments:
+            self.stdout.write(f"Booking #{booking.id} ({booking.lang} on {booking.day}) -> Tutor #{tutor.pk} at {tutor.rate}")
+        for booking in report.unassigned:
+            self.stdout.write(f"Booking #{booking.id} ({booking.lang} on {booking.day}) could not be assigned")
+        self.stdout.write(str(report))
@@ -0,0 +1,155 @@
+import json
+import tracemalloc
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from tutorials.benchmarking import BOOKING_DATA, quiet_request_log, throwaway_database
+from tutorials.caching import queryset_cache
+from tutorials.models import Admin, Booking, Lesson, Student, Tutor
+from tutorials.performance import RequestTimings
+
+
+class Command(BaseCommand):
+    """Benchmark the hot pages against seeded databases of several sizes."""
+
+    help = 'Seeds a throwaway database at each scale and reports latency, queries and memory per view'
+
+    SCALES = [1000, 10000, 100000]
+    REQUESTS = 30
+    THRESHOLD = 0.2
+    METRICS = ['p50_ms', 'p95_ms', 'p99_ms', 'queries', 'sql_ms', 'peak_kb']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=self.SCALES, help='Lessons to seed for each run')
+        parser.add_argument('--requests', type=int, default=self.REQUESTS, help='Timed requests per view')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed passed on to the seed command')
+        parser.add_argument('--output', default='bench_report.json', help='Where to write the JSON report')
+        parser.add_argument('--baseline', help='Earlier report to compare against')
+        parser.add_argument('--threshold', type=float, default=self.THRESHOLD, help='Relative increase reported as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error if anything regressed')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError("--requests must be at least 2 to compute percentiles.")
+        baseline = self.load_baseline(options['baseline'])
+        quiet_request_log()
+        self.regressions = 0
+
+        with throwaway_database():
+            report = {'created': datetime.now().isoformat(timespec='seconds'), 'scales': {}, 'queryset_cache': {}}
+            for scale in options['scales']:
+                self.seed(scale, options['random_seed'])
+                queryset_cache.hits = queryset_cache.misses = 0
+                results = self.run_views(options['requests'])
+                report['scales'][str(scale)] = results
+                report['queryset_cache'][str(scale)] = stats = queryset_cache.get_stats()
+                self.write_results(scale, results, baseline.get('scales', {}).get(str(scale), {}), options['threshold'])
+                self.stdout.write(f"queryset cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})")
+
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"Wrote {options['output']}")
+        if self.regressions and options['fail_on_regression']:
+            raise CommandError(f"{self.regressions} metrics regressed by more than {options['threshold']:.0%}.")
+
+    def load_baseline(self, path):
+        if not path:
+            return {}
+        try:
+            return json.loads(Path(path).read_text())
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Could not read baseline {path}: {error}")
+
+    def seed(self, lessons, random_seed):
+        """Replace the data with a dataset of the given number of lessons."""
+        started = perf_counter()
+        call_command('unseed', stdout=StringIO())
+        users = max(lessons // 2, 50)
+        call_command(
+            'seed',
+            users=users,
+            tutors=max(users // 20, 5),
+            bookings=lessons * 2,
+            lessons=lessons,
+            random_seed=random_seed,
+            batch_size=5000,
+            stdout=StringIO(),
+        )
+        self.stdout.write(f"Seeded {Lesson.objects.count()} lessons in {perf_counter() - started:.1f}s")
+
+    def get_requests(self):
+        """(name, user, method, url, data) for every benchmarked view."""
+        student = Student.objects.annotate(lesson_count=Count('bookings__lesson')).order_by('-lesson_count').first()
+        tutor = Tutor.objects.annotate(lesson_count=Count('lesson')).order_by('-lesson_count').first()
+        admin = Admin.objects.first()
+        lesson = Lesson.objects.order_by('pk').first()
+        booking = Booking.objects.filter(status='OPEN').order_by('pk').first()
+
+        requests = [
+            ('student_dashboard', student.user, 'get', reverse('student_dashboard'), None),
+            ('tutor_dashboard', tutor.user, 'get', reverse('tutor_dashboard'), None),
+            ('create_booking', student.user, 'get', reverse('create_booking'), None),
+            ('create_booking_post', student.user, 'post', reverse('create_booking'), BOOKING_DATA),
+        ]
+        for name in ['manage_users', 'manage_students', 'manage_tutors', 'manage_admins', 'manage_bookings', 'manage_lessons']:
+            requests.append((name, admin.user, 'get', reverse(name), None))
+        if booking:
+            requests.append(('assign_tutor', admin.user, 'get', reverse('assign_tutor', args=[booking.pk]), None))
+        if lesson:
+            requests.append(('get_lesson', admin.user, 'get', reverse('get_lesson', args=[lesson.pk]), None))
+        return requests
+
+    def run_views(self, count):
+        results = {}
+        for name, user, method, url, data in self.get_requests():
+            client = Client()
+            client.force_login(user)
+            send = getattr(client, method)
+            #warm up caches and the template loader
+            send(url, data)
+
+            timings, timer = [], RequestTimings()
+            with connection.execute_wrapper(timer):
+                for _ in range(count):
+                    started = perf_counter()
+                    response = send(url, data)
+                    timings.append(perf_counter() - started)
+            if response.status_code >= 400:
+                raise CommandError(f"{name} returned {response.status_code}")
+
+            #tracing slows every allocation down, so memory is measured on a separate request
+            tracemalloc.start()
+            send(url, data)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            percentiles = quantiles(timings, n=100)
+            results[name] = {
+                'p50_ms': round(percentiles[49] * 1000, 2),
+                'p95_ms': round(percentiles[94] * 1000, 2),
+                'p99_ms': round(percentiles[98] * 1000, 2),
+                'queries': timer.queries // count,
+                'sql_ms': round(timer.db_seconds / count * 1000, 2),
+                'peak_kb': round(peak / 1024),
+            }
+        return results
+
+    def write_results(self, scale, results, baseline, threshold):
+        self.stdout.write(f"\n{scale} lessons")
+        self.stdout.write(f"{'view':<20}" + ''.join(f"{metric:>10}" for metric in self.METRICS))
+        for name, metrics in results.items():
+            self.stdout.write(f"{name:<20}" + ''.join(f"{metrics[metric]:>10}" for metric in self.METRICS))
+            for metric in self.METRICS:
+                before = baseline.get(name, {}).get(metric)
+                if before and metrics[metric] > before * (1 + threshold):
+                    self.regressions += 1
+                    self.stdout.write(self.style.WARNING(
+                        f"  regression: {name} {metric} {before} -> {metrics[metric]}"
+                    ))
@@ -0,0 +1,78 @@
+from statistics import median
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tutorials.models import User, Student, Tutor, Booking
+from tutorials.term_calendar import term_calendar
+from tutorials.views.lesson_views import create_lesson_series
+
+
+class Rollback(Exception):
+    """Raised to discard everything the benchmark wrote."""
+
+
+class Command(BaseCommand):
+    """Benchmark tutor assignment latency for weekly and fortnightly series."""
+
+    help = 'Times creating lesson series for every term of a year, then rolls back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=2025, help='Year whose terms are benchmarked')
+        parser.add_argument('--repeat', type=int, default=20, help='Assignments timed per term and frequency')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['year'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, year, repeat):
+        student, tutor = self.create_participants()
+        term_dates = term_calendar.get_terms(year)
+
+        self.stdout.write(f"{'term':<8} {'frequency':<12} {'lessons':>7} {'series ms':>10}")
+        for term_name, (term_start, term_end) in term_dates.items():
+            for frequency in ('weekly', 'fortnightly'):
+                timings = []
+                for i in range(repeat):
+                    series, elapsed = self.time_assignment(student, tutor, term_start, frequency, i)
+                    timings.append(elapsed)
+                self.stdout.write(
+                    f"{term_name:<8} {frequency:<12} {len(series.get_dates()):>7} {median(timings):>10.2f}"
+                )
+
+    def time_assignment(self, student, tutor, term_start, frequency, i):
+        """Create an OPEN booking and time assigning tutor to it, in milliseconds."""
+        booking = Booking.objects.create(
+            student=student,
+            date=term_start,
+            time=f'{9 + i % 8}:00',
+            frequency=frequency,
+            day=term_start.strftime('%A'),
+        )
+        started = perf_counter()
+        with transaction.atomic():
+            result = create_lesson_series(booking, tutor)
+            booking.delete()
+        return result, (perf_counter() - started) * 1000
+
+    def create_participants(self):
+        student_user = User.objects.create(
+            username='@benchstudent',
+            email='bench.student@example.org',
+            first_name='Bench',
+            last_name='Student',
+            role='student',
+        )
+        tutor_user = User.objects.create(
+            username='@benchtutor',
+            email='bench.tutor@example.org',
+            first_name='Bench',
+            last_name='Tutor',
+            role='tutor',
+        )
+        student = Student.objects.create(user=student_user)
+        tutor = Tutor.objects.create(user=tutor_user, specializes_in_python=True, rate=30)
+        return student, tutor
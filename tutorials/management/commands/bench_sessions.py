@@ -0,0 +1,95 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.sessions.models import Session
+from django.db import connections, router
+from django.test import Client, override_settings
+from django.urls import reverse
+from tutorials.benchmarking import BOOKING_DATA, get_percentiles, quiet_request_log, run_threads, seed_for_concurrency, throwaway_database
+from tutorials.models import Student
+
+
+class SessionQueryCounter:
+    """execute_wrapper that counts the queries run against the session table."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'django_session' in sql:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    """Compare request throughput of concurrent clients under each session engine."""
+
+    help = 'Runs concurrent logged-in clients against a throwaway database once per session engine'
+
+    ENGINES = {
+        'db': 'django.contrib.sessions.backends.db',
+        'cached_db': 'django.contrib.sessions.backends.cached_db',
+        'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    }
+    THREADS = 8
+    REQUESTS = 50
+    #every Nth request creates a booking, so reads compete with writes for the SQLite lock
+    WRITE_EVERY = 5
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', choices=list(self.ENGINES), default=list(self.ENGINES))
+        parser.add_argument('--threads', type=int, default=self.THREADS, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=self.REQUESTS, help='Requests per client')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed passed on to the seed command')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['requests'] < 2:
+            raise CommandError("--threads must be at least 1 and --requests at least 2.")
+        quiet_request_log()
+
+        with throwaway_database(threaded=True):
+            seed_for_concurrency(options['random_seed'])
+            users = [student.user for student in Student.objects.select_related('user')[:options['threads']]]
+            self.stdout.write(f"{'engine':<16}{'req/s':>10}{'p50_ms':>10}{'p95_ms':>10}{'session_q':>12}{'errors':>8}")
+            for name in options['engines']:
+                with override_settings(SESSION_ENGINE=self.ENGINES[name]):
+                    result = self.run_clients(users, options['requests'])
+                self.stdout.write(
+                    f"{name:<16}{result['throughput']:>10.1f}{result['p50_ms']:>10.1f}"
+                    f"{result['p95_ms']:>10.1f}{result['session_queries']:>12}{result['errors']:>8}"
+                )
+
+    def run_clients(self, users, count):
+        """Send count requests from each user's client, in a thread per user."""
+
+        def prepare(user):
+            client = Client()
+            client.force_login(user)
+
+            def work():
+                counter, timings, errors = SessionQueryCounter(), [], 0
+                with connections[router.db_for_write(Session)].execute_wrapper(counter):
+                    for i in range(count):
+                        started = perf_counter()
+                        try:
+                            if i % self.WRITE_EVERY == self.WRITE_EVERY - 1:
+                                response = client.post(reverse('create_booking'), BOOKING_DATA)
+                            else:
+                                response = client.get(reverse('student_dashboard'))
+                            errors += response.status_code >= 400
+                        except Exception:
+                            #e.g. "database is locked" once the SQLite busy timeout runs out
+                            errors += 1
+                        timings.append(perf_counter() - started)
+                return timings, errors, counter.count
+            return work
+
+        results, elapsed = run_threads([lambda user=user: prepare(user) for user in users])
+        timings = [timing for thread_timings, errors, queries in results for timing in thread_timings]
+        p50, p95 = get_percentiles(timings)
+        return {
+            'throughput': len(timings) / elapsed,
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'session_queries': sum(queries for timings, errors, queries in results),
+            'errors': sum(errors for timings, errors, queries in results),
+        }
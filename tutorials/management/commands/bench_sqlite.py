@@ -0,0 +1,120 @@
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from tutorials.benchmarking import BOOKING_DATA, get_percentiles, quiet_request_log, run_threads, seed_for_concurrency, throwaway_database
+from tutorials.models import Admin, Student
+from tutorials.write_queue import get_write_queue, stop_write_queue
+
+
+class Command(BaseCommand):
+    """Stress the database with concurrent readers and writers, before and after the SQLite tuning."""
+
+    help = 'Runs concurrent admin readers and booking writers against a throwaway database once per SQLite profile'
+
+    #what a bare sqlite3 entry in DATABASES gets from SQLite and Python's sqlite3 module
+    DEFAULT_PRAGMAS = {
+        'journal_mode': 'delete',
+        'synchronous': 'full',
+        'busy_timeout': 5000,
+        'mmap_size': 0,
+        'cache_size': -2000,
+    }
+    #queued is tuned with the bookings sent through the write queue
+    PROFILES = ['default', 'tuned', 'queued']
+    READERS = 6
+    WRITERS = 2
+    REQUESTS = 50
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=self.PROFILES, default=self.PROFILES)
+        parser.add_argument('--readers', type=int, default=self.READERS, help='Concurrent admins listing bookings')
+        parser.add_argument('--writers', type=int, default=self.WRITERS, help='Concurrent students creating bookings')
+        parser.add_argument('--requests', type=int, default=self.REQUESTS, help='Requests per client')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed passed on to the seed command')
+
+    def handle(self, *args, **options):
+        if options['readers'] < 1 or options['writers'] < 1 or options['requests'] < 2:
+            raise CommandError("--readers and --writers must be at least 1, and --requests at least 2.")
+        quiet_request_log()
+
+        with throwaway_database(threaded=True):
+            seed_for_concurrency(options['random_seed'])
+            admins = [admin.user for admin in Admin.objects.select_related('user')]
+            students = [student.user for student in Student.objects.select_related('user')[:options['writers']]]
+            readers = [admins[i % len(admins)] for i in range(options['readers'])]
+
+            self.stdout.write(
+                f"{'profile':<10}{'reads/s':>10}{'read_p95':>10}{'writes/s':>10}{'write_p95':>11}{'errors':>8}"
+            )
+            for profile in options['profiles']:
+                result = self.run_profile(profile, readers, students, options['requests'])
+                self.stdout.write(
+                    f"{profile:<10}{result['reads']:>10.1f}{result['read_p95_ms']:>10.1f}"
+                    f"{result['writes']:>10.1f}{result['write_p95_ms']:>11.1f}{result['errors']:>8}"
+                )
+            if 'queued' in options['profiles']:
+                stats = self.queue_stats
+                self.stdout.write(
+                    f"write queue: {stats['batches']} commits, mean batch {stats['mean_batch_size']:.1f}, "
+                    f"max batch {stats['max_batch_size']}, max depth {stats['max_depth']}"
+                )
+
+    def run_profile(self, profile, readers, writers, count):
+        if profile == 'default':
+            pragmas, max_age = self.DEFAULT_PRAGMAS, 0
+        else:
+            pragmas, max_age = settings.SQLITE_PRAGMAS, settings.DATABASES['default'].get('CONN_MAX_AGE', 0)
+
+        old_max_age = connection.settings_dict['CONN_MAX_AGE']
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas, WRITE_QUEUE_ENABLED=profile == 'queued'):
+                #the journal mode can only change while nobody else is connected
+                connections.close_all()
+                connection.ensure_connection()
+                prepares = [lambda user=user: self.prepare(user, 'read', count) for user in readers]
+                prepares += [lambda user=user: self.prepare(user, 'write', count) for user in writers]
+                results, elapsed = run_threads(prepares)
+                if profile == 'queued':
+                    self.queue_stats = get_write_queue().get_stats()
+        finally:
+            #the writer thread's connection must close before the throwaway database goes
+            stop_write_queue()
+            connection.settings_dict['CONN_MAX_AGE'] = old_max_age
+
+        reads = [timing for kind, timings, errors in results if kind == 'read' for timing in timings]
+        writes = [timing for kind, timings, errors in results if kind == 'write' for timing in timings]
+        return {
+            'reads': len(reads) / elapsed,
+            'read_p95_ms': get_percentiles(reads)[1],
+            'writes': len(writes) / elapsed,
+            'write_p95_ms': get_percentiles(writes)[1],
+            'errors': sum(errors for kind, timings, errors in results),
+        }
+
+    def prepare(self, user, kind, count):
+        """Log a client in, and return the work that sends its count requests."""
+        client = Client()
+        client.force_login(user)
+
+        def work():
+            timings, errors = [], 0
+            for _ in range(count):
+                started = perf_counter()
+                try:
+                    if kind == 'write':
+                        response = client.post(reverse('create_booking'), BOOKING_DATA)
+                    else:
+                        response = client.get(reverse('manage_bookings'))
+                    errors += response.status_code >= 400
+                except Exception:
+                    #"database is locked" once the busy timeout runs out
+                    errors += 1
+                #the test client keeps connections open; close them as the request handler would
+                close_old_connections()
+                timings.append(perf_counter() - started)
+            return kind, timings, errors
+        return work
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+
+class Command(BaseCommand):
+    """Set up BOOKKEEPING_DATABASE and move the sessions stored in the default database into it."""
+
+    CHUNK_SIZE = 1000
+    help = 'Migrates BOOKKEEPING_DATABASE, then moves existing sessions into it, chunk_size rows at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=self.CHUNK_SIZE, help='Sessions moved per transaction')
+        parser.add_argument('--keep', action='store_true', help='Copy the sessions, leaving them in the default database')
+
+    def handle(self, *args, **options):
+        """Move the sessions.
+
+        Each chunk is committed to the bookkeeping database before it is
+        deleted from the default one, so a run that stops part way loses
+        nothing and can simply be run again.
+        """
+        bookkeeping = settings.BOOKKEEPING_DATABASE
+        if not bookkeeping:
+            self.stdout.write("No bookkeeping database is configured in BOOKKEEPING_DATABASE.")
+            return
+        if bookkeeping == 'default':
+            raise CommandError("BOOKKEEPING_DATABASE must be a database other than default.")
+
+        call_command('migrate', database=bookkeeping, interactive=False, verbosity=options['verbosity'], stdout=self.stdout)
+        if Session._meta.db_table not in connections['default'].introspection.table_names():
+            self.stdout.write("There are no sessions in the default database to move.")
+            return
+
+        sessions = Session.objects.using('default').order_by('session_key')
+        moved = 0
+        last_key = ''
+        while True:
+            chunk = list(sessions.filter(session_key__gt=last_key)[:options['chunk_size']])
+            if not chunk:
+                break
+            with transaction.atomic(using=bookkeeping):
+                Session.objects.using(bookkeeping).bulk_create(chunk, ignore_conflicts=True)
+            if not options['keep']:
+                with transaction.atomic(using='default'):
+                    sessions.filter(session_key__in=[session.session_key for session in chunk]).delete()
+            moved += len(chunk)
+            last_key = chunk[-1].session_key
+        self.stdout.write(f"Moved {moved} sessions to {bookkeeping}.")
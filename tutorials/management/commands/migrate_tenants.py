@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from tutorials.tenants import activate_tenant
+
+
+class Command(BaseCommand):
+    """Migrate, and optionally seed, the database of every tenant."""
+
+    help = 'Runs migrate on each tenant database in TENANTS, then seed with --seed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tenants', nargs='*', help='Tenants to set up (default: all of them)')
+        parser.add_argument('--seed', action='store_true', help='Seed each tenant database after migrating it')
+        parser.add_argument('--random-seed', type=int, help='Seed passed on to the seed command')
+
+    def handle(self, *args, **options):
+        tenants = options['tenants'] or list(settings.TENANTS)
+        if not tenants:
+            self.stdout.write("No tenants are configured in TENANTS.")
+            return
+        unknown = set(tenants) - set(settings.TENANTS)
+        if unknown:
+            raise CommandError(f"Not in TENANTS: {', '.join(sorted(unknown))}")
+
+        verbosity = options['verbosity']
+        for tenant in tenants:
+            database = settings.TENANTS[tenant].get('DATABASE', 'default')
+            self.stdout.write(f"Migrating {tenant} ({database})")
+            call_command('migrate', database=database, interactive=False, verbosity=verbosity, stdout=self.stdout)
+            if options['seed']:
+                self.stdout.write(f"Seeding {tenant} ({database})")
+                #the seed command's writes are routed to the active tenant's database
+                with activate_tenant(tenant):
+                    call_command('seed', random_seed=options['random_seed'], verbosity=verbosity, stdout=self.stdout)
@@ -0,0 +1,44 @@
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from tutorials.caching import queryset_cache
+
+
+class Command(BaseCommand):
+    """Copy the default database over each read replica."""
+
+    help = 'Refreshes the SQLite read replicas in DATABASE_REPLICAS from the default database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('replicas', nargs='*', help='Replica aliases to refresh (default: all of them)')
+
+    def handle(self, *args, **options):
+        """Refresh the replicas.
+
+        The copy is made with SQLite's online backup API, which reads a
+        consistent snapshot of the default database without stopping its
+        writers, and replaces the replica's contents in one step.
+        """
+        replicas = options['replicas'] or settings.DATABASE_REPLICAS
+        if not replicas:
+            self.stdout.write("No replicas are configured in DATABASE_REPLICAS.")
+            return
+        unknown = set(replicas) - set(settings.DATABASE_REPLICAS)
+        if unknown:
+            raise CommandError(f"Not in DATABASE_REPLICAS: {', '.join(sorted(unknown))}")
+
+        source = connections['default']
+        source.ensure_connection()
+        for alias in replicas:
+            target = connections[alias]
+            if target.vendor != 'sqlite' or source.vendor != 'sqlite':
+                raise CommandError(f"{alias}: only SQLite replicas can be refreshed by copying.")
+            started = perf_counter()
+            target.ensure_connection()
+            source.connection.backup(target.connection)
+            target.close()
+            self.stdout.write(f"Refreshed {alias} in {perf_counter() - started:.2f}s.")
+
+        #pages cached from the old copies would outlive it
+        queryset_cache.bump()
@@ -1,9 +1,18 @@
-
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from tutorials.caching import invalidate_all_caches
+from tutorials.capabilities import tutor_capabilities
 from tutorials.models import Admin, User, Tutor, Student, Booking, Lesson
+from tutorials.tenants import activate_tenant, get_current_tenant, get_tenant_database
 from faker import Faker
-from random import randint, choice, random, uniform
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from itertools import islice
+from random import Random, randrange
 from datetime import datetime, timedelta, time
 
 # Predefined users with roles (Admin/Tutor/Student)
@@ -58,222 +67,303 @@ lesson_fixtures = [
 ]
 
 
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+
+#per-process state of the generator functions, set up by init_generator
+_faker = None
+_student_ids = []
+
+
+def init_generator(student_ids=()):
+    """Set up a generator process; runs once in every worker, or in-process without workers."""
+    global _faker, _student_ids
+    if _faker is None:
+        _faker = Faker('en_GB')
+    _student_ids = list(student_ids)
+
+
+def generate_users(role, first_suffix, count, seed):
+    """(user fields, profile fields) for count random users, the same for the same seed."""
+    rng = Random(seed)
+    _faker.seed_instance(seed)
+    generate_profile = PROFILE_GENERATORS[role]
+    rows = []
+    for suffix in range(first_suffix, first_suffix + count):
+        first_name = _faker.first_name()
+        last_name = _faker.last_name()
+        username = create_username(first_name, last_name)[:USERNAME_MAX_LENGTH - len(str(suffix))]
+        user_fields = {
+            'username': f'{username}{suffix}',
+            'email': create_email(first_name, f'{last_name}{suffix}'),
+            'first_name': first_name,
+            'last_name': last_name,
+            'role': role,
+        }
+        rows.append((user_fields, generate_profile(rng)))
+    return rows
+
+
+def generate_random_admin(rng):
+    """Generate random admin profile data."""
+    return {}
+
+
+def generate_random_student(rng):
+    """Generate random student profile data."""
+    return {'level': rng.choice(['BEGINNER', 'INTERMEDIATE', 'ADVANCED'])}
+
+
+def generate_random_tutor(rng):
+    """Generate random tutor profile data."""
+    rate = round(rng.uniform(15, 100), 2)
+
+    specialties = {
+        'specializes_in_python': rng.random() > 0.5,
+        'specializes_in_java': rng.random() > 0.5,
+        'specializes_in_c': rng.random() > 0.5,
+        'specializes_in_ruby': rng.random() > 0.5,
+        'specializes_in_sql': rng.random() > 0.5,
+    }
+    availability = {
+        'available_monday': rng.random() > 0.5,
+        'available_tuesday': rng.random() > 0.5,
+        'available_wednesday': rng.random() > 0.5,
+        'available_thursday': rng.random() > 0.5,
+        'available_friday': rng.random() > 0.5,
+        'available_saturday': rng.random() > 0.5,
+        'available_sunday': rng.random() > 0.5,
+    }
+    return {'rate': rate, **specialties, **availability}
+
+
+PROFILE_GENERATORS = {
+    'admin': generate_random_admin,
+    'student': generate_random_student,
+    'tutor': generate_random_tutor,
+}
+
+
+def generate_bookings(count, today, seed):
+    """Fields of count random bookings for the students passed to init_generator."""
+    rng = Random(seed)
+    rows = []
+    for _ in range(count):
+        booking_date = today + timedelta(days=rng.randint(-30, 30))  # next/previous 30 days
+        booking_time = time(rng.randint(9, 17), rng.choice([0, 30]))  # Random time between 9:00 to 17:00
+        duration = rng.choice(['short', 'long'])
+        #bulk inserts don't send pre_save, so the schedule is worked out here
+        start_at, end_at = Booking.get_schedule(booking_date, booking_time, duration)
+        rows.append({
+            'student_id': rng.choice(_student_ids),
+            'date': booking_date,
+            'time': booking_time,
+            'frequency': rng.choice(['weekly', 'fortnightly']),
+            'duration': duration,
+            'day': rng.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']),
+            'lang': rng.choice(['Python', 'Java', 'Ruby', 'C', 'SQL']),
+            'start_at': start_at,
+            'end_at': end_at,
+        })
+    return rows
+
+
 class Command(BaseCommand):
     USER_COUNT = 200
     TUTOR_COUNT = 15
     ADMIN_COUNT = 10
-    STUDENT_COUNT = 100
     BOOKING_COUNT = 100
     LESSON_COUNT = 75
+    BATCH_SIZE = 1000
     DEFAULT_PASSWORD = 'Password123'
     help = 'Seeds the database with sample data'
 
-    def __init__(self):
-        super().__init__()
-        self.faker = Faker('en_GB')
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=self.USER_COUNT, help='Random users in total, including tutors and admins')
+        parser.add_argument('--tutors', type=int, default=self.TUTOR_COUNT, help='Random tutors')
+        parser.add_argument('--bookings', type=int, default=self.BOOKING_COUNT, help='Random bookings')
+        parser.add_argument('--lessons', type=int, default=self.LESSON_COUNT, help='Open bookings to assign a tutor to')
+        parser.add_argument('--batch-size', type=int, default=self.BATCH_SIZE, help='Rows per bulk insert')
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating rows for the single writer')
+        parser.add_argument('--random-seed', type=int, help='Seed for Faker and random, to generate the same data every run')
+        parser.add_argument('--tenant', choices=list(settings.TENANTS), help="Tenant whose database to seed (default: the active tenant's)")
 
     def handle(self, *args, **options):
+        with activate_tenant(options['tenant'] or get_current_tenant()):
+            self.seed_database(options)
+
+    def seed_database(self, options):
+        """Seed the active tenant's database."""
+        self.batch_size = options['batch_size']
+        self.workers = options['workers']
+        self.seed = options['random_seed'] if options['random_seed'] is not None else randrange(2 ** 32)
+        self.rng = Random(f'{self.seed}-lessons')
+        self.stdout.write(f"Seeding with --random-seed {self.seed}")
+        #hashing is deliberately slow, so every seeded user shares one hash
+        self.password = make_password(self.DEFAULT_PASSWORD)
+
         self.create_fixed_users()
         self.create_fixed_lessons()
         self.create_admins()
-        self.create_tutors()
-        self.create_students()
-        self.create_bookings()
-        self.create_lessons()
-        print("Seeding complete.")
+        self.create_tutors(options['tutors'])
+        self.create_students(options['users'] - options['tutors'] - self.ADMIN_COUNT)
+        self.create_bookings(options['bookings'])
+        self.create_lessons(options['lessons'])
+        #bulk inserts don't send post_save
+        invalidate_all_caches()
+        self.stdout.write("Seeding complete.")
 
     def create_fixed_users(self):
         """Create predefined users from user_fixtures."""
         for data in user_fixtures:
-            self.try_create_user(data)
-    
+            self.try_create_user(dict(data))
+
     def create_admins(self):
         """Seed random Admin objects."""
-        to_create = self.ADMIN_COUNT - Tutor.objects.count()
-        for _ in range(to_create):
-            self.generate_random_admin()
+        to_create = self.ADMIN_COUNT - Admin.objects.count()
+        self.bulk_create_users('admin', to_create, Admin)
 
-    def create_tutors(self):
+    def create_tutors(self, count):
         """Seed random Tutor objects."""
-        to_create = self.TUTOR_COUNT - Tutor.objects.count()
-        for _ in range(to_create):
-            self.generate_random_tutor()
-    
-    def create_students(self):
+        to_create = count - Tutor.objects.count()
+        self.bulk_create_users('tutor', to_create, Tutor)
+        #bulk inserts don't send post_save, and create_bookings matches on the new tutors
+        tutor_capabilities.invalidate()
+
+    def create_students(self, count):
         """Seed random Student objects."""
-        to_create = self.STUDENT_COUNT - Student.objects.count()
-        for _ in range(to_create):
-            self.generate_random_student()
-
-    def generate_random_admin(self):
-        """Generate random students."""
-        first_name = self.faker.first_name()
-        last_name = self.faker.last_name()
-        email = create_email(first_name, last_name)
-        username = create_username(first_name, last_name)
-
-        self.try_create_user({
-            'username': username,
-            'email': email,
-            'first_name': first_name,
-            'last_name': last_name,
-            'role': 'admin',
-        })
+        to_create = count - Student.objects.count()
+        self.bulk_create_users('student', to_create, Student)
 
-    def generate_random_student(self):
-        """Generate random students."""
-        first_name = self.faker.first_name()
-        last_name = self.faker.last_name()
-        email = create_email(first_name, last_name)
-        username = create_username(first_name, last_name)
-        level = choice(['BEGINNER', 'INTERMEDIATE', 'ADVANCED'])
-
-        self.try_create_user({
-            'username': username,
-            'email': email,
-            'first_name': first_name,
-            'last_name': last_name,
-            'role': 'student',
-            'level': level
-        })
-    
-    def generate_random_tutor(self):
-        """Generate random tutors."""
-        first_name = self.faker.first_name()
-        last_name = self.faker.last_name()
-        email = create_email(first_name, last_name)
-        username = create_username(first_name, last_name)
-        rate = round(uniform(15, 100), 2)
-
-        specialties = {
-            'specializes_in_python': random() > 0.5,
-            'specializes_in_java': random() > 0.5,
-            'specializes_in_c': random() > 0.5,
-            'specializes_in_ruby': random() > 0.5,
-            'specializes_in_sql': random() > 0.5,
-        }
-        availability = {
-            'available_monday': random() > 0.5,
-            'available_tuesday': random() > 0.5,
-            'available_wednesday': random() > 0.5,
-            'available_thursday': random() > 0.5,
-            'available_friday': random() > 0.5,
-            'available_saturday': random() > 0.5,
-            'available_sunday': random() > 0.5,
-        }
-        
-        self.try_create_user({
-            'username': username,
-            'email': email,
-            'first_name': first_name,
-            'last_name': last_name,
-            'role': 'tutor',
-            'rate': rate,
-            **specialties,
-            **availability
-        })
+    def bulk_create_users(self, role, count, profile_model):
+        """Insert count users with the role, and their profiles, in batches."""
+        if count <= 0:
+            return
+        #suffixes above every existing pk keep usernames and emails unique across runs
+        suffix_start = (User.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+        tasks = [
+            (role, suffix_start + batch_start, min(self.batch_size, count - batch_start), f'{self.seed}-{role}-{batch_start}')
+            for batch_start in range(0, count, self.batch_size)
+        ]
+        created = 0
+        for rows in self.generate(generate_users, tasks):
+            users = [User(password=self.password, **user_fields) for user_fields, profile_fields in rows]
+            with transaction.atomic(using=get_tenant_database()):
+                User.objects.bulk_create(users)
+                profile_model.objects.bulk_create([
+                    profile_model(user=user, **profile_fields) for user, (user_fields, profile_fields) in zip(users, rows)
+                ])
+            created += len(rows)
+            self.stdout.write(f"Created {created}/{count} {role}s")
+
+    def generate(self, generator, tasks, student_ids=()):
+        """
+        Yield generator(*task) for every task, in order.
+
+        With --workers above 1 the rows are generated in a process pool and
+        streamed back here, the only process writing to the database. At most
+        two batches per worker are in flight, so memory stays bounded.
+        """
+        if self.workers <= 1:
+            init_generator(student_ids)
+            for task in tasks:
+                yield generator(*task)
+            return
+
+        #workers are forked rather than spawned: this module reads the models when it is
+        #imported, so a spawn or forkserver worker would fail to unpickle the generator
+        #before any initializer could call django.setup(). Workers never query the database.
+        mp_context = get_context('fork')
+        with ProcessPoolExecutor(self.workers, mp_context=mp_context, initializer=init_generator, initargs=(student_ids,)) as executor:
+            pending = deque()
+            tasks = iter(tasks)
+            for task in islice(tasks, self.workers * 2):
+                pending.append(executor.submit(generator, *task))
+            while pending:
+                rows = pending.popleft().result()
+                task = next(tasks, None)
+                if task is not None:
+                    pending.append(executor.submit(generator, *task))
+                yield rows
 
     def try_create_user(self, data):
         """Try to create a user."""
         try:
             role = data.pop('role', 'other')
             profile_data = {k: v for k, v in data.items() if k not in ['username', 'email', 'password', 'first_name', 'last_name']}
-            
-            user = User.objects.create_user(
-                username=data['username'],
-                email=data['email'],
-                password=self.DEFAULT_PASSWORD,
-                first_name=data['first_name'],
-                last_name=data['last_name'],
-                role=role
-            )
-            print(f"Created User #{user.id} ({user.username})")
-
-            if role == 'tutor':
-                Tutor.objects.create(user=user, **profile_data)
-                print(f"Created Tutor profile for User #{user.id} ({user.username})")
-            elif role == 'student':
-                Student.objects.create(user=user, **profile_data)
-                print(f"Created Student profile for User #{user.id} ({user.username})")
-            elif role == 'admin':
-                Admin.objects.create(user=user, **profile_data)
-                print(f"Created Admin profile for User #{user.id} ({user.username})")
-            else:
-                raise ValueError(f"Invalid role for user: {data.get('username')}.")
+
+            with transaction.atomic(using=get_tenant_database()):
+                user = User.objects.create(
+                    username=data['username'],
+                    email=data['email'],
+                    password=self.password,
+                    first_name=data['first_name'],
+                    last_name=data['last_name'],
+                    role=role
+                )
+                self.stdout.write(f"Created User #{user.id} ({user.username})")
+
+                if role == 'tutor':
+                    Tutor.objects.create(user=user, **profile_data)
+                    self.stdout.write(f"Created Tutor profile for User #{user.id} ({user.username})")
+                elif role == 'student':
+                    Student.objects.create(user=user, **profile_data)
+                    self.stdout.write(f"Created Student profile for User #{user.id} ({user.username})")
+                elif role == 'admin':
+                    Admin.objects.create(user=user, **profile_data)
+                    self.stdout.write(f"Created Admin profile for User #{user.id} ({user.username})")
+                else:
+                    raise ValueError(f"Invalid role for user: {data.get('username')}.")
 
         except IntegrityError as e:
-            print(f"Error creating user {data.get('username')}: {e}")
-            
-    
-    def create_bookings(self):
+            self.stdout.write(f"Error creating user {data.get('username')}: {e}")
+
+    def create_bookings(self, count):
         """Create a specified number of random bookings for students."""
-        student_count = Student.objects.count()
+        student_ids = list(Student.objects.values_list('pk', flat=True))
 
-        if student_count == 0:
-            print("Error: Not enough students to create bookings.")
+        if not student_ids:
+            self.stdout.write("Error: Not enough students to create bookings.")
             return
 
-        for _ in range(self.BOOKING_COUNT):
-            student = Student.objects.all()[randint(0, student_count - 1)]
-
-            booking_date = datetime.now().date() + timedelta(days=randint(-30, 30))  # next/previous 30 days
-            booking_time = time(randint(9, 17), choice([0, 30]))  # Random time between 9:00 to 17:00
-
-            frequency = choice(['weekly', 'fortnightly'])
-            duration = choice(['short', 'long'])
-            day = choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])
-            lang = choice(['Python', 'Java', 'Ruby', 'C', 'SQL'])
-
-            # Create the booking
-            booking = Booking.objects.create(
-                student=student,
-                date=booking_date,
-                time=booking_time,
-                frequency=frequency,
-                duration=duration,
-                day=day,
-                lang=lang,
-            )
-
-            print(f"Booking #{booking.id} created: Student #{student.user.id} ({student.user.username}) requests {day}, {booking_date} at {booking_time}, for {duration} lessons in {lang}.")
-
-    def create_lessons(self):
+        today = datetime.now().date()
+        tasks = [
+            (min(self.batch_size, count - batch_start), today, f'{self.seed}-booking-{batch_start}')
+            for batch_start in range(0, count, self.batch_size)
+        ]
+        created = 0
+        for rows in self.generate(generate_bookings, tasks, student_ids):
+            Booking.objects.bulk_create([Booking(**fields) for fields in rows])
+            created += len(rows)
+            self.stdout.write(f"Created {created}/{count} bookings")
+
+    def create_lessons(self, count):
         """Assign tutors to bookings and create lessons."""
-        bookings = Booking.objects.filter(status='OPEN')  # Bookings without lessons
-        tutor_count = Tutor.objects.count()
+        bookings = Booking.objects.filter(status='OPEN').order_by('pk').values_list('pk', 'lang', 'day')[:count]
 
-        if bookings.count() == 0 or tutor_count == 0:
-            print("Error: No available bookings or tutors to create lessons.")
+        if not bookings.exists() or not Tutor.objects.exists():
+            self.stdout.write("Error: No available bookings or tutors to create lessons.")
             return
 
-        for i, booking in enumerate(bookings):
-            if i >= self.LESSON_COUNT:
-                break
-            
-            lang_field = f"specializes_in_{booking.lang.lower()}"
-            day_field = f"available_{booking.day.lower()}"
-
-            matching_tutors = Tutor.objects.filter(
-                **{lang_field: True},  # Match language specialty
-                **{day_field: True}   # Match day availability
-            )
-            if not matching_tutors.exists():
-                print(f"No tutors available for Booking #{booking.id} ({booking.lang} on {booking.day}).")
+        lessons = []
+        for booking_id, lang, day in bookings.iterator(chunk_size=self.batch_size):
+            matching_tutor_ids = tutor_capabilities.get_candidate_ids(lang, day)
+            if not matching_tutor_ids:
                 continue
+            # Randomly select one of the matching tutors
+            lessons.append(Lesson(booking_id=booking_id, tutor_id=self.rng.choice(matching_tutor_ids)))
+            if len(lessons) == self.batch_size:
+                self.save_lessons(lessons)
+                lessons = []
+        if lessons:
+            self.save_lessons(lessons)
+
+    def save_lessons(self, lessons):
+        """Close the lessons' bookings and insert the lessons."""
+        with transaction.atomic(using=get_tenant_database()):
+            Booking.objects.filter(pk__in=[lesson.booking_id for lesson in lessons]).update(status='CLOSED')
+            Lesson.objects.bulk_create(lessons)
+        self.stdout.write(f"Created {len(lessons)} lessons")
 
-            # Randomly select a tutor from the filtered queryset
-            tutor = matching_tutors.order_by('?').first()
-
-            booking.status = "CLOSED"
-            booking.save()
-
-            #tutor = Tutor.objects.all()[randint(0, tutor_count - 1)]
-            Lesson.objects.create(
-                booking=booking,
-                tutor=tutor,
-            )
-            print(f"Lesson created for Booking #{booking.id} with Tutor #{tutor.user.id} ({tutor.user.username})")
-    
     def create_fixed_bookings(self):
         """Create fixed bookings from students"""
         for booking_data in booking_fixtures:
@@ -288,10 +378,10 @@ class Command(BaseCommand):
                     day=booking_data['day'],
                     lang=booking_data['lang']
                 )
-                print(f"Created fixed booking #{booking.id} for student {student.user.username} on {booking_data['date']} at {booking_data['time']}.")
+                self.stdout.write(f"Created fixed booking #{booking.id} for student {student.user.username} on {booking_data['date']} at {booking_data['time']}.")
             except Student.DoesNotExist:
-                print(f"Student {booking_data['student_username']} does not exist.")
- 
+                self.stdout.write(f"Student {booking_data['student_username']} does not exist.")
+
     def create_fixed_lessons(self):
         """Create fixed lessons from bookings and tutors"""
         for lesson_data in lesson_fixtures:
@@ -301,11 +391,11 @@ class Command(BaseCommand):
                 booking = Booking.objects.filter(student=student).first()
                 if booking:
                     Lesson.objects.create(booking=booking, tutor=tutor)
-                    print(f"Created lesson for {tutor.user.username} with booking {booking.id} - {student.user.username} on {lesson_data['date']}.")
+                    self.stdout.write(f"Created lesson for {tutor.user.username} with booking {booking.id} - {student.user.username} on {booking.date}.")
             except Student.DoesNotExist:
-                print(f"Student {lesson_data['student_username']} does not exist.")
+                self.stdout.write(f"Student {lesson_data['student_username']} does not exist.")
             except Tutor.DoesNotExist:
-                print(f"Tutor {lesson_data['tutor_username']} does not exist.")
+                self.stdout.write(f"Tutor {lesson_data['tutor_username']} does not exist.")
 
 
 def create_username(first_name, last_name):
@@ -1,12 +1,97 @@
+from time import perf_counter
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
 from django.core.management.base import BaseCommand
-from tutorials.models import User
+from django.db import connections, router, transaction
+from tutorials.caching import invalidate_all_caches
+from tutorials.models import User, Student, Tutor, Admin, Booking, Lesson, LessonSeries, CancelledOccurrence
+from tutorials.tenants import activate_tenant, get_current_tenant, get_tenant_database
 
 class Command(BaseCommand):
     """Build automation command to unseed the database."""
-    
-    help = 'Seeds the database with sample data'
+
+    CHUNK_SIZE = 10000
+    help = 'Removes every non-staff user and everything that belongs to them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=self.CHUNK_SIZE, help='Rows deleted per transaction')
+        parser.add_argument('--tenant', choices=list(settings.TENANTS), help="Tenant whose database to unseed (default: the active tenant's)")
 
     def handle(self, *args, **options):
-        """Unseed the database."""
+        """Unseed the database.
+
+        Rows are removed with raw DELETE statements, children before parents,
+        instead of through the ORM's cascade collector, which loads every row
+        it deletes into memory first.
+        """
+        with activate_tenant(options['tenant'] or get_current_tenant()):
+            self.unseed(options['chunk_size'])
+
+    def unseed(self, chunk_size):
+        """Remove the rows from the active tenant's database."""
+        self.chunk_size = chunk_size
+        self.database = get_tenant_database()
+        self.connection = connections[self.database]
+        started = perf_counter()
+        removed = 0
+        for model, where, params in self.get_deletions():
+            #e.g. the admin log, which stays in the default database under a tenant
+            if router.db_for_write(model) != self.database:
+                continue
+            count = self.delete_in_chunks(model, where, params)
+            removed += count
+            self.stdout.write(f"Removed {count} rows from {model._meta.db_table}")
+        #raw deletes send no post_delete signals
+        invalidate_all_caches()
+        self.stdout.write(f"Removed {removed} rows in {perf_counter() - started:.2f}s.")
+
+    def get_deletions(self):
+        """(model, WHERE clause, params) for every table, in dependency order."""
+        users = f"SELECT {self.column(User, 'id')} FROM {self.table(User)} WHERE {self.column(User, 'is_staff')} = %s"
+        series = (
+            f"SELECT {self.column(LessonSeries, 'id')} FROM {self.table(LessonSeries)} "
+            f"WHERE {self.column(LessonSeries, 'student')} IN ({users}) OR {self.column(LessonSeries, 'tutor')} IN ({users})"
+        )
+        bookings = f"SELECT {self.column(Booking, 'id')} FROM {self.table(Booking)} WHERE {self.column(Booking, 'student')} IN ({users})"
+        not_staff = [False]
+
+        return [
+            (CancelledOccurrence, f"{self.column(CancelledOccurrence, 'series')} IN ({series})", not_staff * 2),
+            (Lesson, f"{self.column(Lesson, 'booking')} IN ({bookings}) OR {self.column(Lesson, 'tutor')} IN ({users})", not_staff * 2),
+            (Booking, f"{self.column(Booking, 'student')} IN ({users})", not_staff),
+            (LessonSeries, f"{self.column(LessonSeries, 'student')} IN ({users}) OR {self.column(LessonSeries, 'tutor')} IN ({users})", not_staff * 2),
+            (Student, f"{self.column(Student, 'user')} IN ({users})", not_staff),
+            (Tutor, f"{self.column(Tutor, 'user')} IN ({users})", not_staff),
+            (Admin, f"{self.column(Admin, 'user')} IN ({users})", not_staff),
+            (User.groups.through, f"{self.column(User.groups.through, 'user')} IN ({users})", not_staff),
+            (User.user_permissions.through, f"{self.column(User.user_permissions.through, 'user')} IN ({users})", not_staff),
+            (LogEntry, f"{self.column(LogEntry, 'user')} IN ({users})", not_staff),
+            (User, f"{self.column(User, 'is_staff')} = %s", not_staff),
+        ]
+
+    def delete_in_chunks(self, model, where, params):
+        """Delete the rows matching where, chunk_size rows per transaction, and return how many went."""
+        table, pk = self.table(model), self.column(model, model._meta.pk.name)
+        sql = f"DELETE FROM {table} WHERE {pk} IN (SELECT {pk} FROM {table} WHERE {where} LIMIT %s)"
+        if model is LessonSeries:
+            #lessons that stay behind lose their series, as on_delete=SET_NULL would do
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {self.table(Lesson)} SET {self.column(Lesson, 'series')} = NULL "
+                    f"WHERE {self.column(Lesson, 'series')} IN (SELECT {pk} FROM {table} WHERE {where})",
+                    params,
+                )
+        removed = 0
+        while True:
+            with transaction.atomic(using=self.database), self.connection.cursor() as cursor:
+                cursor.execute(sql, params + [self.chunk_size])
+                count = cursor.rowcount
+            removed += count
+            if count < self.chunk_size:
+                return removed
+
+    def table(self, model):
+        return self.connection.ops.quote_name(model._meta.db_table)
 
-        User.objects.filter(is_staff=False).delete()
\ No newline at end of file
+    def column(self, model, field_name):
+        return self.connection.ops.quote_name(model._meta.get_field(field_name).column)
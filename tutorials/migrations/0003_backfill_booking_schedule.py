@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+DURATION_MINUTES = {
+    "short": 60,
+    "long": 120,
+}
+
+
+def backfill_schedule(apps, schema_editor):
+    """Fill start_at/end_at for existing bookings, committing one batch at a time."""
+    Booking = apps.get_model('tutorials', 'Booking')
+    alias = schema_editor.connection.alias
+    bookings = Booking.objects.using(alias).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(
+            bookings.filter(pk__gt=last_pk, start_at__isnull=True)
+            .only('pk', 'date', 'time', 'duration')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for booking in batch:
+            booking.start_at = timezone.make_aware(datetime.combine(booking.date, booking.time))
+            booking.end_at = booking.start_at + timedelta(minutes=DURATION_MINUTES.get(booking.duration, 60))
+        with transaction.atomic(using=alias):
+            Booking.objects.using(alias).bulk_update(batch, ['start_at', 'end_at'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    # commit per batch so a large table doesn't hold the write lock for the whole backfill
+    atomic = False
+
+    dependencies = [
+        ('tutorials', '0002_booking_start_at_end_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_schedule, migrations.RunPython.noop),
+    ]
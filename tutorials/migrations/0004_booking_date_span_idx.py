@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0003_backfill_booking_schedule'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date', 'start_at', 'end_at'], name='booking_date_span_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0004_booking_date_span_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='occurrence_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='LessonSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('time', models.TimeField()),
+                ('frequency', models.CharField(choices=[('weekly', 'weekly'), ('fortnightly', 'fortnightly')], default='weekly', max_length=20)),
+                ('duration', models.CharField(choices=[('short', 'short (1hr)'), ('long', 'long (2hrs)')], default='short', max_length=10)),
+                ('day', models.CharField(choices=[('Monday', 'Monday'), ('Tuesday', 'Tuesday'), ('Wednesday', 'Wednesday'), ('Thursday', 'Thursday'), ('Friday', 'Friday')], default='Monday', max_length=20)),
+                ('lang', models.CharField(choices=[('Python', 'Python'), ('Java', 'Java'), ('Ruby', 'Ruby'), ('C', 'C'), ('SQL', 'SQL')], default='Python', max_length=20)),
+                ('venue', models.CharField(default='Code Tutors HQ', max_length=100)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_series', to='tutorials.student')),
+                ('tutor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_series', to='tutorials.tutor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CancelledOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cancellations', to='tutorials.lessonseries')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lessons', to='tutorials.lessonseries'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonseries',
+            index=models.Index(fields=['tutor', 'start_date', 'end_date'], name='series_tutor_span_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonseries',
+            index=models.Index(fields=['student', 'start_date', 'end_date'], name='series_student_span_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cancelledoccurrence',
+            constraint=models.UniqueConstraint(fields=('series', 'date'), name='unique_cancelled_occurrence'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0005_lesson_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'ordering': ['start_date'],
+            },
+        ),
+    ]
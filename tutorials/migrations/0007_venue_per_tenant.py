@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-18 21:19
+
+import tutorials.models.booking_model
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0006_term_closure'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='venue',
+            field=models.CharField(default=tutorials.models.booking_model.get_venue_name, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='lessonseries',
+            name='venue',
+            field=models.CharField(default=tutorials.models.booking_model.get_venue_name, max_length=100),
+        ),
+    ]
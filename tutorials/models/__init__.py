@@ -3,4 +3,6 @@ from .student_model import Student
 from .tutor_model import Tutor
 from .booking_model import Booking
 from .lesson_model import Lesson
+from .lesson_series_model import LessonSeries, CancelledOccurrence, LessonOccurrence
 from .admin_model import Admin
+from .term_closure_model import TermClosure
@@ -1,6 +1,15 @@
+from datetime import datetime, timedelta
 from django.db import models
+from django.utils import timezone
+from tutorials.tenants import get_tenant_setting
 from .student_model import Student
 
+
+def get_venue_name():
+    """The active tenant's VENUE, or Booking.VENUE_NAME."""
+    return get_tenant_setting("VENUE", Booking.VENUE_NAME)
+
+
 class Booking(models.Model):
     """Bookings get requested by a student."""
     # default 1 may cause issues if there is no Student
@@ -8,7 +17,7 @@ class Booking(models.Model):
     date = models.DateField()
     time = models.TimeField()
     VENUE_NAME = "Code Tutors HQ"
-    venue = models.CharField(max_length=100, default=VENUE_NAME)
+    venue = models.CharField(max_length=100, default=get_venue_name)
 
     # status of the booking
     STATUS = [
@@ -29,6 +38,10 @@ class Booking(models.Model):
         ("long", "long (2hrs)"),
     ]
     duration = models.CharField(max_length=10, choices=DURATION_CHOICES, default="short")
+    DURATION_MINUTES = {
+        "short": 60,
+        "long": 120,
+    }
 
     # what day the student would like their lessons
     DAY_CHOICES = [
@@ -50,5 +63,33 @@ class Booking(models.Model):
     ]
     lang = models.CharField(max_length=20, choices=PLANG_CHOICES, default="Python")
 
+    # derived from date, time and duration when the booking is saved
+    start_at = models.DateTimeField(null=True, blank=True, editable=False)
+    end_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start_at"], name="booking_start_at_idx"),
+            models.Index(fields=["student", "start_at"], name="booking_student_start_at_idx"),
+            # covers the interval-overlap predicate used when checking a tutor's series for conflicts
+            models.Index(fields=["date", "start_at", "end_at"], name="booking_date_span_idx"),
+        ]
+
+    @classmethod
+    def get_schedule(cls, date, time, duration):
+        """Return the timezone-aware (start, end) datetimes of a lesson."""
+        start_at = timezone.make_aware(datetime.combine(date, time))
+        end_at = start_at + timedelta(minutes=cls.DURATION_MINUTES.get(duration, 60))
+        return start_at, end_at
+
+    def set_schedule(self):
+        """Recalculate start_at and end_at from the date, time and duration."""
+        date = self._meta.get_field("date").to_python(self.date)
+        time = self._meta.get_field("time").to_python(self.time)
+        if date and time:
+            self.start_at, self.end_at = self.get_schedule(date, time, self.duration)
+        else:
+            self.start_at = self.end_at = None
+
     def __str__(self):
         return f"Requested: Booking for {self.student} on {self.date} at {self.time}"
@@ -1,7 +1,42 @@
 from django.db import models
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Coalesce
+from django.urls import reverse
 from .booking_model import Booking
+from .lesson_series_model import LessonSeries
 from .tutor_model import Tutor
 
+#maps duration to integer value
+DURATION_MULTIPLIER = {
+    "short": 1,
+    "long": 2,
+}
+
+INVOICE_FIELD = DecimalField(max_digits=8, decimal_places=2)
+
+
+class LessonQuerySet(models.QuerySet):
+    """Queryset for lessons that can price and load rows in a single query."""
+
+    def with_invoice(self):
+        """Annotate each lesson with its invoice, computed by the database."""
+        rate = Coalesce(F("tutor__rate"), Value(0), output_field=INVOICE_FIELD)
+        return self.annotate(
+            invoice=Case(
+                *[
+                    When(booking__duration=duration, then=rate * Value(multiplier))
+                    for duration, multiplier in DURATION_MULTIPLIER.items()
+                ],
+                default=rate,
+                output_field=INVOICE_FIELD,
+            )
+        )
+
+    def with_details(self):
+        """Join the booking, student and tutor so templates don't query per row."""
+        return self.select_related("booking__student__user", "tutor__user").with_invoice()
+
+
 class Lesson(models.Model):
     """Has a booking with a tutor"""
     booking = models.OneToOneField(
@@ -12,19 +47,31 @@ class Lesson(models.Model):
     )
     tutor = models.ForeignKey(Tutor, on_delete=models.CASCADE)
 
+    #set when the lesson was materialised from one occurrence of a series
+    series = models.ForeignKey(LessonSeries, on_delete=models.SET_NULL, related_name="lessons", null=True, blank=True)
+    occurrence_date = models.DateField(null=True, blank=True)
+
+    objects = LessonQuerySet.as_manager()
 
-    #calculated dynamically
+    #calculated dynamically, unless annotated by LessonQuerySet.with_invoice()
     @property
     def invoice(self):
-        #maps duration to integer value
-        DURATION_MULTIPLIER = {
-            "short": 1,
-            "long": 2,
-        }
+        if "_invoice" in self.__dict__:
+            return self._invoice
         multiplier = DURATION_MULTIPLIER.get(self.booking.duration, 1)
         if self.tutor.rate:
             return self.tutor.rate * multiplier
         return 0  #default to 0 if rate is missing
 
+    @invoice.setter
+    def invoice(self, value):
+        self._invoice = value
+
+    def get_absolute_url(self):
+        return reverse("get_lesson", args=[self.booking_id])
+
+    def get_delete_url(self):
+        return reverse("delete_lesson", args=[self.booking_id])
+
     def __str__(self):
         return f"Lesson on {self.booking.date} at {self.booking.time} with Tutor {self.tutor.user.first_name}, costing {self.invoice}"
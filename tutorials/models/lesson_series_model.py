@@ -0,0 +1,182 @@
+from datetime import timedelta
+from django.db import models
+from django.db.models import Prefetch
+from django.urls import reverse
+from .booking_model import Booking, get_venue_name
+from .student_model import Student
+from .tutor_model import Tutor
+
+
+class LessonSeriesQuerySet(models.QuerySet):
+    """Queryset for lesson series that loads everything occurrence expansion needs."""
+
+    def active_between(self, start, end):
+        """Series with at least one possible occurrence between start and end (inclusive)."""
+        return self.filter(start_date__lte=end, end_date__gte=start)
+
+    def with_exceptions(self):
+        """Prefetch the cancelled and materialised dates, which are not expanded."""
+        from .lesson_model import Lesson
+        return self.prefetch_related(
+            "cancellations",
+            Prefetch("lessons", queryset=Lesson.objects.only("booking_id", "series_id", "occurrence_date")),
+        )
+
+    def with_details(self):
+        """Join the student and tutor, and prefetch everything occurrence expansion needs."""
+        return self.select_related("student__user", "tutor__user").with_exceptions()
+
+
+class LessonSeries(models.Model):
+    """A tutor's recurring lessons with a student, expanded into occurrences on demand."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="lesson_series")
+    tutor = models.ForeignKey(Tutor, on_delete=models.CASCADE, related_name="lesson_series")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    time = models.TimeField()
+    frequency = models.CharField(max_length=20, choices=Booking.FREQUENCY_CHOICES, default="weekly")
+    duration = models.CharField(max_length=10, choices=Booking.DURATION_CHOICES, default="short")
+    day = models.CharField(max_length=20, choices=Booking.DAY_CHOICES, default="Monday")
+    lang = models.CharField(max_length=20, choices=Booking.PLANG_CHOICES, default="Python")
+    venue = models.CharField(max_length=100, default=get_venue_name)
+
+    FREQUENCY_DAYS = {
+        "weekly": 7,
+        "fortnightly": 14,
+    }
+
+    objects = LessonSeriesQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tutor", "start_date", "end_date"], name="series_tutor_span_idx"),
+            models.Index(fields=["student", "start_date", "end_date"], name="series_student_span_idx"),
+        ]
+
+    @classmethod
+    def from_booking(cls, booking, tutor, end_date):
+        """Build (without saving) the series that assigning tutor to booking creates."""
+        return cls(
+            student_id=booking.student_id,
+            tutor=tutor,
+            start_date=booking.date,
+            end_date=end_date,
+            time=booking.time,
+            frequency=booking.frequency,
+            duration=booking.duration,
+            day=booking.day,
+            lang=booking.lang,
+            venue=booking.venue,
+        )
+
+    def get_skipped_dates(self):
+        """Dates that were cancelled or materialised, and so are not expanded."""
+        skipped = {cancellation.date for cancellation in self.cancellations.all()}
+        skipped.update(lesson.occurrence_date for lesson in self.lessons.all())
+        return skipped
+
+    def get_dates(self, start=None, end=None):
+        """Dates of the occurrences between start and end (inclusive), skipping exceptions and closures."""
+        from tutorials.term_calendar import term_calendar
+        step = self.FREQUENCY_DAYS.get(self.frequency, 7)
+        start = max(start or self.start_date, self.start_date)
+        end = min(end or self.end_date, self.end_date)
+        if start > end:
+            return []
+
+        #jump straight to the first occurrence on or after start
+        steps_ahead = -(-(start - self.start_date).days // step)
+        current = self.start_date + timedelta(days=steps_ahead * step)
+        skipped = self.get_skipped_dates() | term_calendar.get_closed_dates(current, end)
+        dates = []
+        while current <= end:
+            if current not in skipped:
+                dates.append(current)
+            current += timedelta(days=step)
+        return dates
+
+    def get_occurrences(self, start=None, end=None):
+        """Occurrences between start and end (inclusive) that exist only in this series."""
+        return [LessonOccurrence(self, date) for date in self.get_dates(start, end)]
+
+    def get_occurrence(self, date):
+        """Return the occurrence on date, or None if the series has none that day."""
+        if date in self.get_dates(date, date):
+            return LessonOccurrence(self, date)
+        return None
+
+    def materialise(self, date):
+        """Write the occurrence on date as a Booking and Lesson, so it can be edited on its own."""
+        occurrence = self.get_occurrence(date)
+        if occurrence is None:
+            raise ValueError(f"Series {self.pk} has no occurrence on {date}.")
+        booking = occurrence.booking
+        booking.save()
+        return self.lessons.create(booking=booking, tutor=self.tutor, occurrence_date=date)
+
+    def cancel(self, date):
+        """Stop the occurrence on date from being expanded."""
+        return self.cancellations.get_or_create(date=date)[0]
+
+    def __str__(self):
+        return f"{self.frequency.capitalize()} lessons from {self.start_date} to {self.end_date} at {self.time} with Tutor {self.tutor.user.first_name}"
+
+
+class CancelledOccurrence(models.Model):
+    """A date on which a lesson series does not take place."""
+    series = models.ForeignKey(LessonSeries, on_delete=models.CASCADE, related_name="cancellations")
+    date = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["series", "date"], name="unique_cancelled_occurrence"),
+        ]
+
+    def __str__(self):
+        return f"Cancelled lesson on {self.date}"
+
+
+class LessonOccurrence:
+    """One lesson of a LessonSeries that has not been written to the database.
+
+    It mirrors the attributes of a Lesson that templates use, so dashboards
+    can list occurrences and materialised lessons side by side.
+    """
+
+    def __init__(self, series, date):
+        self.series = series
+        self.date = date
+        self.tutor = series.tutor
+        self.booking = Booking(
+            student=series.student,
+            date=date,
+            time=series.time,
+            venue=series.venue,
+            status="CLOSED",
+            frequency=series.frequency,
+            duration=series.duration,
+            day=series.day,
+            lang=series.lang,
+        )
+        self.booking.set_schedule()
+
+    @property
+    def start_at(self):
+        return self.booking.start_at
+
+    @property
+    def invoice(self):
+        from .lesson_model import DURATION_MULTIPLIER
+        multiplier = DURATION_MULTIPLIER.get(self.series.duration, 1)
+        if self.tutor.rate:
+            return self.tutor.rate * multiplier
+        return 0
+
+    def get_absolute_url(self):
+        return reverse("get_occurrence", args=[self.series.pk, self.date.isoformat()])
+
+    def get_delete_url(self):
+        return reverse("cancel_occurrence", args=[self.series.pk, self.date.isoformat()])
+
+    def __str__(self):
+        return f"Lesson on {self.date} at {self.series.time} with Tutor {self.tutor.user.first_name}, costing {self.invoice}"
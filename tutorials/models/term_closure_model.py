@@ -0,0 +1,22 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class TermClosure(models.Model):
+    """Dates within term on which no lessons take place, e.g. bank holidays."""
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ["start_date"]
+
+    def clean(self):
+        super().clean()
+        if self.end_date < self.start_date:
+            raise ValidationError("A closure cannot end before it starts.")
+
+    def __str__(self):
+        if self.start_date == self.end_date:
+            return f"Closed on {self.start_date}"
+        return f"Closed from {self.start_date} to {self.end_date}"
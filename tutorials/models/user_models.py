@@ -13,6 +13,9 @@ class User(AbstractUser):
         ('student', 'Student'),
     )
 
+    #reverse one-to-one profiles, of which a user has at most one
+    PROFILE_FIELDS = ('student_profile', 'tutor_profile', 'admin_profile')
+
     username = models.CharField(
         max_length=30,
         unique=True,
@@ -43,6 +46,14 @@ class User(AbstractUser):
 
         return f'{self.first_name} {self.last_name}'
 
+    def get_profile(self):
+        """Return the user's student, tutor or admin profile, or None if they have none."""
+
+        for field in self.PROFILE_FIELDS:
+            if hasattr(self, field):
+                return getattr(self, field)
+        return None
+
 
     def gravatar(self, size=120):
         """Return a URL to the user's gravatar."""
@@ -0,0 +1,85 @@
+from functools import reduce
+from django.conf import settings
+from django.http import Http404
+
+
+class KeysetPage:
+    """One page of rows from a queryset paginated on an ordered key column."""
+
+    def __init__(self, object_list, key, page_size, has_next, has_previous):
+        self.object_list = object_list
+        self.key = key
+        self.page_size = page_size
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _key_of(self, row):
+        return reduce(getattr, self.key.split('__'), row)
+
+    @property
+    def next_cursor(self):
+        """Key of the last row on this page, used as ?after= for the next page."""
+        if self.has_next and self.object_list:
+            return self._key_of(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        """Key of the first row on this page, used as ?before= for the previous page."""
+        if self.has_previous and self.object_list:
+            return self._key_of(self.object_list[0])
+        return None
+
+
+def get_page_size(request):
+    """Read ?page_size= from the request, clamped to the configured bounds."""
+    default = settings.MANAGE_PAGE_SIZE
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except ValueError:
+        return default
+    return max(1, min(page_size, settings.MANAGE_MAX_PAGE_SIZE))
+
+
+def _get_cursor(request, name):
+    value = request.GET.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise Http404(f"Invalid page cursor: {value}")
+
+
+def get_page_cache_key(request):
+    """The page size and cursors that select a page, as part of a cache key."""
+    return f"{get_page_size(request)}:{_get_cursor(request, 'after')}:{_get_cursor(request, 'before')}"
+
+
+def paginate_by_key(request, queryset, key):
+    """
+    Return a KeysetPage of the queryset ordered by key.
+
+    Pages are selected with WHERE key > cursor (or < cursor going backwards)
+    and LIMIT, so every page costs the same however deep into the table it is.
+    """
+    page_size = get_page_size(request)
+    after = _get_cursor(request, 'after')
+    before = _get_cursor(request, 'before')
+
+    if before is not None:
+        rows = list(queryset.filter(**{f'{key}__lt': before}).order_by(f'-{key}')[:page_size + 1])
+        has_previous = len(rows) > page_size
+        object_list = rows[:page_size][::-1]
+        return KeysetPage(object_list, key, page_size, has_next=True, has_previous=has_previous)
+
+    if after is not None:
+        queryset = queryset.filter(**{f'{key}__gt': after})
+    rows = list(queryset.order_by(key)[:page_size + 1])
+    return KeysetPage(rows[:page_size], key, page_size, has_next=len(rows) > page_size, has_previous=after is not None)
@@ -0,0 +1,166 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+#timings of the request being handled, if PerformanceMiddleware is installed
+current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    """Queries run and time spent in SQL and templates, e.g. during one request or a benchmark run."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper counting every query."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += perf_counter() - started
+            self.queries += 1
+
+
+class NPlusOneError(Exception):
+    """Raised at the end of a request that lazily loaded the same relation again and again."""
+
+
+class NPlusOneDetector:
+    """
+    execute_wrapper that counts queries run by lazy related-object access, by shape and origin.
+
+    A query is a lazy load when it is run from Django's related descriptors,
+    e.g. by lesson.tutor.user. Its origin is the innermost template line
+    being rendered or, outside templates, the innermost line of project code.
+    """
+
+    RELATED_DESCRIPTORS = str(Path("django", "db", "models", "fields", "related_descriptors.py"))
+    PROJECT_DIR = str(settings.BASE_DIR)
+
+    def __init__(self):
+        self.lazy_loads = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        origin = self.get_lazy_load_origin(sys._getframe(1))
+        if origin is not None:
+            #placeholder lists of any length have the same shape
+            shape = re.sub(r"%s(, %s)*", "%s", sql)
+            self.lazy_loads[origin, shape] += 1
+        return execute(sql, params, many, context)
+
+    def get_lazy_load_origin(self, frame):
+        lazy = False
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.endswith(self.RELATED_DESCRIPTORS):
+                lazy = True
+            elif lazy and frame.f_code.co_name == "render_annotated":
+                node = frame.f_locals.get("self")
+                origin, token = getattr(node, "origin", None), getattr(node, "token", None)
+                if origin is not None and token is not None:
+                    return f"{origin.template_name or origin.name}:{token.lineno}"
+            elif lazy and filename.startswith(self.PROJECT_DIR) and "site-packages" not in filename:
+                return f"{Path(filename).relative_to(self.PROJECT_DIR)}:{frame.f_lineno}"
+            frame = frame.f_back
+        return None
+
+    def get_repeated(self, threshold):
+        """(origin, shape, count) of every lazy load repeated at least threshold times."""
+        return [(origin, shape, count) for (origin, shape), count in self.lazy_loads.items() if count >= threshold]
+
+
+class TimedTemplate(Template):
+    """Template that adds its render time, less any SQL run while rendering, to the request's timings."""
+
+    def render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        started, db_seconds = perf_counter(), timings.db_seconds
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_seconds += perf_counter() - started - (timings.db_seconds - db_seconds)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend whose templates are timed.
+
+    Django only sends the template_rendered signal under the test runner's
+    instrumentation, so it can't be used to time production requests.
+    Templates pulled in by {% extends %} and {% include %} are rendered
+    inside the top-level one, so they're counted once.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class PerformanceMiddleware:
+    """
+    Add a Server-Timing header and log a line with the SQL and template cost of every request.
+
+    Requests that repeat a lazy load NPLUSONE_THRESHOLD times are reported
+    too: logged in production, raised as NPlusOneError when NPLUSONE_RAISE
+    is set, as it is for the test suite.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        detector = NPlusOneDetector()
+        token = current_timings.set(timings)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                    stack.enter_context(connection.execute_wrapper(detector))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total_ms = (perf_counter() - started) * 1000
+        db_ms = timings.db_seconds * 1000
+        template_ms = timings.template_seconds * 1000
+
+        response["Server-Timing"] = f"db;dur={db_ms:.1f}, tpl;dur={template_ms:.1f}, total;dur={total_ms:.1f}"
+
+        match = request.resolver_match
+        user = getattr(request, "user", None)
+        fields = {
+            "view": match.view_name if match else request.path,
+            "role": getattr(user, "role", "anonymous") if user and user.is_authenticated else "anonymous",
+            "method": request.method,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "db_ms": round(db_ms, 1),
+            "tpl_ms": round(template_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+        logger.info(" ".join(f"{key}={value}" for key, value in fields.items()), extra=fields)
+
+        for origin, shape, count in detector.get_repeated(settings.NPLUSONE_THRESHOLD):
+            message = f"N+1 queries in {fields['view']}: {count} lazy loads from {origin}: {shape}"
+            if settings.NPLUSONE_RAISE:
+                raise NPlusOneError(message)
+            logger.warning(message, extra={**fields, "origin": origin, "sql": shape, "count": count})
+        return response
@@ -0,0 +1,123 @@
+import random
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from tutorials.tenants import get_current_tenant, get_tenant_database
+
+#set while a replica_reads view runs: whether it has written yet
+_replica_reads = ContextVar("replica_reads", default=None)
+
+
+class TenantRouter:
+    """
+    Send the tutorials app's models to the active tenant's database.
+
+    Sessions and the rest of Django's own tables stay in the default
+    database, which is shared by every tenant. A tenant's own database only
+    gets the tables of the tutorials app and of the auth and contenttypes
+    apps its users refer to.
+    """
+
+    APP_LABELS = {"tutorials", "auth", "contenttypes"}
+
+    def _db_for_model(self, model):
+        if get_current_tenant() is None or model._meta.app_label != "tutorials":
+            return None
+        return get_tenant_database()
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        tenant_databases = {options.get("DATABASE", "default") for options in settings.TENANTS.values()}
+        if db == "default" or db not in tenant_databases:
+            return None
+        if app_label not in self.APP_LABELS:
+            return False
+        return None
+
+
+class BookkeepingRouter:
+    """
+    Keep sessions in BOOKKEEPING_DATABASE, if it is set, and out of every other database.
+    """
+
+    APP_LABELS = {"sessions"}
+
+    def _db_for_model(self, model):
+        if settings.BOOKKEEPING_DATABASE and model._meta.app_label in self.APP_LABELS:
+            return settings.BOOKKEEPING_DATABASE
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        bookkeeping = settings.BOOKKEEPING_DATABASE
+        if not bookkeeping:
+            return None
+        if app_label in self.APP_LABELS:
+            return db == bookkeeping
+        if db == bookkeeping:
+            return False
+        return None
+
+
+class ReplicaRouter:
+    """
+    Send reads of the tutorials app's models from replica_reads views to a random replica.
+
+    Everything else, including every write, goes to the default database.
+    After a view writes, its remaining reads go to the default database too,
+    so it reads its own writes. The replicas are copies of the default
+    database only: under a tenant, TenantRouter answers first and every
+    read goes to the tenant's database.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _replica_reads.get()
+        if state is None or state["wrote"] or not settings.DATABASE_REPLICAS:
+            return None
+        if get_current_tenant() is not None:
+            return None
+        if model._meta.app_label != "tutorials":
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _replica_reads.get()
+        if state is not None:
+            state["wrote"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {"default", *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        #replicas get their tables from the copy made by refresh_replicas
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def replica_reads(view_func):
+    """Decorator to let a view read from the replicas until it writes."""
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        #the signed-in user comes from the default database, as a replica may not have them yet
+        request.user.is_authenticated
+        token = _replica_reads.set({"wrote": False})
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return _wrapped_view
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from tutorials.caching import queryset_cache
+from tutorials.capabilities import tutor_capabilities
+from tutorials.dashboard_cache import (
+    invalidate_all_dashboards,
+    invalidate_dashboards,
+    invalidate_student_dashboards,
+    invalidate_tutor_dashboards,
+)
+from tutorials.models import Booking, CancelledOccurrence, Lesson, LessonSeries, Student, TermClosure, Tutor, User
+from tutorials.term_calendar import term_calendar
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(pre_save, sender=Booking)
+def set_booking_schedule(sender, instance, **kwargs):
+    """Keep start_at/end_at in step with the date, time and duration, including on fixture loads."""
+    instance.set_schedule()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_queryset_generation(sender, **kwargs):
+    """Move the app's model to a new generation, so querysets cached from it are rebuilt."""
+    if sender._meta.app_label == "tutorials":
+        queryset_cache.bump(sender)
+
+
+@receiver(post_save, sender=Tutor)
+@receiver(post_delete, sender=Tutor)
+def invalidate_tutor_capabilities(sender, **kwargs):
+    """Rebuild the capability matrix after a tutor's specialties or availability may have changed."""
+    tutor_capabilities.invalidate()
+
+
+@receiver(post_save, sender=TermClosure)
+@receiver(post_delete, sender=TermClosure)
+def invalidate_term_closures(sender, **kwargs):
+    """Reload the closures the term calendar skips."""
+    term_calendar.invalidate_closures()
+    #every series may have gained or lost occurrences
+    invalidate_all_dashboards()
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_dashboards(sender, instance, **kwargs):
+    """Drop the dashboards listing the booking, or the lesson it is booked for."""
+    tutor_ids = Lesson.objects.filter(booking_id=instance.pk).values_list("tutor_id", flat=True)
+    invalidate_dashboards([instance.student_id], tutor_ids)
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_tutor(sender, instance, raw, **kwargs):
+    """Note the tutor a lesson had before saving, whose dashboard loses it if it is reassigned."""
+    if not raw:
+        instance._previous_tutor_ids = list(Lesson.objects.filter(pk=instance.pk).values_list("tutor_id", flat=True))
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_lesson_dashboards(sender, instance, **kwargs):
+    """Drop the dashboards of the lesson's student and tutor."""
+    tutor_ids = [instance.tutor_id, *getattr(instance, "_previous_tutor_ids", [])]
+    invalidate_dashboards(Booking.objects.filter(pk=instance.booking_id).values_list("student_id", flat=True), tutor_ids)
+
+
+@receiver(post_save, sender=LessonSeries)
+@receiver(post_delete, sender=LessonSeries)
+def invalidate_series_dashboards(sender, instance, **kwargs):
+    """Drop the dashboards the series' occurrences are listed on."""
+    invalidate_dashboards([instance.student_id], [instance.tutor_id])
+
+
+@receiver(post_save, sender=CancelledOccurrence)
+@receiver(post_delete, sender=CancelledOccurrence)
+def invalidate_cancellation_dashboards(sender, instance, **kwargs):
+    """Drop the dashboards listing the cancelled occurrence."""
+    for student_id, tutor_id in LessonSeries.objects.filter(pk=instance.series_id).values_list("student_id", "tutor_id"):
+        invalidate_dashboards([student_id], [tutor_id])
+
+
+@receiver(post_save, sender=Tutor)
+@receiver(post_delete, sender=Tutor)
+def invalidate_tutor_profile_dashboards(sender, instance, **kwargs):
+    """Drop the dashboards showing the tutor's rate."""
+    invalidate_tutor_dashboards(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+def invalidate_student_profile_dashboards(sender, instance, **kwargs):
+    """Drop the dashboards showing the student's level."""
+    invalidate_student_dashboards(instance.pk)
+
+
+@receiver(user_logged_in)
+def record_last_login(sender, user, **kwargs):
+    """Update the user's last_login, unless it was updated within LAST_LOGIN_UPDATE_INTERVAL seconds."""
+    now = timezone.now()
+    if user.last_login is not None and now - user.last_login < timedelta(seconds=settings.LAST_LOGIN_UPDATE_INTERVAL):
+        return
+    user.last_login = now
+    user.save(update_fields=["last_login"])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_dashboards(sender, instance, update_fields=None, **kwargs):
+    """Drop the dashboards showing the user's name, unless only their last login changed."""
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    if instance.role == "tutor":
+        invalidate_tutor_dashboards(instance.pk)
+    elif instance.role == "student":
+        invalidate_student_dashboards(instance.pk)
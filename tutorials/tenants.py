@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+#the tutoring centre the current request or command works for, if any
+_current_tenant = ContextVar("current_tenant", default=None)
+
+SESSION_KEY = "tenant"
+
+
+def get_current_tenant():
+    """The name of the active tenant in TENANTS, or None."""
+    return _current_tenant.get()
+
+
+def get_tenant_setting(name, default=None):
+    """The active tenant's value for name in TENANTS, or default."""
+    tenant = get_current_tenant()
+    if tenant is None:
+        return default
+    return settings.TENANTS[tenant].get(name, default)
+
+
+def get_tenant_database():
+    """The alias of the database the active tenant's rows live in."""
+    return get_tenant_setting("DATABASE", "default")
+
+
+def get_tenant_prefix(prefix):
+    """prefix, scoped to the active tenant, for cache keys that mustn't be shared between tenants."""
+    tenant = get_current_tenant()
+    return prefix if tenant is None else f"{tenant}:{prefix}"
+
+
+@contextmanager
+def activate_tenant(tenant):
+    """Work for tenant, e.g. from a management command, for the duration of the block."""
+    if tenant is not None and tenant not in settings.TENANTS:
+        raise KeyError(f"Unknown tenant: {tenant}")
+    token = _current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def resolve_tenant(request):
+    """
+    The tenant a request is for: the one serving its host, or the one chosen
+    with ?tenant=, or the one stored in its session.
+    """
+    host = request.get_host().split(":")[0]
+    for tenant, options in settings.TENANTS.items():
+        if host in options.get("HOSTS", []):
+            return tenant
+    chosen = request.GET.get(SESSION_KEY)
+    if chosen in settings.TENANTS:
+        return chosen
+    return request.session.get(SESSION_KEY)
+
+
+class TenantMiddleware:
+    """
+    Activate the request's tenant, so TenantRouter sends its queries to the tenant's database.
+
+    Goes after SessionMiddleware and before AuthenticationMiddleware, as the
+    signed-in user is loaded from the tenant's database. A session belongs
+    to one tenant: moving to another starts a new, signed-out session, since
+    its user id means someone else in the other tenant's database.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.TENANTS:
+            return self.get_response(request)
+
+        tenant = resolve_tenant(request)
+        if tenant not in settings.TENANTS:
+            tenant = None
+        if request.session.get(SESSION_KEY) != tenant:
+            if not request.session.is_empty():
+                request.session.flush()
+            if tenant is not None:
+                request.session[SESSION_KEY] = tenant
+
+        request.tenant = tenant
+        token = _current_tenant.set(tenant)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_tenant.reset(token)
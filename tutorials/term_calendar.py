@@ -0,0 +1,105 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+from dateutil import easter
+from dateutil.relativedelta import relativedelta, MO, SU
+from tutorials.caching import ProcessLocalCache
+from tutorials.models.term_closure_model import TermClosure
+
+
+def compute_term_dates(year):
+    """The three terms of a year as {name: (first day, last day)}."""
+    #calculate Easter Sunday
+    easter_date = easter.easter(year)
+
+    #Term 1: First Monday in January to the Sunday before Easter
+    first_monday_jan = date(year, 1, 1) + relativedelta(weekday=MO(+1))
+    term_1_end = easter_date - timedelta(days=easter_date.weekday() + 1)  # Ensure it ends on a Sunday
+
+    #Term 2: First Monday 2 weeks after Term 1 ends to the Sunday before July 18th (approximate end)
+    term_2_start = term_1_end + timedelta(weeks=2)
+    term_2_start = term_2_start + relativedelta(weekday=MO(+1))
+    july_18 = date(year, 7, 18)
+    term_2_end = july_18 + relativedelta(weekday=SU(-1))  # Ensure it ends on a Sunday
+
+    #Term 3: First Monday in September to the Sunday 2 weeks before Term 1 (next year) starts
+    first_monday_sep = date(year, 9, 1) + relativedelta(weekday=MO(+1))
+    first_monday_jan_next = date(year+1, 1, 1) + relativedelta(weekday=MO(+1))
+    term_3_end = first_monday_jan_next - timedelta(weeks=2)  # Two weeks before Term 1 starts
+    term_3_end = term_3_end + relativedelta(weekday=SU(-1))  # Ensure it ends on a Sunday
+
+    return {
+        "Term 1": (first_monday_jan, term_1_end),
+        "Term 2": (term_2_start, term_2_end),
+        "Term 3": (first_monday_sep, term_3_end),
+    }
+
+
+class _Closures(ProcessLocalCache):
+    """Every TermClosure as sorted (start, end) pairs, dropped when one is saved or deleted in any process."""
+
+    models = (TermClosure,)
+
+    def build(self):
+        spans = list(TermClosure.objects.order_by("start_date").values_list("start_date", "end_date"))
+        return [start for start, end in spans], spans
+
+
+class TermCalendar:
+    """
+    Term boundaries and closures, shared by booking forms, recurrence and reports.
+
+    Term tables are pure functions of the year, so each is computed once per
+    process. Finding the term that contains a date bisects that year's term
+    starts. Closures live in the TermClosure table and are cached like the
+    tutor capability matrix.
+    """
+
+    def __init__(self):
+        self._terms = {}
+        self._closures = _Closures()
+
+    def _get_year(self, year):
+        if year not in self._terms:
+            terms = sorted((start, end, name) for name, (start, end) in compute_term_dates(year).items())
+            self._terms[year] = ([start for start, end, name in terms], terms)
+        return self._terms[year]
+
+    def get_terms(self, year):
+        """The terms of year as {name: (first day, last day)}, in date order."""
+        return {name: (start, end) for start, end, name in self._get_year(year)[1]}
+
+    def get_term(self, day):
+        """(name, first day, last day) of the term containing day, or None in the holidays."""
+        starts, terms = self._get_year(day.year)
+        position = bisect_right(starts, day) - 1
+        if position < 0:
+            return None
+        start, end, name = terms[position]
+        if day > end:
+            return None
+        return name, start, end
+
+    def get_term_end(self, day):
+        """Last day of the term containing day, or None in the holidays."""
+        term = self.get_term(day)
+        return term[2] if term else None
+
+    def get_closed_dates(self, start, end):
+        """Dates between start and end (inclusive) on which there is a closure."""
+        starts, spans = self._closures.get()
+        closed = set()
+        for closure_start, closure_end in spans[:bisect_right(starts, end)]:
+            current = max(closure_start, start)
+            while current <= min(closure_end, end):
+                closed.add(current)
+                current += timedelta(days=1)
+        return closed
+
+    def is_closed(self, day):
+        return bool(self.get_closed_dates(day, day))
+
+    def invalidate_closures(self):
+        self._closures.invalidate()
+
+
+term_calendar = TermCalendar()
@@ -0,0 +1,21 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+
+class MigrateBookkeepingCommandTest(TestCase):
+    """Tests of the migrate_bookkeeping command."""
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('migrate_bookkeeping', *args, stdout=out)
+        return out.getvalue()
+
+    def test_no_bookkeeping_database_configured(self):
+        self.assertIn('No bookkeeping database', self.run_command())
+
+    @override_settings(BOOKKEEPING_DATABASE='default')
+    def test_rejects_the_default_database(self):
+        with self.assertRaises(CommandError):
+            self.run_command()
@@ -0,0 +1,29 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from tutorials.models import Booking
+
+
+class MigrateTenantsCommandTest(TestCase):
+    """Tests of the migrate_tenants command."""
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('migrate_tenants', *args, verbosity=0, stdout=out)
+        return out.getvalue()
+
+    def test_no_tenants_configured(self):
+        self.assertIn('No tenants', self.run_command())
+
+    @override_settings(TENANTS={'north': {'DATABASE': 'default'}})
+    def test_rejects_unknown_tenants(self):
+        with self.assertRaises(CommandError):
+            self.run_command('south')
+
+    @override_settings(TENANTS={'north': {'DATABASE': 'default', 'VENUE': 'Code Tutors North'}})
+    def test_migrates_and_seeds_each_tenant(self):
+        output = self.run_command('--seed', '--random-seed', '1')
+        self.assertIn('Migrating north (default)', output)
+        self.assertIn('Seeding north (default)', output)
+        self.assertEqual(set(Booking.objects.values_list('venue', flat=True)), {'Code Tutors North'})
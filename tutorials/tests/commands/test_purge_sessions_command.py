@@ -0,0 +1,35 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+
+class PurgeSessionsCommandTest(TestCase):
+    """Tests of the purge_sessions command."""
+
+    def setUp(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='current', session_data='', expire_date=now + timedelta(days=1))
+
+    def purge(self, *args):
+        out = StringIO()
+        call_command('purge_sessions', *args, stdout=out)
+        return out.getvalue()
+
+    def test_removes_only_expired_sessions(self):
+        output = self.purge()
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['current'])
+        self.assertIn('Removed 5 expired sessions', output)
+
+    def test_removes_in_chunks(self):
+        self.purge('--chunk-size', '2')
+        self.assertEqual(Session.objects.count(), 1)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_nothing_to_purge_with_cookie_sessions(self):
+        self.assertIn('nothing to purge', self.purge())
+        self.assertEqual(Session.objects.count(), 6)
@@ -0,0 +1,21 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+
+class RefreshReplicasCommandTest(TestCase):
+    """Tests of the refresh_replicas command."""
+
+    def refresh(self, *args):
+        out = StringIO()
+        call_command('refresh_replicas', *args, stdout=out)
+        return out.getvalue()
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_rejects_unknown_replicas(self):
+        with self.assertRaises(CommandError):
+            self.refresh('other')
+
+    def test_no_replicas_configured(self):
+        self.assertIn('No replicas', self.refresh())
@@ -0,0 +1,76 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from tutorials.capabilities import tutor_capabilities
+from tutorials.management.commands.seed import generate_users, init_generator
+from tutorials.models import User, Admin, Tutor, Student, Booking, Lesson
+
+
+class SeedCommandTest(TestCase):
+    """Tests of the seed command."""
+
+    def seed(self, **options):
+        call_command('seed', stdout=StringIO(), **options)
+
+    def test_scale_options(self):
+        self.seed(users=40, tutors=6, bookings=30, lessons=10, batch_size=7)
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Admin.objects.count(), 10)
+        self.assertEqual(Tutor.objects.count(), 6)
+        self.assertEqual(Student.objects.count(), 24)
+        self.assertEqual(Booking.objects.count(), 30)
+        self.assertLessEqual(Lesson.objects.count(), 10)
+        self.assertEqual(Booking.objects.filter(status='CLOSED').count(), Lesson.objects.count())
+
+    def test_users_share_default_password(self):
+        self.seed(users=15, tutors=2, bookings=0, lessons=0)
+        for user in User.objects.all()[:3]:
+            self.assertTrue(user.check_password('Password123'))
+
+    def test_bookings_have_schedule(self):
+        self.seed(users=15, tutors=2, bookings=10, lessons=0)
+        self.assertFalse(Booking.objects.filter(start_at=None).exists())
+
+    def test_lessons_match_tutor_capabilities(self):
+        self.seed(users=20, tutors=5, bookings=30, lessons=30)
+        for lesson in Lesson.objects.select_related('booking'):
+            self.assertTrue(tutor_capabilities.can_teach(lesson.tutor_id, lesson.booking.lang, lesson.booking.day))
+
+    def test_workers(self):
+        self.seed(users=40, tutors=6, bookings=30, lessons=10, batch_size=7, workers=2)
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Tutor.objects.count(), 6)
+        self.assertEqual(Booking.objects.count(), 30)
+        self.assertFalse(Booking.objects.filter(start_at=None).exists())
+
+    def test_generated_rows_depend_only_on_seed(self):
+        init_generator()
+        rows = generate_users('tutor', 1, 5, 'seed-1')
+        generate_users('tutor', 1, 5, 'seed-2')
+        self.assertEqual(generate_users('tutor', 1, 5, 'seed-1'), rows)
+
+    def test_random_seed_makes_data_reproducible(self):
+        self.seed(users=20, tutors=5, bookings=15, lessons=10, random_seed=42)
+        first = self._snapshot()
+        call_command('unseed', stdout=StringIO())
+        self.seed(users=20, tutors=5, bookings=15, lessons=10, random_seed=42)
+        self.assertEqual(self._snapshot(), first)
+
+    def _snapshot(self):
+        # usernames end in a suffix taken from the pk sequence, which unseed doesn't reset
+        users = list(User.objects.order_by('pk').values_list('first_name', 'last_name', 'role'))
+        tutors = list(Tutor.objects.order_by('pk').values_list('user__last_name', 'rate', 'specializes_in_python', 'available_monday'))
+        bookings = list(Booking.objects.order_by('pk').values_list('student__user__last_name', 'date', 'time', 'lang', 'day'))
+        lessons = list(Lesson.objects.order_by('pk').values_list('booking__date', 'tutor__user__last_name'))
+        return users, tutors, bookings, lessons
+
+    def test_seeding_twice_tops_up(self):
+        self.seed(users=15, tutors=2, bookings=0, lessons=0)
+        self.seed(users=25, tutors=4, bookings=0, lessons=0)
+        self.assertEqual(User.objects.count(), 25)
+        self.assertEqual(Tutor.objects.count(), 4)
+
+    @override_settings(TENANTS={'south': {'DATABASE': 'default', 'VENUE': 'Code Tutors South'}})
+    def test_tenant_option(self):
+        self.seed(users=15, tutors=2, bookings=5, lessons=0, tenant='south')
+        self.assertEqual(set(Booking.objects.values_list('venue', flat=True)), {'Code Tutors South'})
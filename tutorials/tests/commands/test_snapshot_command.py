@@ -0,0 +1,43 @@
+from io import StringIO
+from tempfile import TemporaryDirectory
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase, override_settings
+from tutorials.models import Booking, User
+
+
+class SnapshotCommandTest(TransactionTestCase):
+    """Tests of the snapshot command."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.snapshot_dir = TemporaryDirectory()
+        self.settings = override_settings(SNAPSHOT_DIR=self.snapshot_dir.name)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.snapshot_dir.cleanup()
+
+    def snapshot(self, *args):
+        call_command('snapshot', *args, stdout=StringIO())
+
+    def test_load_restores_saved_snapshot(self):
+        self.snapshot('save', 'fixtures')
+        Booking.objects.all().delete()
+        User.objects.filter(username='@peter').delete()
+        self.snapshot('load', 'fixtures')
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertTrue(User.objects.filter(username='@peter').exists())
+
+    def test_load_missing_snapshot(self):
+        with self.assertRaises(CommandError):
+            self.snapshot('load', 'missing')
+
+    def test_invalid_name(self):
+        with self.assertRaises(CommandError):
+            self.snapshot('save', '../outside')
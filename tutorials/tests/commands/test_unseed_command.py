@@ -0,0 +1,62 @@
+from datetime import date, time
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from tutorials.models import User, Admin, Student, Tutor, Booking, Lesson, LessonSeries, CancelledOccurrence
+
+
+class UnseedCommandTest(TestCase):
+    """Tests of the unseed command."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        #@charlie stays, along with their bookings
+        User.objects.filter(username__in=['@johndoe', '@charlie']).update(is_staff=True)
+        self.series = LessonSeries.objects.create(
+            student=Student.objects.get(pk=4),
+            tutor=Tutor.objects.get(pk=2),
+            start_date=date(2025, 1, 6),
+            end_date=date(2025, 2, 2),
+            time=time(10, 0),
+        )
+        self.series.cancel(date(2025, 1, 13))
+
+    def unseed(self, *args):
+        out = StringIO()
+        call_command('unseed', *args, stdout=out)
+        return out.getvalue()
+
+    def test_removes_non_staff_users_and_their_rows(self):
+        self.unseed('--chunk-size', '1')
+        self.assertEqual(set(User.objects.values_list('username', flat=True)), {'@johndoe', '@charlie'})
+        self.assertFalse(Tutor.objects.exists())
+        self.assertFalse(Student.objects.filter(pk=4).exists())
+        self.assertFalse(Booking.objects.filter(pk=11).exists())
+        self.assertFalse(LessonSeries.objects.exists())
+        self.assertFalse(CancelledOccurrence.objects.exists())
+
+    def test_keeps_staff_rows(self):
+        self.unseed()
+        self.assertTrue(Admin.objects.filter(pk=1).exists())
+        self.assertTrue(Student.objects.filter(pk=3).exists())
+        self.assertTrue(Booking.objects.filter(pk=10).exists())
+        #the lesson went with its tutor, as a cascade would do
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_reports_rows_removed(self):
+        output = self.unseed()
+        self.assertIn('Removed 1 rows from tutorials_lessonseries', output)
+        self.assertIn('Removed 2 rows from tutorials_user\n', output)
+        self.assertRegex(output, r'Removed \d+ rows in \d+\.\d+s\.')
+
+    @override_settings(TENANTS={'south': {'DATABASE': 'default'}})
+    def test_tenant_option(self):
+        self.unseed('--tenant', 'south')
+        self.assertEqual(set(User.objects.values_list('username', flat=True)), {'@johndoe', '@charlie'})
+        with self.assertRaises(CommandError):
+            self.unseed('--tenant', 'north')
@@ -69,3 +69,14 @@ class StudentSignUpFormTestCase(TestCase):
         self.assertEqual(user.email, 'janedoe@example.org')
         self.assertEqual(user.role, 'student')
         self.assertTrue(Student.objects.filter(user=user).exists())
+
+    def test_form_builds_the_user_without_saving(self):
+        form = StudentSignUpForm(data=self.form_input)
+        self.assertTrue(form.is_valid())
+        before_count = User.objects.count()
+        user = form.save(commit=False)
+        self.assertEqual(User.objects.count(), before_count)
+        self.assertTrue(user.check_password('Password123'))
+        form.save_user(user)
+        self.assertEqual(User.objects.count(), before_count + 1)
+        self.assertEqual(Student.objects.get(user=user).level, 'BEGINNER')
@@ -1,6 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from django.test import TestCase
+from datetime import datetime, timezone
 from tutorials.models.booking_model import Booking
 from tutorials.models.student_model import Student
 from tutorials.models.user_models import User
@@ -250,6 +251,23 @@ class BookingModelTestCase(TestCase):
         self.booking.status = "OPEN          "
         self._assert_booking_is_invalid()
 
+    #tests for start_at/end_at
+    def test_schedule_is_set_on_save(self):
+        self.assertEqual(self.booking.start_at, datetime(2024, 12, 2, 14, 30, tzinfo=timezone.utc))
+        self.assertEqual(self.booking.end_at, datetime(2024, 12, 2, 15, 30, tzinfo=timezone.utc))
+
+    def test_long_booking_ends_after_two_hours(self):
+        self.booking.duration = "long"
+        self.booking.save()
+        self.assertEqual(self.booking.end_at, datetime(2024, 12, 2, 16, 30, tzinfo=timezone.utc))
+
+    def test_schedule_follows_date_and_time_changes(self):
+        self.booking.date = "2024-12-09"
+        self.booking.time = "10:00:00"
+        self.booking.save()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.start_at, datetime(2024, 12, 9, 10, 0, tzinfo=timezone.utc))
+
     #helper methods
     def _assert_booking_is_valid(self):
         try:
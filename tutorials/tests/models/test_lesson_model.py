@@ -126,6 +126,22 @@ class LessonModelTest(TestCase):
         
         self.assertEqual(self.lesson.invoice, 0)
 
+    def test_with_invoice_matches_property(self):
+        lesson = Lesson.objects.with_invoice().get(booking_id=self.lesson.booking_id)
+        self.assertEqual(lesson.invoice, self.lesson.invoice)
+
+    def test_with_invoice_doubles_long_lessons(self):
+        self.booking.duration = "long"
+        self.booking.save()
+        lesson = Lesson.objects.with_invoice().get(booking_id=self.lesson.booking_id)
+        self.assertEqual(lesson.invoice, self.tutor.rate * 2)
+
+    def test_with_details_loads_in_one_query(self):
+        with self.assertNumQueries(1):
+            lesson = Lesson.objects.with_details().get(booking_id=self.lesson.booking_id)
+            str(lesson)
+            lesson.booking.student.user.username
+
 
     #helper methods
     def _assert_lesson_is_valid(self):
@@ -0,0 +1,86 @@
+from datetime import date, time, datetime, timezone
+from django.test import TestCase
+from tutorials.models import User, Student, Tutor, Lesson, LessonSeries, CancelledOccurrence
+
+
+class LessonSeriesModelTest(TestCase):
+    def setUp(self):
+        student_user = User.objects.create(
+            username='@teststudent',
+            first_name='Test',
+            last_name='Student',
+            email='teststudent@example.com',
+        )
+        self.student = Student.objects.create(user=student_user)
+
+        tutor_user = User.objects.create(
+            username='@testtutor',
+            first_name='Test',
+            last_name='Tutor',
+            email='testtutor@example.com',
+            role='tutor',
+        )
+        self.tutor = Tutor.objects.create(user=tutor_user, specializes_in_python=True, rate=20)
+
+        self.series = LessonSeries.objects.create(
+            student=self.student,
+            tutor=self.tutor,
+            start_date=date(2025, 1, 6),
+            end_date=date(2025, 2, 2),
+            time=time(10, 0),
+            frequency="weekly",
+            duration="long",
+        )
+
+    def test_dates_cover_whole_series(self):
+        self.assertEqual(
+            self.series.get_dates(),
+            [date(2025, 1, 6), date(2025, 1, 13), date(2025, 1, 20), date(2025, 1, 27)],
+        )
+
+    def test_dates_are_limited_to_window(self):
+        self.assertEqual(self.series.get_dates(date(2025, 1, 10), date(2025, 1, 21)), [date(2025, 1, 13), date(2025, 1, 20)])
+
+    def test_fortnightly_dates(self):
+        self.series.frequency = "fortnightly"
+        self.assertEqual(self.series.get_dates(date(2025, 1, 7)), [date(2025, 1, 20)])
+
+    def test_cancelled_dates_are_skipped(self):
+        self.series.cancel(date(2025, 1, 13))
+        self.assertNotIn(date(2025, 1, 13), self.series.get_dates())
+        self.assertIsNone(self.series.get_occurrence(date(2025, 1, 13)))
+
+    def test_cancel_is_idempotent(self):
+        self.series.cancel(date(2025, 1, 13))
+        self.series.cancel(date(2025, 1, 13))
+        self.assertEqual(CancelledOccurrence.objects.count(), 1)
+
+    def test_occurrence_mirrors_lesson(self):
+        occurrence = self.series.get_occurrence(date(2025, 1, 20))
+        self.assertEqual(occurrence.booking.student, self.student)
+        self.assertEqual(occurrence.tutor, self.tutor)
+        self.assertEqual(occurrence.start_at, datetime(2025, 1, 20, 10, 0, tzinfo=timezone.utc))
+        self.assertEqual(occurrence.booking.end_at, datetime(2025, 1, 20, 12, 0, tzinfo=timezone.utc))
+        self.assertEqual(occurrence.invoice, 40)
+        self.assertEqual(occurrence.get_absolute_url(), f'/series/{self.series.pk}/2025-01-20/')
+
+    def test_materialise_writes_single_occurrence(self):
+        lesson = self.series.materialise(date(2025, 1, 13))
+        self.assertEqual(Lesson.objects.count(), 1)
+        self.assertEqual(lesson.booking.date, date(2025, 1, 13))
+        self.assertEqual(lesson.booking.student, self.student)
+        self.assertEqual(lesson.series, self.series)
+        self.assertNotIn(date(2025, 1, 13), LessonSeries.objects.get(pk=self.series.pk).get_dates())
+
+    def test_materialise_rejects_date_outside_series(self):
+        with self.assertRaises(ValueError):
+            self.series.materialise(date(2025, 1, 14))
+
+    def test_active_between(self):
+        self.assertTrue(LessonSeries.objects.active_between(date(2025, 2, 2), date(2025, 3, 1)).exists())
+        self.assertFalse(LessonSeries.objects.active_between(date(2025, 2, 3), date(2025, 3, 1)).exists())
+
+    def test_with_details_expands_without_extra_queries(self):
+        series = LessonSeries.objects.with_details().get(pk=self.series.pk)
+        with self.assertNumQueries(0):
+            [str(occurrence) for occurrence in series.get_occurrences()]
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+from tutorials.caching import invalidate_all_caches, queryset_cache
+from tutorials.forms.lesson_forms import AssignTutorForm
+from tutorials.models import Tutor, User
+
+class QuerysetCacheTest(TransactionTestCase):
+    """Tests of the generational queryset cache."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        cache.clear()
+        queryset_cache.hits = queryset_cache.misses = 0
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_repeated_lookup_is_a_hit(self):
+        tutors = Tutor.objects.select_related('user')
+        first = queryset_cache.get_list(tutors, User)
+        with self.assertNumQueries(0):
+            second = queryset_cache.get_list(tutors, User)
+        self.assertEqual(first, second)
+        self.assertEqual(queryset_cache.get_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_write_bumps_the_generation(self):
+        queryset_cache.get_list(Tutor.objects.all())
+        tutor = Tutor.objects.get(pk=2)
+        tutor.rate = 1
+        tutor.save()
+        [cached] = queryset_cache.get_list(Tutor.objects.all())
+        self.assertEqual(cached.rate, 1)
+        self.assertEqual(queryset_cache.misses, 2)
+
+    def test_joined_model_write_bumps_the_generation(self):
+        queryset_cache.get_list(Tutor.objects.select_related('user'), User)
+        User.objects.filter(pk=2).update(first_name='Janet')
+        User.objects.get(pk=2).save()
+        [cached] = queryset_cache.get_list(Tutor.objects.select_related('user'), User)
+        self.assertEqual(cached.user.first_name, 'Janet')
+
+    def test_invalidate_all_caches_drops_rows_written_without_signals(self):
+        queryset_cache.get_list(Tutor.objects.all())
+        Tutor.objects.filter(pk=2).update(rate=1)
+        invalidate_all_caches()
+        [cached] = queryset_cache.get_list(Tutor.objects.all())
+        self.assertEqual(cached.rate, 1)
+
+    def test_rows_read_in_a_rolled_back_transaction_are_not_cached(self):
+        with transaction.atomic():
+            Tutor.objects.create(user=User.objects.create(username='@rolledback', email='rb@example.org', role='tutor'))
+            self.assertEqual(len(queryset_cache.get_list(Tutor.objects.all())), 2)
+            transaction.set_rollback(True)
+        self.assertEqual(len(queryset_cache.get_list(Tutor.objects.all())), 1)
+
+    def test_empty_queryset_is_not_looked_up(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(queryset_cache.get_list(Tutor.objects.filter(pk__in=[])), [])
+
+    def test_assign_tutor_form_reuses_cached_tutors(self):
+        AssignTutorForm(tutors=Tutor.objects.all())
+        with self.assertNumQueries(0):
+            form = AssignTutorForm(tutors=Tutor.objects.all())
+        self.assertEqual([tutor.pk for tutor in form.tutors], [2])
+        self.assertEqual(list(form.fields['tutor'].choices)[1][0], 2)
+
+    def test_manage_tutors_page_is_cached(self):
+        self.client.force_login(User.objects.get(pk=1))
+        self.client.get(reverse('manage_tutors'))
+        hits = queryset_cache.hits
+        response = self.client.get(reverse('manage_tutors'))
+        self.assertEqual(queryset_cache.hits, hits + 1)
+        self.assertEqual([tutor.pk for tutor in response.context['users']], [2])
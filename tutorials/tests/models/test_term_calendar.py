@@ -0,0 +1,67 @@
+from datetime import date, time
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from tutorials.caching import queryset_cache
+from tutorials.models import Booking, LessonSeries, Student, TermClosure, Tutor, User
+from tutorials.term_calendar import TermCalendar, term_calendar
+from tutorials.views.lesson_views import get_recurring_dates
+
+class TermCalendarTestCase(TestCase):
+    """Unit tests for the term calendar and term closures."""
+
+    def setUp(self):
+        student_user = User.objects.create(username='@student', email='student@example.org', first_name='Test', last_name='Student')
+        tutor_user = User.objects.create(username='@tutor', email='tutor@example.org', first_name='Test', last_name='Tutor', role='tutor')
+        self.student = Student.objects.create(user=student_user)
+        self.tutor = Tutor.objects.create(user=tutor_user, rate=20)
+        self.booking = Booking(student=self.student, date=date(2025, 12, 1), time=time(10, 0), day='Monday')
+
+    def test_terms(self):
+        self.assertEqual(term_calendar.get_terms(2025), {
+            "Term 1": (date(2025, 1, 6), date(2025, 4, 13)),
+            "Term 2": (date(2025, 4, 28), date(2025, 7, 13)),
+            "Term 3": (date(2025, 9, 1), date(2025, 12, 21)),
+        })
+
+    def test_get_term(self):
+        self.assertEqual(term_calendar.get_term(date(2025, 5, 1)), ("Term 2", date(2025, 4, 28), date(2025, 7, 13)))
+        self.assertEqual(term_calendar.get_term(date(2025, 1, 6)), ("Term 1", date(2025, 1, 6), date(2025, 4, 13)))
+        self.assertEqual(term_calendar.get_term_end(date(2025, 12, 21)), date(2025, 12, 21))
+
+    def test_holidays_are_in_no_term(self):
+        self.assertIsNone(term_calendar.get_term(date(2025, 1, 1)))
+        self.assertIsNone(term_calendar.get_term(date(2025, 4, 20)))
+        self.assertIsNone(term_calendar.get_term_end(date(2025, 8, 1)))
+
+    def test_closures_are_skipped_by_recurrence(self):
+        TermClosure.objects.create(start_date=date(2025, 12, 8), end_date=date(2025, 12, 9), reason='Staff training')
+        self.assertEqual(get_recurring_dates(self.booking), [date(2025, 12, 1), date(2025, 12, 15)])
+
+    def test_closures_are_skipped_by_lesson_series(self):
+        series = LessonSeries.from_booking(self.booking, self.tutor, date(2025, 12, 21))
+        series.save()
+        closure = TermClosure.objects.create(start_date=date(2025, 12, 15), end_date=date(2025, 12, 15))
+        self.assertEqual(series.get_dates(), [date(2025, 12, 1), date(2025, 12, 8)])
+        closure.delete()
+        self.assertEqual(len(series.get_dates()), 3)
+
+    def test_closures_are_cached(self):
+        TermClosure.objects.create(start_date=date(2025, 12, 8), end_date=date(2025, 12, 8))
+        calendar = TermCalendar()
+        with self.assertNumQueries(1):
+            self.assertTrue(calendar.is_closed(date(2025, 12, 8)))
+            self.assertFalse(calendar.is_closed(date(2025, 12, 9)))
+            calendar.get_terms(2025)
+
+    def test_closures_saved_in_another_process_are_seen(self):
+        calendar = TermCalendar()
+        self.assertFalse(calendar.is_closed(date(2025, 12, 8)))
+        #no signals here; the other process's post_save moves the TermClosure generation on
+        TermClosure.objects.bulk_create([TermClosure(start_date=date(2025, 12, 8), end_date=date(2025, 12, 8))])
+        queryset_cache.bump(TermClosure)
+        self.assertTrue(calendar.is_closed(date(2025, 12, 8)))
+
+    def test_closure_cannot_end_before_it_starts(self):
+        closure = TermClosure(start_date=date(2025, 12, 8), end_date=date(2025, 12, 7))
+        with self.assertRaises(ValidationError):
+            closure.full_clean()
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from tutorials.capabilities import TutorCapabilityMatrix, tutor_capabilities
+from tutorials.models.tutor_model import Tutor
+
+class TutorCapabilityMatrixTestCase(TestCase):
+    """Unit tests for the in-memory tutor capability matrix."""
+
+    fixtures = ['tutorials/tests/fixtures/default_user.json', 'tutorials/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.tutor = Tutor.objects.get(pk=2)
+
+    def test_candidates_match_specialty_and_availability(self):
+        self.assertEqual(tutor_capabilities.get_candidate_ids('Python', 'Monday'), (2,))
+        self.assertEqual(tutor_capabilities.get_candidate_ids('Ruby', 'Sunday'), (2,))
+        self.assertEqual(tutor_capabilities.get_candidate_ids('Java', 'Monday'), ())
+        self.assertEqual(tutor_capabilities.get_candidate_ids('Python', 'Wednesday'), ())
+
+    def test_candidates_queryset(self):
+        self.assertEqual(list(tutor_capabilities.get_candidates('SQL', 'Tuesday')), [self.tutor])
+
+    def test_can_teach(self):
+        self.assertTrue(tutor_capabilities.can_teach(2, 'SQL', 'Thursday'))
+        self.assertFalse(tutor_capabilities.can_teach(2, 'C', 'Thursday'))
+        self.assertFalse(tutor_capabilities.can_teach(999, 'SQL', 'Thursday'))
+
+    def test_unsupported_language_raises(self):
+        with self.assertRaises(ValueError):
+            tutor_capabilities.get_candidate_ids('Cobol', 'Monday')
+
+    def test_saving_tutor_invalidates(self):
+        tutor_capabilities.get_candidate_ids('Java', 'Monday')
+        self.tutor.specializes_in_java = True
+        self.tutor.save()
+        self.assertEqual(tutor_capabilities.get_candidate_ids('Java', 'Monday'), (2,))
+
+    def test_deleting_tutor_invalidates(self):
+        tutor_capabilities.get_candidate_ids('Python', 'Monday')
+        self.tutor.delete()
+        self.assertEqual(tutor_capabilities.get_candidate_ids('Python', 'Monday'), ())
+
+    def test_lookups_are_cached(self):
+        matrix = TutorCapabilityMatrix()
+        with self.assertNumQueries(1):
+            matrix.get_candidate_ids('Python', 'Monday')
+            matrix.get_candidate_ids('Ruby', 'Tuesday')
+            matrix.can_teach(2, 'SQL', 'Thursday')
+
+    def test_invalidating_in_another_process_invalidates(self):
+        #each matrix stands in for another process's copy
+        here, elsewhere = TutorCapabilityMatrix(), TutorCapabilityMatrix()
+        self.assertEqual(here.get_candidate_ids('Java', 'Monday'), ())
+        Tutor.objects.filter(pk=2).update(specializes_in_java=True)
+        elsewhere.invalidate()
+        self.assertEqual(here.get_candidate_ids('Java', 'Monday'), (2,))
@@ -0,0 +1,158 @@
+from threading import Event, Thread
+from time import sleep
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from tutorials.models import Booking, User
+from tutorials.write_queue import WriteQueue, WriteQueueClosed, WriteQueueFull, get_write_queue, run_write, stop_write_queue
+
+class WriteQueueTest(TransactionTestCase):
+    """Tests of the single-writer queue."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        self.queue = WriteQueue(max_size=8, max_batch=8, timeout=1)
+
+    def tearDown(self):
+        self.queue.stop()
+        stop_write_queue()
+
+    def _rename(self, pk, first_name):
+        User.objects.filter(pk=pk).update(first_name=first_name)
+        return first_name
+
+    def _submit_in_thread(self, outcomes, function, *args):
+        def submit():
+            try:
+                outcomes.append(self.queue.submit(function, *args))
+            except Exception as error:
+                outcomes.append(error)
+        thread = Thread(target=submit)
+        thread.start()
+        return thread
+
+    def test_submit_returns_the_committed_result(self):
+        self.queue.start()
+        self.assertEqual(self.queue.submit(self._rename, 3, 'Jo'), 'Jo')
+        self.assertEqual(User.objects.get(pk=3).first_name, 'Jo')
+        self.assertEqual(self.queue.get_stats()['units'], 1)
+
+    def test_queued_writes_commit_together(self):
+        blocked, release, outcomes = Event(), Event(), []
+
+        def block():
+            blocked.set()
+            release.wait()
+
+        self.queue.start()
+        threads = [self._submit_in_thread(outcomes, block)]
+        blocked.wait()
+        threads.append(self._submit_in_thread(outcomes, self._rename, 2, 'Janet'))
+        threads.append(self._submit_in_thread(outcomes, self._rename, 3, 'Jo'))
+        while self.queue.get_stats()['depth'] < 2:
+            sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        stats = self.queue.get_stats()
+        self.assertEqual(stats['batches'], 2)
+        self.assertEqual(stats['last_batch_size'], 2)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['mean_batch_size'], 1.5)
+        self.assertEqual(User.objects.get(pk=3).first_name, 'Jo')
+
+    def test_failing_write_is_rolled_back_alone(self):
+        def fail():
+            self._rename(2, 'Janet')
+            raise ValueError("bad write")
+
+        blocked, release, outcomes = Event(), Event(), []
+        self.queue.start()
+        threads = [self._submit_in_thread(outcomes, lambda: (blocked.set(), release.wait()))]
+        blocked.wait()
+        threads.append(self._submit_in_thread(outcomes, fail))
+        threads.append(self._submit_in_thread(outcomes, self._rename, 3, 'Jo'))
+        while self.queue.get_stats()['depth'] < 2:
+            sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn('Jo', outcomes)
+        self.assertEqual(len([outcome for outcome in outcomes if isinstance(outcome, ValueError)]), 1)
+        self.assertEqual(User.objects.get(pk=2).first_name, 'Jane')
+        self.assertEqual(User.objects.get(pk=3).first_name, 'Jo')
+
+    def test_writer_stopping_fails_waiting_writes(self):
+        blocked, release, outcomes = Event(), Event(), []
+
+        class Stop(BaseException):
+            pass
+
+        def stop():
+            blocked.set()
+            release.wait()
+            raise Stop
+
+        self.queue.start()
+        threads = [self._submit_in_thread(outcomes, stop)]
+        blocked.wait()
+        threads.append(self._submit_in_thread(outcomes, self._rename, 3, 'Jo'))
+        while self.queue.get_stats()['depth'] < 1:
+            sleep(0.001)
+        with self.assertLogs('tutorials.write_queue', 'ERROR'):
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(outcomes), 2)
+        for outcome in outcomes:
+            self.assertIsInstance(outcome, WriteQueueClosed)
+        self.assertNotEqual(User.objects.get(pk=3).first_name, 'Jo')
+        with self.assertRaises(WriteQueueClosed):
+            self.queue.submit(self._rename, 3, 'Jo')
+
+    def test_stopped_queue_is_replaced(self):
+        write_queue = get_write_queue()
+        write_queue.stop()
+        self.assertTrue(write_queue.closed)
+        self.assertIsNot(get_write_queue(), write_queue)
+
+    def test_full_queue_rejects_writes(self):
+        self.queue = WriteQueue(max_size=1, max_batch=1, timeout=0.01)
+        outcomes = []
+        #nothing drains the queue until the writer starts
+        thread = self._submit_in_thread(outcomes, self._rename, 3, 'Jo')
+        while self.queue.get_stats()['depth'] < 1:
+            sleep(0.001)
+        with self.assertRaises(WriteQueueFull):
+            self.queue.submit(self._rename, 3, 'Joe')
+        self.queue.start()
+        thread.join()
+        self.assertEqual(outcomes, ['Jo'])
+
+    def test_run_write_is_inline_when_disabled(self):
+        run_write(self._rename, 3, 'Jo')
+        self.assertEqual(User.objects.get(pk=3).first_name, 'Jo')
+        self.assertFalse(connection.in_atomic_block)
+
+    @override_settings(WRITE_QUEUE_ENABLED=True)
+    def test_run_write_is_inline_inside_a_transaction(self):
+        with transaction.atomic():
+            run_write(self._rename, 3, 'Jo')
+            transaction.set_rollback(True)
+        self.assertEqual(User.objects.get(pk=3).first_name, 'Charlie')
+
+    @override_settings(WRITE_QUEUE_ENABLED=True)
+    def test_booking_is_created_through_the_queue(self):
+        self.client.force_login(User.objects.get(pk=3))
+        before = Booking.objects.count()
+        response = self.client.post(reverse('create_booking'), {
+            'day': 'Monday', 'time': '10:00', 'frequency': 'weekly', 'duration': 'short', 'lang': 'Python'
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.count(), before + 1)
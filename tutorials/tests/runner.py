@@ -0,0 +1,23 @@
+import logging
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner that fails requests with N+1 queries, and keeps the
+    per-request performance log out of the test output.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._nplusone_raise = settings.NPLUSONE_RAISE
+        settings.NPLUSONE_RAISE = True
+        self._performance_logger = logging.getLogger('tutorials.performance')
+        self._performance_level = self._performance_logger.level
+        self._performance_logger.setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        self._performance_logger.setLevel(self._performance_level)
+        settings.NPLUSONE_RAISE = self._nplusone_raise
+        super().teardown_test_environment(**kwargs)
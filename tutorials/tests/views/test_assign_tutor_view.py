@@ -5,7 +5,10 @@ from tutorials.models.tutor_model import Tutor
 from tutorials.models.student_model import Student
 from tutorials.models.booking_model import Booking
 from tutorials.models.lesson_model import Lesson
+from tutorials.models.lesson_series_model import LessonSeries
 from tutorials.models.user_models import User
+from tutorials.views.lesson_views import AssignmentConflict, assign_booking, check_overlapping_lessons, get_recurring_dates
+from datetime import date, time
 
 class AssignTutorViewTest(TestCase):
     fixtures = [
@@ -54,36 +57,23 @@ class AssignTutorViewTest(TestCase):
         messages = [m.message for m in get_messages(response.wsgi_request)]
         self.assertIn("Booking details updated successfully!", messages)
 
-    def test_assign_tutor_creates_lessons(self):
+    def test_assign_tutor_creates_lesson_series(self):
+        lesson_count = Lesson.objects.count()
         response = self.client.post(self.url, {
             "assign_tutor": "",
             "tutor": self.tutor.user_id,
         })
 
         self.assertFalse(Booking.objects.filter(id=self.booking.id).exists())
+        self.assertEqual(Lesson.objects.count(), lesson_count)
 
-        lessons = Lesson.objects.filter(tutor=self.tutor)
-
-        self.assertTrue(lessons.exists())
-
-        lesson_matched = False
-
-        for lesson in lessons:
-            try:
-                self.assertEqual(lesson.booking.student, self.booking.student)
-                self.assertEqual(lesson.booking.lang, self.booking.lang)
-                self.assertEqual(lesson.booking.time, self.booking.time)
-                self.assertEqual(lesson.booking.day, self.booking.day)
-                
-                self.assertTrue(lesson.booking.date >= self.booking.date)
-
-                lesson_matched = True
-                break
-
-            except AssertionError:
-                continue
-        
-        self.assertTrue(lesson_matched, "No lesson met the required criteria")
+        series = LessonSeries.objects.get(tutor=self.tutor)
+        self.assertEqual(series.student, self.booking.student)
+        self.assertEqual(series.lang, self.booking.lang)
+        self.assertEqual(series.time, self.booking.time)
+        self.assertEqual(series.day, self.booking.day)
+        self.assertEqual(series.start_date, self.booking.date)
+        self.assertEqual(series.get_dates(), get_recurring_dates(self.booking))
 
         messages = [m.message for m in get_messages(response.wsgi_request)]
         self.assertIn("Tutor assigned successfully and further lessons booked!", messages)
@@ -104,6 +94,19 @@ class AssignTutorViewTest(TestCase):
         messages = [m.message for m in get_messages(response.wsgi_request)]
         self.assertIn("This tutor is already booked for an overlapping lesson.", messages)
 
+    def test_booking_is_only_assigned_once(self):
+        assign_booking(self.booking.pk, self.tutor)
+        with self.assertRaisesMessage(AssignmentConflict, "This booking has already been assigned."):
+            assign_booking(self.booking.pk, self.tutor)
+        self.assertEqual(LessonSeries.objects.count(), 1)
+
+    def test_overlap_is_checked_when_the_assignment_is_written(self):
+        #a series assigned after the form was shown
+        self._create_series(date(2025, 12, 5), time(10, 30))
+        with self.assertRaises(AssignmentConflict):
+            assign_booking(self.booking.pk, self.tutor)
+        self.assertTrue(Booking.objects.filter(id=self.booking.id).exists())
+
     def test_assign_tutor_invalid_form(self):
         response = self.client.post(self.url, {
             "assign_tutor": "",
@@ -132,4 +135,60 @@ class AssignTutorViewTest(TestCase):
     def test_error_handling_for_missing_booking(self):
         non_existent_url = reverse("assign_tutor", args=[9999])
         response = self.client.get(non_existent_url)
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+
+    def test_recurring_dates_run_until_term_end(self):
+        self.assertEqual(get_recurring_dates(self.booking), [date(2025, 12, 12), date(2025, 12, 19)])
+
+    def test_overlap_later_in_term_is_detected(self):
+        self._create_lesson(date(2025, 12, 19), time(10, 30))
+        self.assertTrue(check_overlapping_lessons(self.tutor, self.booking))
+
+    def test_adjacent_lesson_does_not_overlap(self):
+        self._create_lesson(date(2025, 12, 19), time(11, 0))
+        self.assertFalse(check_overlapping_lessons(self.tutor, self.booking))
+
+    def test_lesson_outside_series_does_not_overlap(self):
+        self._create_lesson(date(2025, 12, 15), time(10, 0))
+        self.assertFalse(check_overlapping_lessons(self.tutor, self.booking))
+
+    def test_overlap_check_query_count(self):
+        # term closures are loaded once per process
+        get_recurring_dates(self.booking)
+        # lessons, then lesson series
+        with self.assertNumQueries(2):
+            check_overlapping_lessons(self.tutor, self.booking)
+
+    def test_overlap_with_lesson_series_is_detected(self):
+        self._create_series(date(2025, 12, 5), time(10, 30))
+        self.assertTrue(check_overlapping_lessons(self.tutor, self.booking))
+
+    def test_cancelled_series_occurrence_does_not_overlap(self):
+        series = self._create_series(date(2025, 12, 5), time(10, 30))
+        series.cancel(date(2025, 12, 12))
+        series.cancel(date(2025, 12, 19))
+        self.assertFalse(check_overlapping_lessons(self.tutor, self.booking))
+
+    def test_series_at_other_time_does_not_overlap(self):
+        self._create_series(date(2025, 12, 5), time(11, 0), frequency="fortnightly")
+        self.assertFalse(check_overlapping_lessons(self.tutor, self.booking))
+
+    def _create_lesson(self, lesson_date, lesson_time):
+        booking = Booking.objects.create(
+            student=Student.objects.get(pk=3),
+            date=lesson_date,
+            time=lesson_time,
+            duration="short",
+            status="CLOSED",
+        )
+        return Lesson.objects.create(booking=booking, tutor=self.tutor)
+
+    def _create_series(self, start_date, start_time, frequency="weekly"):
+        return LessonSeries.objects.create(
+            student=Student.objects.get(pk=3),
+            tutor=self.tutor,
+            start_date=start_date,
+            end_date=date(2025, 12, 21),
+            time=start_time,
+            frequency=frequency,
+        )
@@ -0,0 +1,53 @@
+from datetime import timedelta
+from django.contrib.admin.models import LogEntry
+from django.contrib.sessions.models import Session
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from tutorials.models import Booking, User
+from tutorials.routers import BookkeepingRouter
+
+class BookkeepingTest(TestCase):
+    """Tests of the bookkeeping database router and last_login updates."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        self.router = BookkeepingRouter()
+
+    def test_sessions_use_the_default_database_unless_configured(self):
+        self.assertIsNone(self.router.db_for_write(Session))
+        self.assertIsNone(self.router.allow_migrate('default', 'sessions'))
+
+    @override_settings(BOOKKEEPING_DATABASE='bookkeeping')
+    def test_sessions_are_routed_to_the_bookkeeping_database(self):
+        self.assertEqual(self.router.db_for_read(Session), 'bookkeeping')
+        self.assertEqual(self.router.db_for_write(Session), 'bookkeeping')
+        self.assertIsNone(self.router.db_for_write(Booking))
+        self.assertIsNone(self.router.db_for_write(LogEntry))
+
+    @override_settings(BOOKKEEPING_DATABASE='bookkeeping')
+    def test_only_sessions_are_migrated_on_the_bookkeeping_database(self):
+        self.assertTrue(self.router.allow_migrate('bookkeeping', 'sessions'))
+        self.assertFalse(self.router.allow_migrate('default', 'sessions'))
+        self.assertFalse(self.router.allow_migrate('bookkeeping', 'tutorials'))
+        self.assertIsNone(self.router.allow_migrate('default', 'tutorials'))
+
+    def test_first_login_is_recorded(self):
+        self.assertTrue(self.client.login(username='@charlie', password='Password123'))
+        self.assertIsNotNone(User.objects.get(username='@charlie').last_login)
+
+    def test_recent_login_is_not_written_again(self):
+        recent = timezone.now() - timedelta(minutes=5)
+        User.objects.filter(username='@charlie').update(last_login=recent)
+        self.client.login(username='@charlie', password='Password123')
+        self.assertEqual(User.objects.get(username='@charlie').last_login, recent)
+
+    @override_settings(LAST_LOGIN_UPDATE_INTERVAL=60)
+    def test_old_login_is_updated(self):
+        old = timezone.now() - timedelta(minutes=5)
+        User.objects.filter(username='@charlie').update(last_login=old)
+        self.client.login(username='@charlie', password='Password123')
+        self.assertGreater(User.objects.get(username='@charlie').last_login, old)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from tutorials.dashboard_cache import get_timeout
+from tutorials.models import Booking, Lesson, Tutor, User
+
+class DashboardCacheTest(TransactionTestCase):
+    """Tests of the cached student and tutor dashboards."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.get(username='@charlie')
+        self.tutor = User.objects.get(username='@janedoe')
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_dashboard(self, user, name):
+        if self.client.session.get('_auth_user_id') != str(user.pk):
+            self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name))
+        return response, len(queries)
+
+    def create_lesson(self):
+        day = timezone.now().date() + timedelta(days=7)
+        booking = Booking.objects.create(
+            student=self.student.student_profile, date=day, time='09:00', day=day.strftime('%A'), status='CLOSED'
+        )
+        return Lesson.objects.create(booking=booking, tutor=self.tutor.tutor_profile)
+
+    def test_second_view_is_served_from_cache(self):
+        first, cold_queries = self.get_dashboard(self.student, 'student_dashboard')
+        second, warm_queries = self.get_dashboard(self.student, 'student_dashboard')
+        self.assertLess(warm_queries, cold_queries)
+        self.assertEqual(first.content, second.content)
+
+    def test_schedule_is_the_only_lesson_listing(self):
+        for user, name in [(self.student, 'student_dashboard'), (self.tutor, 'tutor_dashboard')]:
+            response, _ = self.get_dashboard(user, name)
+            self.assertIn('upcoming_schedule', response.context)
+            self.assertNotIn('upcoming_lessons', response.context)
+            self.assertNotIn('previous_lessons', response.context)
+
+    def test_new_lesson_invalidates_student_and_tutor(self):
+        self.get_dashboard(self.student, 'student_dashboard')
+        self.get_dashboard(self.tutor, 'tutor_dashboard')
+        lesson = self.create_lesson()
+        response, _ = self.get_dashboard(self.student, 'student_dashboard')
+        self.assertIn(lesson, response.context['upcoming_schedule'])
+        response, _ = self.get_dashboard(self.tutor, 'tutor_dashboard')
+        self.assertIn(lesson, response.context['upcoming_schedule'])
+
+    def test_rate_change_invalidates_students_invoices(self):
+        self.get_dashboard(self.student, 'student_dashboard')
+        Tutor.objects.filter(pk=self.tutor.pk).update(rate=1)
+        Tutor.objects.get(pk=self.tutor.pk).save()
+        response, _ = self.get_dashboard(self.student, 'student_dashboard')
+        self.assertEqual(response.context['invoice_total'], 1)
+
+    def test_rolled_back_lesson_is_not_cached(self):
+        #log in first, as the session written on login would be rolled back too
+        self.client.force_login(self.student)
+        with transaction.atomic():
+            lesson = self.create_lesson()
+            response, _ = self.get_dashboard(self.student, 'student_dashboard')
+            self.assertIn(lesson, response.context['upcoming_schedule'])
+            transaction.set_rollback(True)
+        response, _ = self.get_dashboard(self.student, 'student_dashboard')
+        self.assertEqual(response.context['upcoming_schedule'], [])
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=60 * 60 * 24 * 30)
+    def test_cached_until_next_lesson_starts(self):
+        lesson = self.create_lesson()
+        seconds = (lesson.booking.start_at - timezone.now()).total_seconds()
+        self.assertAlmostEqual(get_timeout({'upcoming_schedule': [lesson]}), seconds, delta=2)
+        self.assertEqual(get_timeout({'upcoming_schedule': []}), 60 * 60 * 24 * 30)
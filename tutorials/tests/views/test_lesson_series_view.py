@@ -0,0 +1,131 @@
+from datetime import time, timedelta
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tutorials.models import User, Student, Tutor, Lesson, LessonSeries
+
+
+class LessonSeriesViewTest(TestCase):
+    """Tests of the views that show lesson series occurrences."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json',
+    ]
+
+    def setUp(self):
+        self.admin = User.objects.get(pk=1)
+        self.tutor = Tutor.objects.get(pk=2)
+        self.student = Student.objects.get(pk=3)
+        today = timezone.now().date()
+        self.series = LessonSeries.objects.create(
+            student=self.student,
+            tutor=self.tutor,
+            start_date=today - timedelta(days=7),
+            end_date=today + timedelta(days=14),
+            time=time(0, 0),
+        )
+        self.next_date = today + timedelta(days=7)
+        self.url = reverse('get_occurrence', args=[self.series.pk, self.next_date.isoformat()])
+
+    def test_student_dashboard_lists_occurrences(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual([lesson.booking.date for lesson in response.context['upcoming_schedule'] if lesson.booking.pk is None], self.series.get_dates(timezone.now().date() + timedelta(days=1)))
+        self.assertContains(response, self.url)
+
+    def test_tutor_dashboard_lists_occurrences(self):
+        self.client.force_login(self.tutor.user)
+        response = self.client.get(reverse('tutor_dashboard'))
+        previous_dates = [lesson.booking.date for lesson in response.context['previous_schedule']]
+        self.assertIn(self.series.start_date, previous_dates)
+
+    def test_manage_lessons_lists_occurrences_in_window(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('manage_lessons'))
+        self.assertEqual([occurrence.date for occurrence in response.context['occurrences']], [timezone.now().date()])
+
+    def test_manage_lessons_lists_occurrences_in_requested_window(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('manage_lessons'), {'from': self.next_date.isoformat(), 'to': self.series.end_date.isoformat()})
+        self.assertEqual([occurrence.date for occurrence in response.context['occurrences']], [self.next_date, self.next_date + timedelta(days=7)])
+        length = self.series.end_date - self.next_date + timedelta(days=1)
+        self.assertEqual(response.context['next_window'], (self.series.end_date + timedelta(days=1), self.series.end_date + length))
+        self.assertEqual(response.context['previous_window'], (self.next_date - length, self.next_date - timedelta(days=1)))
+        self.assertContains(response, f"?from={(self.series.end_date + timedelta(days=1)).isoformat()}")
+
+    @override_settings(LESSON_SERIES_MAX_WINDOW_DAYS=10)
+    def test_manage_lessons_window_is_bounded(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('manage_lessons'), {'from': self.series.start_date.isoformat(), 'to': '2999-01-01'})
+        self.assertEqual(response.context['window_end'], self.series.start_date + timedelta(days=9))
+
+    def test_manage_lessons_window_is_validated(self):
+        self.client.force_login(self.admin)
+        for query in [{'from': 'not-a-date'}, {'from': self.next_date.isoformat(), 'to': self.series.start_date.isoformat()}]:
+            self.assertEqual(self.client.get(reverse('manage_lessons'), query).status_code, 404)
+
+    def test_get_occurrence(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'entities/lesson.html')
+        self.assertEqual(response.context['lesson'].date, self.next_date)
+
+    def test_get_occurrence_on_date_without_lesson(self):
+        self.client.force_login(self.admin)
+        url = reverse('get_occurrence', args=[self.series.pk, (self.next_date + timedelta(days=1)).isoformat()])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_get_occurrence_with_invalid_date(self):
+        self.client.force_login(self.admin)
+        url = reverse('get_occurrence', args=[self.series.pk, 'not-a-date'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_get_occurrence_as_other_student(self):
+        self.client.force_login(User.objects.get(pk=4))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_cancel_occurrence(self):
+        self.client.force_login(self.student.user)
+        response = self.client.post(reverse('cancel_occurrence', args=[self.series.pk, self.next_date.isoformat()]))
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertNotIn(self.next_date, self.series.get_dates())
+
+    def test_cancel_occurrence_needs_a_post(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('cancel_occurrence', args=[self.series.pk, self.next_date.isoformat()]))
+        self.assertEqual(response.status_code, 405)
+        self.assertIn(self.next_date, self.series.get_dates())
+
+    def test_occurrences_need_a_login(self):
+        for name in ['get_occurrence', 'cancel_occurrence']:
+            url = reverse(name, args=[self.series.pk, self.next_date.isoformat()])
+            response = self.client.post(url)
+            self.assertRedirects(response, f"{reverse('log_in')}?next={url}", fetch_redirect_response=False)
+        self.assertIn(self.next_date, self.series.get_dates())
+
+    def test_materialise_occurrence(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('materialise_occurrence', args=[self.series.pk, self.next_date.isoformat()]))
+        lesson = Lesson.objects.get(series=self.series)
+        self.assertRedirects(response, reverse('assign_tutor', args=[lesson.booking_id]))
+        self.assertEqual(lesson.occurrence_date, self.next_date)
+
+    def test_materialise_occurrence_needs_a_post(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('materialise_occurrence', args=[self.series.pk, self.next_date.isoformat()]))
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Lesson.objects.filter(series=self.series).exists())
+
+    def test_materialise_occurrence_as_student(self):
+        self.client.force_login(self.student.user)
+        response = self.client.post(reverse('materialise_occurrence', args=[self.series.pk, self.next_date.isoformat()]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_deleting_materialised_lesson_cancels_occurrence(self):
+        lesson = self.series.materialise(self.next_date)
+        self.client.force_login(self.admin)
+        self.client.get(reverse('delete_lesson', args=[lesson.booking_id]))
+        self.assertFalse(Lesson.objects.filter(pk=lesson.pk).exists())
+        self.assertNotIn(self.next_date, LessonSeries.objects.get(pk=self.series.pk).get_dates())
@@ -0,0 +1,68 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tutorials.models import User, Student
+
+
+@override_settings(MANAGE_PAGE_SIZE=5, MANAGE_MAX_PAGE_SIZE=10)
+class ManagePaginationViewTest(TestCase):
+    """Tests of keyset pagination on the manage_* views."""
+
+    fixtures = ['tutorials/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.admin = User.objects.get(pk=1)
+        self.client.force_login(self.admin)
+        for i in range(12):
+            user = User.objects.create(
+                username=f'@student{i}',
+                email=f'student{i}@example.org',
+                first_name='Student',
+                last_name=f'{i}',
+                role='student',
+            )
+            Student.objects.create(user=user)
+        self.user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        self.url = reverse('manage_users')
+
+    def test_first_page_uses_default_page_size(self):
+        response = self.client.get(self.url)
+        page = response.context['page']
+        self.assertEqual([user.id for user in response.context['users']], self.user_ids[:5])
+        self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+        self.assertContains(response, f'?after={self.user_ids[4]}&amp;page_size=5')
+
+    def test_next_page_starts_after_cursor(self):
+        response = self.client.get(self.url, {'after': self.user_ids[4]})
+        self.assertEqual([user.id for user in response.context['users']], self.user_ids[5:10])
+        self.assertTrue(response.context['page'].has_previous)
+
+    def test_previous_page_ends_before_cursor(self):
+        response = self.client.get(self.url, {'before': self.user_ids[10]})
+        page = response.context['page']
+        self.assertEqual([user.id for user in response.context['users']], self.user_ids[5:10])
+        self.assertTrue(page.has_previous)
+        self.assertTrue(page.has_next)
+
+    def test_last_page_has_no_next(self):
+        response = self.client.get(self.url, {'after': self.user_ids[9]})
+        self.assertEqual([user.id for user in response.context['users']], self.user_ids[10:])
+        self.assertFalse(response.context['page'].has_next)
+
+    def test_page_size_is_clamped(self):
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.context['users']), 10)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {'after': 'abc'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_students_paginate_on_user_id(self):
+        student_ids = list(Student.objects.order_by('user__id').values_list('user__id', flat=True))
+        response = self.client.get(reverse('manage_students'), {'after': student_ids[4]})
+        self.assertEqual([student.user.id for student in response.context['users']], student_ids[5:10])
+
+    def test_page_query_count_is_constant(self):
+        #the user and the page; the session comes from the cache
+        with self.assertNumQueries(2):
+            self.client.get(reverse('manage_students'), {'after': self.user_ids[2]})
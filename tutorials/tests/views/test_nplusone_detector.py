@@ -0,0 +1,68 @@
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from tutorials.models.lesson_model import Lesson
+from tutorials.models.tutor_model import Tutor
+from tutorials.models.user_models import User
+from tutorials.performance import NPlusOneDetector, NPlusOneError, PerformanceMiddleware
+
+class NPlusOneDetectorTest(TestCase):
+    """Tests of the N+1 query detector."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        for i in range(3):
+            user = User.objects.create(username=f'@python{i}', email=f'python{i}@example.org', first_name='Py', last_name='Tutor', role='tutor')
+            Tutor.objects.create(user=user, specializes_in_python=True, available_monday=True)
+
+    def test_assign_tutor_lists_tutors_without_lazy_loads(self):
+        self.client.force_login(User.objects.get(pk=1))
+        data = {'save_changes': '', 'day': 'Monday', 'time': '10:00', 'frequency': 'weekly', 'duration': 'short', 'lang': 'Python'}
+        response = self.client.post(reverse('assign_tutor', args=[11]), data, follow=True)
+        self.assertContains(response, '>Py Tutor</option>', count=3)
+
+    def test_detects_lazy_loads_in_python(self):
+        detector = NPlusOneDetector()
+        with connection.execute_wrapper(detector):
+            [tutor.user.first_name for tutor in Tutor.objects.all()]
+        [(origin, shape, count)] = detector.get_repeated(2)
+        self.assertTrue(origin.startswith('tutorials/tests/views/test_nplusone_detector.py:'))
+        self.assertIn('tutorials_user', shape)
+        self.assertEqual(count, 4)
+
+    def test_detects_lazy_loads_in_templates(self):
+        template = engines['django'].from_string('{% for tutor in tutors %}\n{{ tutor.user.first_name }}{% endfor %}')
+        detector = NPlusOneDetector()
+        with connection.execute_wrapper(detector):
+            template.render({'tutors': Tutor.objects.all()})
+        [(origin, shape, count)] = detector.get_repeated(2)
+        self.assertEqual(origin, '<unknown source>:2')
+
+    def test_joined_relations_are_not_reported(self):
+        detector = NPlusOneDetector()
+        with connection.execute_wrapper(detector):
+            [tutor.user.first_name for tutor in Tutor.objects.select_related('user')]
+            [lesson.tutor.user.first_name for lesson in Lesson.objects.with_details()]
+        self.assertEqual(detector.get_repeated(2), [])
+
+    def test_middleware_raises_in_tests(self):
+        middleware = PerformanceMiddleware(self._lazy_view)
+        with self.assertRaises(NPlusOneError):
+            middleware(RequestFactory().get('/'))
+
+    @override_settings(NPLUSONE_RAISE=False)
+    def test_middleware_logs_in_production(self):
+        middleware = PerformanceMiddleware(self._lazy_view)
+        with self.assertLogs('tutorials.performance', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('4 lazy loads from tutorials/tests/views/test_nplusone_detector.py:', logs.output[0])
+
+    def _lazy_view(self, request):
+        return HttpResponse(', '.join(tutor.user.first_name for tutor in Tutor.objects.all()))
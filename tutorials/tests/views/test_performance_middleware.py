@@ -0,0 +1,49 @@
+import re
+from django.test import TestCase
+from django.urls import reverse
+from tutorials.models.user_models import User
+
+class PerformanceMiddlewareTest(TestCase):
+    """Tests of the per-request performance middleware."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        self.url = reverse('student_dashboard')
+        self.user = User.objects.get(username='@charlie')
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=\d+\.\d, tpl;dur=\d+\.\d, total;dur=\d+\.\d$'
+        )
+
+    def test_template_time_is_measured(self):
+        response = self.client.get(self.url)
+        template_ms = float(re.search(r'tpl;dur=([\d.]+)', response['Server-Timing']).group(1))
+        total_ms = float(re.search(r'total;dur=([\d.]+)', response['Server-Timing']).group(1))
+        self.assertGreater(template_ms, 0)
+        self.assertLessEqual(template_ms, total_ms)
+
+    def test_logs_a_line_per_request(self):
+        with self.assertLogs('tutorials.performance', 'INFO') as logs:
+            self.client.get(self.url)
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.view, 'student_dashboard')
+        self.assertEqual(record.role, 'student')
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.queries, 0)
+        self.assertIn('view=student_dashboard role=student', record.getMessage())
+
+    def test_anonymous_request(self):
+        self.client.logout()
+        with self.assertLogs('tutorials.performance', 'INFO') as logs:
+            self.client.get(reverse('log_in'))
+        self.assertEqual(logs.records[0].role, 'anonymous')
+        self.assertEqual(logs.records[0].view, 'log_in')
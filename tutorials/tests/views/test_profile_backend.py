@@ -0,0 +1,47 @@
+from django.contrib.auth import authenticate
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tutorials.backends import ProfileBackend
+from tutorials.models.user_models import User
+
+class ProfileBackendTest(TestCase):
+    """Tests of the authentication backend that joins the role profiles."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def test_get_user_loads_profiles_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = ProfileBackend().get_user(3)
+            self.assertEqual(user.get_profile(), user.student_profile)
+            self.assertFalse(hasattr(user, 'tutor_profile'))
+            self.assertFalse(hasattr(user, 'admin_profile'))
+
+    def test_get_unknown_user(self):
+        self.assertIsNone(ProfileBackend().get_user(999))
+
+    def test_authenticate_loads_profiles(self):
+        user = authenticate(username='@janedoe', password='Password123')
+        with self.assertNumQueries(0):
+            self.assertEqual(user.get_profile().pk, 2)
+            self.assertFalse(hasattr(user, 'student_profile'))
+
+    def test_authenticate_rejects_wrong_password(self):
+        self.assertIsNone(authenticate(username='@janedoe', password='WrongPassword123'))
+        self.assertIsNone(authenticate(username='@nobody', password='Password123'))
+
+    def test_user_without_profile(self):
+        user = User.objects.create(username='@noprofile', email='noprofile@example.org', first_name='No', last_name='Profile')
+        self.assertIsNone(ProfileBackend().get_user(user.pk).get_profile())
+
+    def test_dashboard_makes_no_profile_queries(self):
+        self.client.force_login(User.objects.get(pk=3))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        profile_lookups = [query['sql'] for query in queries if query['sql'].startswith('SELECT "tutorials_student"."user_id"')]
+        self.assertEqual(profile_lookups, [])
@@ -0,0 +1,52 @@
+from django.contrib.sessions.models import Session
+from django.db import router
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from tutorials.models import Booking, User
+from tutorials.routers import ReplicaRouter, replica_reads
+from tutorials.tenants import activate_tenant
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTest(SimpleTestCase):
+    """Tests of the read replica router."""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.request = RequestFactory().get('/')
+        self.request.user = User(role='admin')
+
+    def _run_view(self, view_func):
+        return replica_reads(view_func)(self.request)
+
+    def test_reads_outside_replica_views_use_the_default_database(self):
+        self.assertIsNone(self.router.db_for_read(Booking))
+
+    def test_replica_view_reads_from_a_replica(self):
+        self.assertEqual(self._run_view(lambda request: self.router.db_for_read(Booking)), 'replica')
+        self.assertIsNone(self.router.db_for_read(Booking))
+
+    def test_reads_stick_to_the_default_database_after_a_write(self):
+        def view(request):
+            before = self.router.db_for_read(Booking)
+            self.assertEqual(self.router.db_for_write(Booking), 'default')
+            return before, self.router.db_for_read(Booking)
+        self.assertEqual(self._run_view(view), ('replica', None))
+        #the next request starts on the replicas again
+        self.assertEqual(self._run_view(lambda request: self.router.db_for_read(Booking)), 'replica')
+
+    def test_other_apps_read_from_the_default_database(self):
+        self.assertIsNone(self._run_view(lambda request: self.router.db_for_read(Session)))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertIsNone(self._run_view(lambda request: self.router.db_for_read(Booking)))
+
+    @override_settings(TENANTS={'north': {'DATABASE': 'north'}})
+    def test_tenant_reads_use_the_tenant_database(self):
+        def view(request):
+            with activate_tenant('north'):
+                return self.router.db_for_read(Booking), router.db_for_read(Booking), router.db_for_write(Booking)
+        self.assertEqual(self._run_view(view), (None, 'north', 'north'))
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'tutorials'))
+        self.assertIsNone(self.router.allow_migrate('default', 'tutorials'))
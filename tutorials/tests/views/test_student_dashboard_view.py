@@ -24,14 +24,11 @@ class StudentDashboardViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'student_dashboard.html')
 
-        self.assertIn('previous_lessons', response.context)
-        self.assertIn('upcoming_lessons', response.context)
+        self.assertNotIn('previous_lessons', response.context)
+        self.assertNotIn('upcoming_lessons', response.context)
 
-        previous_lessons = response.context['previous_lessons']
-        upcoming_lessons = response.context['upcoming_lessons']
-
-        self.assertEqual(previous_lessons.count(), 0)  # No previous lessons
-        self.assertEqual(upcoming_lessons.count(), 1)  # One upcoming lesson
-        lesson = upcoming_lessons.first()
+        #the fixture's one lesson is in the past or the future, depending on today's date
+        schedule = response.context['previous_schedule'] + response.context['upcoming_schedule']
+        self.assertEqual(len(schedule), 1)
+        lesson = schedule[0]
         self.assertEqual(lesson.booking.student.user.username, '@charlie')
-
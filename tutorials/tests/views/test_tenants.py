@@ -0,0 +1,107 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from tutorials.caching import queryset_cache
+from tutorials.dashboard_cache import dashboard_cache
+from tutorials.models import Booking, Student, Tutor, User
+from tutorials.routers import TenantRouter
+from tutorials.tenants import activate_tenant, get_tenant_database, resolve_tenant
+
+#both tenants live in the test database, so the routing can be followed without extra databases
+TENANTS = {
+    'north': {'DATABASE': 'default', 'HOSTS': ['north.example.org'], 'VENUE': 'Code Tutors North'},
+    'south': {'DATABASE': 'default', 'VENUE': 'Code Tutors South'},
+}
+
+@override_settings(TENANTS=TENANTS, ALLOWED_HOSTS=['testserver', 'north.example.org'])
+class TenantTest(TestCase):
+    """Tests of tenant resolution and routing."""
+
+    fixtures = [
+            'tutorials/tests/fixtures/default_user.json',
+            'tutorials/tests/fixtures/other_users.json'
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        cache.clear()
+
+    def _request(self, path='/', session=None, **extra):
+        request = self.factory.get(path, **extra)
+        request.session = session or {}
+        return request
+
+    def test_tenant_is_resolved_from_the_host(self):
+        request = self._request(HTTP_HOST='north.example.org', session={'tenant': 'south'})
+        self.assertEqual(resolve_tenant(request), 'north')
+
+    def test_tenant_is_resolved_from_the_query_then_the_session(self):
+        self.assertEqual(resolve_tenant(self._request('/?tenant=south')), 'south')
+        self.assertEqual(resolve_tenant(self._request('/?tenant=nowhere', session={'tenant': 'north'})), 'north')
+        self.assertIsNone(resolve_tenant(self._request()))
+
+    def test_router_sends_tutorials_models_to_the_tenant_database(self):
+        router = TenantRouter()
+        self.assertIsNone(router.db_for_write(Booking))
+        with override_settings(TENANTS={'north': {'DATABASE': 'north'}}), activate_tenant('north'):
+            self.assertEqual(get_tenant_database(), 'north')
+            self.assertEqual(router.db_for_read(Booking), 'north')
+            self.assertEqual(router.db_for_write(User), 'north')
+            self.assertIsNone(router.db_for_read(Session))
+
+    @override_settings(TENANTS={'north': {'DATABASE': 'north'}, 'south': {'DATABASE': 'default'}})
+    def test_tenant_databases_only_get_the_tutorials_tables(self):
+        router = TenantRouter()
+        self.assertIsNone(router.allow_migrate('north', 'tutorials'))
+        self.assertIsNone(router.allow_migrate('north', 'auth'))
+        self.assertFalse(router.allow_migrate('north', 'sessions'))
+        self.assertFalse(router.allow_migrate('north', 'admin'))
+        self.assertIsNone(router.allow_migrate('default', 'admin'))
+
+    def test_unknown_tenant_cannot_be_activated(self):
+        with self.assertRaises(KeyError):
+            with activate_tenant('nowhere'):
+                pass
+
+    def test_bookings_get_the_tenant_venue(self):
+        student = Student.objects.get(pk=3)
+        booking = Booking(student=student)
+        self.assertEqual(booking.venue, Booking.VENUE_NAME)
+        with activate_tenant('south'):
+            self.assertEqual(Booking(student=student).venue, 'Code Tutors South')
+
+    def test_session_remembers_the_chosen_tenant(self):
+        self.client.get(reverse('log_in') + '?tenant=south')
+        self.assertEqual(self.client.session['tenant'], 'south')
+        self.client.get(reverse('log_in'))
+        self.assertEqual(self.client.session['tenant'], 'south')
+
+    def test_changing_tenant_signs_out(self):
+        self.client.get(reverse('log_in') + '?tenant=south')
+        self.client.login(username='@charlie', password='Password123')
+        self.assertEqual(self.client.get(reverse('student_dashboard')).status_code, 200)
+        response = self.client.get(reverse('student_dashboard'), HTTP_HOST='north.example.org')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.session['tenant'], 'north')
+
+    def test_entering_a_tenant_signs_out(self):
+        self.client.login(username='@charlie', password='Password123')
+        self.assertEqual(self.client.get(reverse('student_dashboard')).status_code, 200)
+        response = self.client.get(reverse('student_dashboard') + '?tenant=south')
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('_auth_user_id', self.client.session)
+        self.assertEqual(self.client.session['tenant'], 'south')
+
+    def test_caches_are_kept_per_tenant(self):
+        with activate_tenant('north'):
+            dashboard_cache.get('student:3', lambda: 'north dashboard', lambda value: 60)
+            queryset_cache.get_list(Tutor.objects.all())
+        with activate_tenant('south'):
+            self.assertEqual(dashboard_cache.get('student:3', lambda: 'south dashboard', lambda value: 60), 'south dashboard')
+            misses = queryset_cache.misses
+            queryset_cache.get_list(Tutor.objects.all())
+            self.assertEqual(queryset_cache.misses, misses + 1)
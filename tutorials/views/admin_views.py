@@ -1,10 +1,20 @@
+from datetime import date, timedelta
 from sqlite3 import IntegrityError
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from tutorials.models import User, Student, Tutor, Booking, Lesson, Admin
+from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from tutorials.models import User, Student, Tutor, Booking, Lesson, Admin, LessonSeries
 from tutorials.forms.login_forms import AdminSignUpForm
+from tutorials.caching import queryset_cache
+from tutorials.pagination import get_page_cache_key, paginate_by_key
 from django.core.exceptions import PermissionDenied
 from functools import wraps
+from tutorials.routers import replica_reads
+from tutorials.write_queue import run_write
 
 def is_admin_required(view_func):
     """Decorator to check if the user is an admin."""
@@ -23,40 +33,86 @@ def check_admin_or_owner(user, instance):
     raise PermissionDenied("You do not have permission to access this resource.")
 
 @is_admin_required
+@replica_reads
 def manage_users(request):
     """Renders the manage entities template with all user data"""
-    users = User.objects.all().order_by('id')
-    return render(request, "manage/manage_users.html", {'users': users})
+    page = paginate_by_key(request, User.objects.all(), 'id')
+    return render(request, "manage/manage_users.html", {'users': page.object_list, 'page': page})
 
 @is_admin_required
+@replica_reads
 def manage_students(request):
     """Renders the manage entities template with student data"""
-    students = Student.objects.all().order_by('user__id')
-    return render(request, "manage/manage_students.html", {'users': students})
+    page = paginate_by_key(request, Student.objects.select_related('user'), 'user__id')
+    return render(request, "manage/manage_students.html", {'users': page.object_list, 'page': page})
 
 @is_admin_required
+@replica_reads
 def manage_tutors(request):
     """Renders the manage entities template with tutor data"""
-    tutors = Tutor.objects.all().order_by('user__id')
-    return render(request, "manage/manage_tutors.html", {'users': tutors})
+    #the tutor list rarely changes, so pages are cached until a tutor or user is written
+    page = queryset_cache.get(
+        f"manage_tutors:{get_page_cache_key(request)}",
+        [Tutor, User],
+        lambda: paginate_by_key(request, Tutor.objects.select_related('user'), 'user__id'),
+    )
+    return render(request, "manage/manage_tutors.html", {'users': page.object_list, 'page': page})
 
 @is_admin_required
+@replica_reads
 def manage_admins(request):
     """Renders the manage entities template with admin data."""
-    admins = Admin.objects.all().order_by('user__id')
-    return render(request, "manage/manage_admins.html", {'users': admins})
+    page = paginate_by_key(request, Admin.objects.select_related('user'), 'user__id')
+    return render(request, "manage/manage_admins.html", {'users': page.object_list, 'page': page})
 
 @is_admin_required
+@replica_reads
 def manage_bookings(request):
     """Renders the manage entities template with booking data"""
-    bookings = Booking.objects.filter(status="OPEN").order_by('id')
-    return render(request, "manage/manage_bookings.html", {'bookings': bookings})
+    bookings = Booking.objects.filter(status="OPEN").select_related('student__user')
+    page = paginate_by_key(request, bookings, 'id')
+    return render(request, "manage/manage_bookings.html", {'bookings': page.object_list, 'page': page})
+
+def get_occurrence_window(request):
+    """Read ?from= and ?to= from the request, defaulting to LESSON_SERIES_WINDOW_DAYS from today."""
+    try:
+        window_start = date.fromisoformat(request.GET['from']) if request.GET.get('from') else timezone.now().date()
+        window_end = date.fromisoformat(request.GET['to']) if request.GET.get('to') else None
+    except ValueError:
+        raise Http404("Invalid date.")
+    if window_end is None:
+        window_end = window_start + timedelta(days=settings.LESSON_SERIES_WINDOW_DAYS - 1)
+    if window_end < window_start:
+        raise Http404("The window ends before it starts.")
+    #clamped, like the page size, so one request can't expand years of occurrences
+    return window_start, min(window_end, window_start + timedelta(days=settings.LESSON_SERIES_MAX_WINDOW_DAYS - 1))
 
 @is_admin_required
+@replica_reads
 def manage_lessons(request):
     """Renders the manage entities template with lesson data"""
-    lessons = Lesson.objects.all().order_by('booking_id')
-    return render(request, "manage/manage_lessons.html", {'lessons': lessons})
+    page = paginate_by_key(request, Lesson.objects.with_details(), 'booking_id')
+
+    #occurrences of lesson series are only expanded for the window being shown
+    window_start, window_end = get_occurrence_window(request)
+    window_length = window_end - window_start + timedelta(days=1)
+    occurrences = [
+        occurrence
+        for series in LessonSeries.objects.active_between(window_start, window_end).with_details()
+        for occurrence in series.get_occurrences(window_start, window_end)
+    ]
+    occurrences.sort(key=lambda occurrence: occurrence.start_at)
+
+    context = {
+        'lessons': page.object_list,
+        'page': page,
+        'occurrences': occurrences,
+        'window_start': window_start,
+        'window_end': window_end,
+        'previous_window': (window_start - window_length, window_start - timedelta(days=1)),
+        'next_window': (window_end + timedelta(days=1), window_end + window_length),
+    }
+    return render(request, "manage/manage_lessons.html", context)
 
 @is_admin_required
 def add_admin(request):
@@ -72,29 +128,34 @@ def add_admin(request):
     return render(request, "add_admin.html", {"form": form})
 
 @is_admin_required
+@replica_reads
 def get_user(request, id):
     "Renders the specific user template"
     user = get_object_or_404(User, pk=id)
     return render(request, 'entities/user.html', {'user': user})
 
 @is_admin_required
+@replica_reads
 def get_student(request, id):
     "Renders the specific student template"
     student = get_object_or_404(Student, user__id=id)
     return render(request, 'entities/student.html', {'student': student})
 
 @is_admin_required
+@replica_reads
 def get_tutor(request, id):
     "Renders the specific tutor template"
     tutor = get_object_or_404(Tutor, user__id=id)
     return render(request, 'entities/tutor.html', {'tutor': tutor})
 
 @is_admin_required
+@replica_reads
 def get_admin(request, id):
     "Renders the specific admin template."
     admin = get_object_or_404(Admin, user__id=id)
     return render(request, 'entities/admin-profile.html', {'admin': admin})
 
+@replica_reads
 def get_booking(request, id):
     "Renders the specific booking template"
     booking = get_object_or_404(Booking, pk=id)
@@ -104,9 +165,10 @@ def get_booking(request, id):
 
     raise PermissionDenied("You do not have permission to view this booking.")
 
+@replica_reads
 def get_lesson(request, id):
     "Renders the specific lesson template"
-    lesson = get_object_or_404(Lesson, booking__id=id)
+    lesson = get_object_or_404(Lesson.objects.with_details(), booking__id=id)
     booking = lesson.booking
 
     if request.user.role == "admin" or booking.student.user == request.user or lesson.tutor.user == request.user:
@@ -163,9 +225,52 @@ def delete_lesson(request, id):
     lesson = get_object_or_404(Lesson, booking_id=id)
     booking = lesson.booking
     if request.user.role == "admin" or booking.student.user == request.user or lesson.tutor.user == request.user:
+        if lesson.series_id:
+            #stop the series expanding this date again
+            lesson.series.cancel(lesson.occurrence_date)
         booking.delete()
         if request.user.role == "admin":
             return redirect('manage_lessons')
         return redirect('dashboard')
     
     raise PermissionDenied("You do not have permission to delete this lesson.")
+
+def get_occurrence_or_404(user, id, occurrence_date):
+    """Return the occurrence of a lesson series on a date, if the user may access it."""
+    series = get_object_or_404(LessonSeries.objects.with_details(), pk=id)
+    try:
+        occurrence_date = date.fromisoformat(occurrence_date)
+    except ValueError:
+        raise Http404("Invalid date.")
+    occurrence = series.get_occurrence(occurrence_date)
+    if occurrence is None:
+        raise Http404("No lesson on this date.")
+    if user.role == "admin" or series.student.user == user or series.tutor.user == user:
+        return occurrence
+    raise PermissionDenied("You do not have permission to access this lesson.")
+
+@login_required
+def get_occurrence(request, id, date):
+    "Renders the lesson template for an occurrence of a lesson series"
+    occurrence = get_occurrence_or_404(request.user, id, date)
+    context = {'lesson': occurrence, 'role': request.user.role}
+    return render(request, 'entities/lesson.html', context)
+
+@login_required
+@require_POST
+def cancel_occurrence(request, id, date):
+    "Cancel one occurrence of a lesson series"
+    occurrence = get_occurrence_or_404(request.user, id, date)
+    run_write(occurrence.series.cancel, occurrence.date)
+    if request.user.role == "admin":
+        return redirect('manage_lessons')
+    return redirect('dashboard')
+
+@require_POST
+@is_admin_required
+def materialise_occurrence(request, id, date):
+    "Write an occurrence of a lesson series as its own lesson, and open its booking for editing"
+    occurrence = get_occurrence_or_404(request.user, id, date)
+    lesson = run_write(occurrence.series.materialise, occurrence.date)
+    #the booking form on the assign tutor page edits its date, time and details
+    return redirect('assign_tutor', booking_id=lesson.booking_id)
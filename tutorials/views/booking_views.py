@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect
 from tutorials.forms.booking_forms import BookingForm
 from tutorials.models.student_model import Student
+from tutorials.write_queue import run_write
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
@@ -20,7 +21,7 @@ def create_booking(request):
 
                 booking.student = student
                 booking.date = form.cleaned_data['date']
-                booking.save()
+                run_write(booking.save)
                 messages.success(request, "Booking created successfully!")
                 return redirect(f'{request.user.role}_dashboard')
             except Student.DoesNotExist:
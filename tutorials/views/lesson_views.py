@@ -1,13 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from datetime import datetime, timedelta
-from django.db import transaction
+from datetime import timedelta
+from django.db.models import Q
+from tutorials.capabilities import tutor_capabilities
 from tutorials.forms.booking_forms import BookingForm
 from tutorials.models.booking_model import Booking
-from tutorials.models.tutor_model import Tutor
 from tutorials.models.lesson_model import Lesson
+from tutorials.models.lesson_series_model import LessonSeries
+from tutorials.term_calendar import term_calendar
 from tutorials.forms.lesson_forms import AssignTutorForm
 from django.core.exceptions import PermissionDenied
+from tutorials.write_queue import run_write
 
 def assign_tutor(request, booking_id):
     """Assign a tutor to a booking"""
@@ -16,25 +19,9 @@ def assign_tutor(request, booking_id):
 
     booking = get_object_or_404(Booking, id=booking_id)
 
-    #maps language to attribute
-    LANGUAGE_FIELD_MAPPING = {
-        "Python": "specializes_in_python",
-        "Java": "specializes_in_java",
-        "C": "specializes_in_c",
-        "SQL": "specializes_in_sql",
-        "Ruby": "specializes_in_ruby",
-    }
-    field_name = LANGUAGE_FIELD_MAPPING.get(booking.lang)
-    if not field_name:
-        raise ValueError(f"Unsupported language: {booking.lang}")
-
-    #filter tutors based on the current booking's language and availability
-    tutors = Tutor.objects.filter(
-        #match language specialty
-        **{field_name: True},
-        #match day availability
-        **{f"available_{booking.day.lower()}": True}
-    )
+    #tutors who teach the booking's language on its day, looked up in memory;
+    #AssignTutorForm loads their rows through queryset_cache
+    tutors = tutor_capabilities.get_candidates(booking.lang, booking.day)
 
     if request.method == "POST":
         assign_form = AssignTutorForm(request.POST, tutors=tutors)
@@ -45,21 +32,18 @@ def assign_tutor(request, booking_id):
             if booking_form.is_valid():
                 booking = booking_form.save(commit=False)
                 booking.date = booking_form.cleaned_data['date']
-                booking.save()
+                run_write(booking.save)
                 messages.success(request, "Booking details updated successfully!")
                 return redirect("assign_tutor", booking_id=booking.id)
         #if tutor is assigned
         elif 'assign_tutor' in request.POST: 
             if assign_form.is_valid():
                 tutor = assign_form.cleaned_data['tutor']
-                #check for conflicts with existing lessons
-                if check_overlapping_lessons(tutor, booking):
-                    messages.error(request, "This tutor is already booked for an overlapping lesson.")
+                try:
+                    run_write(assign_booking, booking.pk, tutor)
+                except AssignmentConflict as error:
+                    messages.error(request, str(error))
                 else:
-                    #book lessons for the rest of the term
-                    generate_recurring_lessons(booking, tutor)
-                    #current booking is not connected to lesson, so can be deleted safely
-                    booking.delete()
                     messages.success(request, "Tutor assigned successfully and further lessons booked!")
                     return redirect('dashboard')
 
@@ -74,83 +58,105 @@ def assign_tutor(request, booking_id):
             "booking": booking,
             "assign_form": assign_form,
             "booking_form": booking_form,
-            "no_tutors": not tutors.exists(),
+            "no_tutors": not assign_form.tutors,
         },
     )
 
-#check if the tutor already has lessons that overlap with the current booking
-def check_overlapping_lessons(tutor, booking):
-    if not (tutor and booking.date and booking.time):
-        raise ValueError("Tutor, date, or time is missing!")
-
-    # Calculate the end time of the new booking
-    minutes = 60 if booking.duration == "short" else 120
-    start_time = booking.time
-    end_time = (datetime.combine(booking.date, start_time) + timedelta(minutes=minutes)).time()
-
-    #fetch all lessons for the same tutor and date
-    lessons_on_date = Lesson.objects.filter(
-        tutor=tutor,
-        booking__date=booking.date
-    )
-
-    for lesson in lessons_on_date:
-        #calculate the end time of each existing lesson
-        lesson_start_time = lesson.booking.time
-        lesson_end_time = (datetime.combine(lesson.booking.date, lesson_start_time) + timedelta(
-            minutes=60 if lesson.booking.duration == "short" else 120
-        )).time()
-
-        #check for overlap
-        if not (
-            end_time <= lesson_start_time or  #current booking ends before or exactly when the existing lesson starts
-            start_time >= lesson_end_time    #current booking starts after or exactly when the existing lesson ends
-        ):
-            return True
-
-    return False
-
-#books lessons for the rest of the term for the student
-def generate_recurring_lessons(booking, tutor):
+#raised by assign_booking when the booking or the tutor has been taken in the meantime
+class AssignmentConflict(Exception):
+    pass
+
+#book lessons for the rest of the term; checked and written in one write unit,
+#so the checks see every assignment committed before it
+def assign_booking(booking_id, tutor):
+    booking = Booking.objects.filter(pk=booking_id, status="OPEN").first()
+    if booking is None:
+        raise AssignmentConflict("This booking has already been assigned.")
+    #check for conflicts with existing lessons
+    if check_overlapping_lessons(tutor, booking):
+        raise AssignmentConflict("This tutor is already booked for an overlapping lesson.")
+    create_lesson_series(booking, tutor)
+    #current booking is not connected to lesson, so can be deleted safely
+    booking.delete()
+
+#end date of the term that the booking falls in
+def get_term_end_date(booking):
     if not (booking.date and booking.time and booking.frequency):
         raise ValueError("Booking must have date, time, and frequency defined.")
 
-    #calculate term dates and find the current term's end date
-    booking_form = BookingForm()
-    term_dates = booking_form.get_term_dates(booking.date.year)
-    term_end_date = None
-    for term_name, (term_start, term_end) in term_dates.items():
-        if term_start <= booking.date <= term_end:
-            term_end_date = term_end
-            break
-    if not term_end_date:
+    term_end = term_calendar.get_term_end(booking.date)
+    if term_end is None:
         raise ValueError("No valid term found for the booking date.")
+    return term_end
+
+#dates of every lesson in the series, from the booking date until the end of its term
+def get_recurring_dates(booking):
+    term_end_date = get_term_end_date(booking)
 
     #determine the duration of the booking
     frequency = booking.frequency.lower()  #'weekly' or 'fortnightly'
-    days_increment = 7 if frequency == "weekly" else 14
+    days_increment = LessonSeries.FREQUENCY_DAYS.get(frequency, 7)
 
-    #calculate recurring dates
+    #calculate recurring dates, skipping closures
+    closed_dates = term_calendar.get_closed_dates(booking.date, term_end_date)
     recurring_dates = []
     current_date = booking.date
     while current_date <= term_end_date:
-        recurring_dates.append(current_date)
+        if current_date not in closed_dates:
+            recurring_dates.append(current_date)
         current_date += timedelta(days=days_increment)
+    return recurring_dates
+
+#check if the tutor already has lessons that overlap with any lesson in the booking's series
+def check_overlapping_lessons(tutor, booking):
+    if not (tutor and booking.date and booking.time):
+        raise ValueError("Tutor, date, or time is missing!")
+
+    return tutor.pk in get_busy_tutor_ids([tutor], booking)
 
-    #save lessons in the database
-    with transaction.atomic():
-        for lesson_date in recurring_dates:
-            b = Booking.objects.create(
-                student=booking.student,
-                date=lesson_date,  #YYYY-MM-DD format
-                time=booking.time,    #HH:MM:SS format
-                frequency=booking.frequency,
-                duration=booking.duration,
-                day = booking.day,
-                lang = booking.lang,
-                status = "CLOSED"
-            )
-            l = Lesson.objects.create(
-                booking=b,
-                tutor=tutor,
-            )
+#ids of the tutors who already have a lesson overlapping any lesson in the booking's series
+def get_busy_tutor_ids(tutors, booking):
+    recurring_dates = get_recurring_dates(booking)
+    if not recurring_dates:
+        return set()
+
+    #two lessons overlap when each starts before the other ends
+    overlaps = Q()
+    for lesson_date in recurring_dates:
+        start_at, end_at = Booking.get_schedule(lesson_date, booking.time, booking.duration)
+        overlaps |= Q(booking__start_at__lt=end_at, booking__end_at__gt=start_at)
+
+    busy_tutor_ids = set(
+        Lesson.objects.filter(overlaps, tutor__in=tutors, booking__date__in=recurring_dates)
+        .values_list("tutor_id", flat=True)
+        .distinct()
+    )
+
+    #expand the tutors' lesson series only over the dates being checked
+    first_date, last_date = recurring_dates[0], recurring_dates[-1]
+    new_dates = set(recurring_dates)
+    tutor_series = (
+        LessonSeries.objects.filter(tutor__in=tutors)
+        .exclude(tutor__in=busy_tutor_ids)
+        .active_between(first_date, last_date)
+        .with_exceptions()
+    )
+    for series in tutor_series:
+        if series.tutor_id in busy_tutor_ids:
+            continue
+        for lesson_date in series.get_dates(first_date, last_date):
+            if lesson_date not in new_dates:
+                continue
+            start_at, end_at = Booking.get_schedule(lesson_date, booking.time, booking.duration)
+            series_start_at, series_end_at = Booking.get_schedule(lesson_date, series.time, series.duration)
+            if series_start_at < end_at and series_end_at > start_at:
+                busy_tutor_ids.add(series.tutor_id)
+                break
+
+    return busy_tutor_ids
+
+#records the tutor's lessons for the rest of the term, without writing each occurrence
+def create_lesson_series(booking, tutor):
+    series = LessonSeries.from_booking(booking, tutor, get_term_end_date(booking))
+    series.save()
+    return series
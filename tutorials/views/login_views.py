@@ -9,8 +9,10 @@ from django.views import View
 from django.views.generic.edit import FormView, UpdateView
 from django.urls import reverse
 from tutorials.forms.login_forms import LogInForm, PasswordForm, UserForm, StudentSignUpForm, TutorSignUpForm, AdminSignUpForm
+from tutorials.dashboard_cache import get_dashboard
 from tutorials.helpers import login_prohibited
-from tutorials.models import Booking, Lesson
+from tutorials.models import Booking, Lesson, LessonSeries
+from tutorials.write_queue import run_write
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
@@ -46,25 +48,44 @@ def get_lessons(user, role):
     else:
         raise PermissionDenied("Invalid role")
 
-    previous_lessons = Lesson.objects.filter(
-        **filter_kwargs,
-        booking__date__lt=now.date()
-    ) | Lesson.objects.filter(
-        **filter_kwargs,
-        booking__date=now.date(),
-        booking__time__lt=now.time()
-    )
-
-    upcoming_lessons = Lesson.objects.filter(
-        **filter_kwargs,
-        booking__date__gt=now.date()
-    ) | Lesson.objects.filter(
-        **filter_kwargs,
-        booking__date=now.date(),
-        booking__time__gte=now.time()
-    )
-    
-    return previous_lessons.distinct(), upcoming_lessons.distinct()
+    lessons = Lesson.objects.filter(**filter_kwargs).with_details()
+    previous_lessons = lessons.filter(booking__start_at__lt=now).order_by('booking__start_at')
+    upcoming_lessons = lessons.filter(booking__start_at__gte=now).order_by('booking__start_at')
+
+    return previous_lessons, upcoming_lessons
+
+def get_lesson_schedule(user, role):
+    """Helper method to merge previous and upcoming lessons with occurrences of the user's lesson series."""
+
+    previous_lessons, upcoming_lessons = get_lessons(user, role)
+    now = timezone.now()
+    profile = user.student_profile if role == 'student' else user.tutor_profile
+
+    previous_occurrences, upcoming_occurrences = [], []
+    for series in LessonSeries.objects.filter(**{role: profile}).with_details():
+        for occurrence in series.get_occurrences():
+            if occurrence.start_at < now:
+                previous_occurrences.append(occurrence)
+            else:
+                upcoming_occurrences.append(occurrence)
+
+    by_start = lambda lesson: lesson.booking.start_at
+    previous_schedule = sorted([*previous_lessons, *previous_occurrences], key=by_start)
+    upcoming_schedule = sorted([*upcoming_lessons, *upcoming_occurrences], key=by_start)
+    return previous_schedule, upcoming_schedule
+
+def build_dashboard(user, role):
+    """Helper method to load everything the user's dashboard lists, as cached by get_dashboard."""
+
+    previous_schedule, upcoming_schedule = get_lesson_schedule(user, role)
+    dashboard = {
+        'previous_schedule': previous_schedule,
+        'upcoming_schedule': upcoming_schedule,
+    }
+    if role == 'student':
+        dashboard['bookings'] = list(Booking.objects.filter(student_id=user.pk, status="OPEN"))
+        dashboard['invoice_total'] = sum(lesson.invoice for lesson in previous_schedule)
+    return dashboard
 
 @login_required
 def student_dashboard(request):
@@ -72,16 +93,11 @@ def student_dashboard(request):
     if request.user.role != 'student':
         raise PermissionDenied
 
-    student = request.user.student_profile
-    bookings = Booking.objects.filter(student=student, status="OPEN")
-
-    previous_lessons, upcoming_lessons = get_lessons(request.user, 'student')
+    dashboard = get_dashboard(request.user, 'student', lambda: build_dashboard(request.user, 'student'))
 
     context = {
         'user': request.user,  # Corrected 'users' to 'user'
-        'bookings': bookings,
-        'previous_lessons': previous_lessons,
-        'upcoming_lessons': upcoming_lessons,
+        **dashboard,
     }
     return render(request, 'student_dashboard.html', context)
 
@@ -91,12 +107,11 @@ def tutor_dashboard(request):
     if request.user.role != 'tutor':
         raise PermissionDenied
     
-    previous_lessons, upcoming_lessons = get_lessons(request.user, 'tutor')
+    dashboard = get_dashboard(request.user, 'tutor', lambda: build_dashboard(request.user, 'tutor'))
 
     context = {
         'users': request.user,
-        'previous_lessons': previous_lessons,
-        'upcoming_lessons': upcoming_lessons,
+        **dashboard,
     }
     return render(request, 'tutor_dashboard.html', context)
 
@@ -164,7 +179,8 @@ class LogInView(LoginProhibitedMixin, View):
         self.next = request.POST.get('next') or settings.REDIRECT_URL_WHEN_LOGGED_IN
         user = form.get_user()
         if user is not None:
-            if (hasattr(user, "tutor_profile") or hasattr(user, "student_profile") or hasattr(user, "admin_profile")):
+            #ProfileBackend joined the profiles into the query that authenticated the user
+            if user.get_profile() is not None:
                 login(request, user)
                 return redirect(self.next)
         messages.add_message(request, messages.ERROR, "The credentials provided were invalid!")
@@ -237,7 +253,9 @@ class TutorSignUpView(LoginProhibitedMixin, FormView):
 
     def form_valid(self, form):
         """Save the tutor and set specialties."""
-        self.object = form.save()
+        #the password is hashed here, so the write queue only runs the inserts
+        user = form.save(commit=False)
+        self.object = run_write(form.save_user, user)
         login(self.request, self.object)
         return super().form_valid(form)
 
@@ -252,7 +270,9 @@ class StudentSignUpView(LoginProhibitedMixin, FormView):
     redirect_when_logged_in_url = settings.REDIRECT_URL_WHEN_LOGGED_IN
 
     def form_valid(self, form):
-        self.object = form.save()
+        #the password is hashed here, so the write queue only runs the inserts
+        user = form.save(commit=False)
+        self.object = run_write(form.save_user, user)
         login(self.request, self.object)
         return super().form_valid(form)
 
@@ -268,7 +288,9 @@ class TutorSignUpView(LoginProhibitedMixin, FormView):
 
     def form_valid(self, form):
         """Save the tutor and set specialties."""
-        self.object = form.save()
+        #the password is hashed here, so the write queue only runs the inserts
+        user = form.save(commit=False)
+        self.object = run_write(form.save_user, user)
         login(self.request, self.object)
         return super().form_valid(form)
 
@@ -284,7 +306,9 @@ class AdminSignUpView(FormView):
     
     def form_valid(self, form):
         """Save the admin and log them in."""
-        self.object = form.save()
+        #the password is hashed here, so the write queue only runs the inserts
+        user = form.save(commit=False)
+        self.object = run_write(form.save_user, user)
         login(self.request, self.object)  # Automatically log the user in after creation
         return super().form_valid(form)
     
@@ -0,0 +1,214 @@
+import logging
+import queue
+from concurrent.futures import Future
+from contextvars import copy_context
+from functools import partial
+from threading import Lock, Thread
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from tutorials.tenants import get_tenant_database
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueFull(Exception):
+    """Raised when a write can't be queued within WRITE_QUEUE_TIMEOUT seconds."""
+
+
+class WriteQueueClosed(Exception):
+    """Raised for writes to a queue whose writer thread has stopped."""
+
+
+class _WriteUnit:
+    def __init__(self, function, future):
+        self.function = function
+        self.future = future
+        #the submitter's context, so the unit runs for the same tenant
+        self.context = copy_context()
+        self.database = get_tenant_database()
+
+
+class WriteQueue:
+    """
+    Run write units one after another on a single writer thread.
+
+    SQLite takes one writer at a time, so request threads that write at once
+    only queue up on its lock and time out. Here they queue up in memory
+    instead, and the writer commits whatever has queued, up to max_batch
+    units, in one short transaction (group commit). Each unit runs in its own
+    savepoint, so one that fails is rolled back alone and its exception is
+    raised in the request that submitted it. Results are handed back only
+    once the batch has committed. Units for different tenant databases
+    commit in a transaction per database. If the writer thread stops, the
+    queue closes: every write still waiting on it fails with
+    WriteQueueClosed, and so does every later submit.
+    """
+
+    _STOP = object()
+
+    def __init__(self, max_size, max_batch, timeout):
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._closed_error = None
+        self.batches = 0
+        self.units = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.max_depth = 0
+
+    def start(self):
+        self._thread = Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Commit what has been queued, then stop the writer thread."""
+        if self._thread is not None:
+            if self._thread.is_alive():
+                self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def closed(self):
+        return self._closed_error is not None
+
+    def submit(self, function, *args, **kwargs):
+        """Run function(*args, **kwargs) on the writer thread, and return its result once committed."""
+        if self.closed:
+            raise self._closed_error
+        future = Future()
+        try:
+            self._queue.put(_WriteUnit(partial(function, *args, **kwargs), future), timeout=self.timeout)
+        except queue.Full:
+            raise WriteQueueFull(f"No room in the write queue after {self.timeout}s.")
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        #the writer closes the queue before draining it, so a unit queued as it
+        #closed is settled either by the writer's drain or by this one
+        if self.closed:
+            self._fail_queued()
+        #once queued, the unit is always settled: committed, failed or closed
+        return future.result()
+
+    def _close(self, error, units=()):
+        """Stop taking writes, and fail units and every write still queued with error."""
+        self._closed_error = error
+        for unit in units:
+            if unit is not self._STOP and not unit.future.done():
+                unit.future.set_exception(error)
+        self._fail_queued()
+
+    def _fail_queued(self):
+        while True:
+            try:
+                unit = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if unit is not self._STOP:
+                unit.future.set_exception(self._closed_error)
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch and batch[-1] is not self._STOP:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = batch[-1] is self._STOP
+                by_database = {}
+                for unit in batch:
+                    if unit is not self._STOP:
+                        by_database.setdefault(unit.database, []).append(unit)
+                for database, units in by_database.items():
+                    self._commit(database, units)
+                if stopping:
+                    self._close(WriteQueueClosed("The write queue has been stopped."))
+                    return
+        except BaseException as error:
+            #e.g. a unit raising SystemExit, or a broken connection: rather than
+            #leave requests waiting on a writer that is gone, fail their writes
+            logger.exception("Write queue stopped")
+            self._close(WriteQueueClosed(f"The write queue stopped: {error!r}"), batch)
+        finally:
+            connections.close_all()
+
+    def _commit(self, database, units):
+        #the writer holds its connections for its lifetime, so honour CONN_MAX_AGE and health checks
+        close_old_connections()
+        outcomes = []
+        try:
+            with transaction.atomic(using=database):
+                for unit in units:
+                    try:
+                        with transaction.atomic(using=database):
+                            outcomes.append((unit, unit.context.run(unit.function), None))
+                    except Exception as error:
+                        outcomes.append((unit, None, error))
+        except Exception as error:
+            #the commit failed, so nothing in the batch was written
+            for unit in units:
+                unit.future.set_exception(error)
+            return
+
+        self.batches += 1
+        self.units += len(units)
+        self.last_batch_size = len(units)
+        self.max_batch_size = max(self.max_batch_size, len(units))
+        logger.debug("Committed %d writes, %d still queued", len(units), self._queue.qsize())
+        for unit, result, error in outcomes:
+            if error is None:
+                unit.future.set_result(result)
+            else:
+                unit.future.set_exception(error)
+
+    def get_stats(self):
+        """Queue depth and commit batch sizes since the writer started."""
+        return {
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "batches": self.batches,
+            "units": self.units,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "mean_batch_size": self.units / self.batches if self.batches else 0.0,
+        }
+
+
+_write_queue = None
+_write_queue_lock = Lock()
+
+
+def get_write_queue():
+    """The process's write queue, with its writer thread started on first use, or again after it stopped."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None or _write_queue.closed:
+            _write_queue = WriteQueue(settings.WRITE_QUEUE_SIZE, settings.WRITE_QUEUE_BATCH, settings.WRITE_QUEUE_TIMEOUT)
+            _write_queue.start()
+        return _write_queue
+
+
+def stop_write_queue():
+    """Stop the writer thread, e.g. before the database it writes to goes away."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.stop()
+            _write_queue = None
+
+
+def run_write(function, *args, **kwargs):
+    """
+    Run a unit of writes, through the write queue if WRITE_QUEUE_ENABLED is set.
+
+    Writes made inside a transaction belong to it, so they always run inline.
+    """
+    database = get_tenant_database()
+    if not settings.WRITE_QUEUE_ENABLED or connections[database].in_atomic_block:
+        with transaction.atomic(using=database):
+            return function(*args, **kwargs)
+    return get_write_queue().submit(function, *args, **kwargs)